@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compares path queries over the hierarchical area graph against a full-grid search on a large generated dungeon.
+
+Run from the repository root:
+    python benchmarks/bench_area_graph.py [size]
+
+The first query between two clusters finds and keeps the local paths between their portals, so both cold and warm timings are
+reported. Both searches use the movement cost grid's terrain cost, and the cost ratio compares each graph path to the cheapest path.
+"""
+
+from __future__ import annotations
+from copy import deepcopy
+from sys import argv, path
+from pathlib import Path
+import random
+import time
+import warnings
+
+import numpy as np
+import tcod.path
+
+path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+from core_components.maps.tiles import TileTuple
+from core_components.maps.tilemaps import DefaultTileMap, DEFAULT_MANIFEST
+from core_components.maps.generators import DungeonGenerator
+from core_components.maps.pathfinding import terrain_cost
+
+N_QUERIES = 100
+CHUNK_SIZE = 32
+
+
+def large_dungeon(size: int, seed: int = 1) -> DefaultTileMap:
+    random.seed(seed)
+    manifest = deepcopy(DEFAULT_MANIFEST)
+    manifest['dimensions']['grid_size'] = TileTuple(([size], [size]))
+    generator = DungeonGenerator(DefaultTileMap(manifest))
+    return generator.generate(max_rooms=size * size // 2500, min_room_size=8, max_room_size=30)
+
+
+if __name__ == '__main__':
+    warnings.simplefilter('ignore', UserWarning)
+    size = int(argv[1]) if len(argv) > 1 else 1000
+    tile_map = large_dungeon(size)
+
+    start_time = time.perf_counter()
+    graph = tile_map.build_area_graph(CHUNK_SIZE)
+    build_time = time.perf_counter() - start_time
+    print(f"{size}x{size} map, {len(tile_map.areas)} areas: {graph.n_clusters} clusters, {graph.n_nodes} portals, built in {build_time:.2f} s")
+
+    cost = terrain_cost(tile_map.blocks_movement)
+    open_x, open_y = np.nonzero(cost)
+    rng = np.random.default_rng(0)
+    queries = [((int(open_x[i]), int(open_y[i])), (int(open_x[j]), int(open_y[j]))) for i, j in rng.integers(len(open_x), size=(N_QUERIES, 2))]
+
+    cold, warm, full, ratios = [], [], [], []
+    for start, goal in queries:
+        start_time = time.perf_counter()
+        graph_path = graph.find_path(start, goal)
+        cold.append(time.perf_counter() - start_time)
+
+        start_time = time.perf_counter()
+        graph.find_path(start, goal)
+        warm.append(time.perf_counter() - start_time)
+
+        start_time = time.perf_counter()
+        pathfinder = tcod.path.Pathfinder(tcod.path.SimpleGraph(cost=cost, cardinal=1, diagonal=0))
+        pathfinder.add_root(start)
+        full_path = pathfinder.path_to(goal)
+        full.append(time.perf_counter() - start_time)
+
+        assert (graph_path is None) == (len(full_path) == 0 and start != goal), f"Reachability differs for {start} -> {goal}"
+        if graph_path:
+            ratios.append(sum(int(cost[step]) for step in graph_path) / sum(int(cost[tuple(step)]) for step in full_path[1:]))
+
+    print(f"{'query':>10} {'median ms':>10} {'p90 ms':>8}")
+    for name, times in (('cold', cold), ('warm', warm), ('full grid', full)):
+        print(f"{name:>10} {np.median(times) * 1000:>10.3f} {np.percentile(times, 90) * 1000:>8.3f}")
+    print(f"path cost ratio: mean {np.mean(ratios):.3f}, max {max(ratios):.3f}")
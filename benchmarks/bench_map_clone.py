@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compares spawning dungeon maps before the compiled manifest and `GraphicTileMap.clone()` against the current tree.
+
+Run from the repository root:
+    python benchmarks/bench_map_clone.py [--baseline REV]
+
+"deepcopy now" is `deepcopy` of a map on this tree, which is what `DungeonGenerator.spawn_map` did before `clone()`; the other
+current columns time `clone()`, `empty_like()` and the generator. With --baseline, the `src` tree of REV (any commit before
+the compiled manifest, where every map owns a deep copy of its manifest) is extracted with `git archive` and timed in a
+separate interpreter as well.
+"""
+
+from __future__ import annotations
+from copy import deepcopy
+from sys import argv, executable, path
+from pathlib import Path
+import io
+import json
+import random
+import subprocess
+import tarfile
+import tempfile
+import timeit
+import warnings
+
+ROOT = Path(__file__).resolve().parents[1]
+SIZES = (50, 200, 1000)
+
+
+def best_of(statement, number: int, repeat: int = 5) -> float:
+    """Returns the best mean time of a statement in milliseconds."""
+    return min(timeit.repeat(statement, number=number, repeat=repeat)) / number * 1000
+
+
+def measure(size: int) -> dict:
+    """Times copying and generating maps of a size with whichever `src` tree is on the path."""
+    from core_components.maps.tiles import TileTuple
+    from core_components.maps.tilemaps import DefaultTileMap, DEFAULT_MANIFEST
+    from core_components.maps.generators import DungeonGenerator
+
+    manifest = deepcopy(DEFAULT_MANIFEST)
+    manifest['dimensions']['grid_size'] = TileTuple(([size], [size]))
+    template = DefaultTileMap(manifest)
+    generator = DungeonGenerator(template)
+    number = max(1, 200_000 // (size * size))
+
+    def generate() -> None:
+        random.seed(size)
+        generator.generate()
+
+    times = {'deepcopy': best_of(lambda: deepcopy(template), number), 'generate': best_of(generate, number)}
+    if hasattr(template, 'clone'):
+        times['clone'] = best_of(lambda: template.clone(), number)
+        times['empty_like'] = best_of(lambda: template.empty_like(), number)
+    return times
+
+
+def measure_baseline(rev: str, sizes: tuple) -> dict:
+    """Extracts the `src` tree of a revision and times it in a separate interpreter."""
+    with tempfile.TemporaryDirectory() as directory:
+        archive = subprocess.run(['git', 'archive', rev, 'src'], cwd=ROOT, check=True, capture_output=True).stdout
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(directory)
+        result = subprocess.run([executable, __file__, '--measure', str(Path(directory) / 'src'), *map(str, sizes)],
+                                check=True, capture_output=True, text=True)
+    return {int(size): times for size, times in json.loads(result.stdout).items()}
+
+
+if __name__ == '__main__':
+    warnings.simplefilter('ignore', UserWarning)
+    if argv[1:2] == ['--measure']:
+        path.insert(0, argv[2])
+        print(json.dumps({size: measure(int(size)) for size in argv[3:]}))
+        raise SystemExit
+
+    rev = argv[argv.index('--baseline') + 1] if '--baseline' in argv else None
+    baseline = measure_baseline(rev, SIZES) if rev is not None else {}
+    path.insert(0, str(ROOT / 'src'))
+
+    if rev is not None:
+        print(f"baseline: {rev}")
+    print(f"{'grid':<11} {'base copy':>10} {'base gen':>10} {'deepcopy now':>13} {'clone':>10} {'empty_like':>11} {'gen clone':>10}   (ms)")
+    for size in SIZES:
+        current = measure(size)
+        base = baseline.get(size, {})
+        print(f"{size:>5}x{size:<5} {base.get('deepcopy', float('nan')):>10.3f} {base.get('generate', float('nan')):>10.3f} "
+              f"{current['deepcopy']:>13.3f} {current['clone']:>10.3f} {current['empty_like']:>11.3f} {current['generate']:>10.3f}")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compares computing mob fields of view sequentially against fanning them out over a thread pool.
+
+Run from the repository root:
+    python benchmarks/bench_mob_fov.py [workers]
+
+The speed-up depends on the number of cores; on a single core the thread pool can only add overhead.
+"""
+
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from sys import argv, path
+from pathlib import Path
+import os
+import timeit
+import warnings
+
+import numpy as np
+from tcod import libtcodpy
+
+path.append(str(Path(__file__).resolve().parents[1] / 'src'))
+
+from core_components.maps.tiles import TileTuple
+from core_components.maps.tilemaps import DefaultTileMap, DEFAULT_MANIFEST
+
+MAP_SIZE = 200
+MOB_COUNTS = (10, 50, 200, 500)
+FOV_RADIUS = 8
+
+
+def pillared_map(size: int, seed: int = 0) -> DefaultTileMap:
+    manifest = deepcopy(DEFAULT_MANIFEST)
+    manifest['dimensions']['grid_size'] = TileTuple(([size], [size]))
+    tile_map = DefaultTileMap(manifest)
+    rng = np.random.default_rng(seed)
+    tile_map.paint_many([((slice(1, size - 1), slice(1, size - 1)), 'floor'), (rng.random((size, size)) < 0.05, 'wall')])
+    tile_map.update_state()
+    return tile_map
+
+
+def mob_povs(tile_map: DefaultTileMap, n_mobs: int, seed: int = 0) -> list[tuple[int, int, int, int]]:
+    floor_x, floor_y = np.nonzero(tile_map.get_tile_layout('floor'))
+    picks = np.random.default_rng(seed).choice(len(floor_x), size=n_mobs, replace=False)
+    return [(int(floor_x[i]), int(floor_y[i]), FOV_RADIUS, libtcodpy.FOV_SHADOW) for i in picks]
+
+
+def bench(tile_map: DefaultTileMap, n_mobs: int, executor: ThreadPoolExecutor) -> None:
+    povs = mob_povs(tile_map, n_mobs)
+
+    def compute(executor: ThreadPoolExecutor | None) -> list[np.ndarray]:
+        tile_map.fov_cache.clear()
+        return tile_map.compute_fov_many(povs, executor=executor)
+
+    assert all(np.array_equal(a, b) for a, b in zip(compute(None), compute(executor))), "Threaded FOV differs from sequential"
+    number = max(1, 2000 // n_mobs)
+    sequential = min(timeit.repeat(lambda: compute(None), number=number, repeat=5)) / number * 1000
+    threaded = min(timeit.repeat(lambda: compute(executor), number=number, repeat=5)) / number * 1000
+
+    print(f"{n_mobs:>6} {sequential:>14.3f} {threaded:>12.3f} {sequential / threaded:>9.2f}x")
+
+
+if __name__ == '__main__':
+    warnings.simplefilter('ignore', UserWarning)
+    workers = int(argv[1]) if len(argv) > 1 else (os.cpu_count() or 1)
+    tile_map = pillared_map(MAP_SIZE)
+    tile_map.fov_cache.maxsize = max(MOB_COUNTS)
+
+    print(f"{MAP_SIZE}x{MAP_SIZE} map, radius {FOV_RADIUS}, {workers} workers")
+    print(f"{'mobs':>6} {'sequential ms':>14} {'threaded ms':>12} {'speed-up':>10}")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for n_mobs in MOB_COUNTS:
+            bench(tile_map, n_mobs, executor)
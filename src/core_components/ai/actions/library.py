@@ -2,8 +2,8 @@
 # # -*- coding: utf-8 -*-
 
 from __future__ import annotations
-from typing import Protocol, TYPE_CHECKING
-from tcod.map import compute_fov
+from concurrent.futures import ThreadPoolExecutor
+from typing import ClassVar, Dict, Hashable, List, Protocol, TYPE_CHECKING
 from tcod import libtcodpy
 import numpy as np
 
@@ -17,10 +17,16 @@ from core_components.ai.events import FOVUpdateEvent, MeleeAttackEvent, TargetAv
 
 
 class GeneralAction:
+    coalescable: bool = False # Idempotent actions are collapsed while an equal action is still queued
 
     def __init__(self) -> None:
         pass
 
+    @property
+    def coalesce_key(self) -> Hashable:
+        """Actions with equal keys are interchangeable while queued. Defaults to the action type."""
+        return type(self)
+
     def perform(self) -> None:
         raise NotImplementedError()
 
@@ -61,6 +67,22 @@ class GameOverAction(EngineBaseAction):
 
 
 class FOVUpdateAction(EngineBaseAction):
+        """Recomputes the player's field of view and the spotting flags of the player and the mobs.
+
+        The `spotting` mode decides how a mob spots the player:
+            'exact': each mob computes its own FOV_SHADOW field of view, which costs one FOV per mob.
+            'reverse': one FOV_SYMMETRIC_SHADOWCAST field of view is computed from the player out to the largest mob FOV radius, and 
+                each mob is tested by a lookup and a Euclidean radius check. Symmetric shadowcasting guarantees that a mob sees the 
+                player exactly when the player sees the mob's tile, so this costs one FOV per turn however many mobs there are.
+
+        In 'exact' mode, setting `workers` above 1 computes the mob fields of view on a shared thread pool of that size. tcod releases 
+        the GIL while computing a field of view, and the results are merged in roster order, so spotting is identical to the 
+        sequential path.
+        """
+        coalescable = True
+        spotting: str = 'exact'
+        workers: int = 0
+        _executors: ClassVar[Dict[int, ThreadPoolExecutor]] = {}
         
         def perform(self) -> None:
             """Recompute the visible area based on the players point of view."""
@@ -71,7 +93,7 @@ class FOVUpdateAction(EngineBaseAction):
 
             # UPDATE PLAYER FOV
             if player and tile_blocks_vision is not None:
-                player_visible_tiles = compute_fov( ~tile_blocks_vision, (player.location.x, player.location.y), radius=player.fov_radius, algorithm=libtcodpy.FOV_RESTRICTIVE)
+                player_visible_tiles = self.state.map.active.compute_fov(player.location.x, player.location.y, radius=player.fov_radius, algorithm=libtcodpy.FOV_RESTRICTIVE)
                 self.state.map.active.set_state_bits('visible', player_visible_tiles)
 
                 # If a tile is "visible" it should be added to "explored".
@@ -82,27 +104,64 @@ class FOVUpdateAction(EngineBaseAction):
             
             # UPDATE MOB FOV AND SPOTTING
             if len(mobs) > 0 and player and tile_blocks_vision is not None:
-                for mob in mobs:
-                    mob_visible_tiles = compute_fov( ~tile_blocks_vision, (mob.location.x, mob.location.y), radius=mob.fov_radius, algorithm=libtcodpy.FOV_SHADOW)
-                    
+                mobs_spotting = self.reverse_spotting(player, mobs) if self.spotting == 'reverse' else self.exact_spotting(player, mobs)
+
+                for mob, mob_is_spotting in zip(mobs, mobs_spotting):
                     if player_visible_tiles[mob.location.x, mob.location.y]:
                         mob.is_spotted = True
                     
                     elif not player_visible_tiles[mob.location.x, mob.location.y]:
                         mob.is_spotted = False
 
-                    if mob_visible_tiles[player.location.x, player.location.y]:
+                    if mob_is_spotting:
                         mob.is_spotting = True
                         self.state.log.add(text=f"You have been spotted!")
                         player.is_spotted = True
 
-                    elif not mob_visible_tiles[player.location.x, player.location.y]:
+                    elif not mob_is_spotting:
                         mob.is_spotting = False
                     
                 for mob in mobs:
                     if mob.is_spotted:
                         player.is_spotting = True
 
+        def exact_spotting(self, player: PlayerCharactor, mobs: List[MobCharactor]) -> List[bool]:
+            """Returns whether each mob sees the player, from one field of view per mob. Mobs covered by a precomputed visibility 
+            table only read a single bit."""
+            tile_map = self.state.map.active
+            tables = [tile_map.get_visibility_table(mob.fov_radius, libtcodpy.FOV_SHADOW) for mob in mobs]
+            if all(table is not None and table.covers(mob.location.x, mob.location.y, mob.fov_radius, libtcodpy.FOV_SHADOW) for mob, table in zip(mobs, tables)):
+                return [table.is_visible(mob.location.x, mob.location.y, player.location.x, player.location.y) for mob, table in zip(mobs, tables)] # type: ignore
+
+            povs = [(mob.location.x, mob.location.y, mob.fov_radius, libtcodpy.FOV_SHADOW) for mob in mobs]
+            mobs_visible_tiles = self.state.map.active.compute_fov_many(povs, executor=self.executor(self.workers))
+
+            return [bool(mob_visible_tiles[player.location.x, player.location.y]) for mob_visible_tiles in mobs_visible_tiles]
+        
+        @classmethod
+        def executor(cls, workers: int) -> ThreadPoolExecutor | None:
+            """Returns the shared thread pool with the given number of workers, or None for the sequential path."""
+            if workers <= 1:
+                return None
+            
+            if workers not in cls._executors:
+                cls._executors[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fov")
+            return cls._executors[workers]
+        
+        def reverse_spotting(self, player: PlayerCharactor, mobs: List[MobCharactor]) -> List[bool]:
+            """Returns whether each mob sees the player, from a single symmetric field of view centred on the player."""
+            radii = [mob.fov_radius for mob in mobs]
+            radius = 0 if 0 in radii else max(radii) # A radius of 0 is unlimited
+            reverse_visible_tiles = self.state.map.active.compute_fov(player.location.x, player.location.y, radius=radius, algorithm=libtcodpy.FOV_SYMMETRIC_SHADOWCAST)
+
+            mobs_spotting = []
+            for mob, mob_radius in zip(mobs, radii):
+                dx, dy = mob.location.x - player.location.x, mob.location.y - player.location.y
+                in_range = mob_radius == 0 or dx * dx + dy * dy <= mob_radius * mob_radius
+                mobs_spotting.append(in_range and bool(reverse_visible_tiles[mob.location.x, mob.location.y]))
+
+            return mobs_spotting
+
 
 class EntityActionOnTarget(EngineBaseAction):
     entity: Charactor | None = None
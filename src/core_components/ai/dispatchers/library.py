@@ -2,21 +2,61 @@
 # # -*- coding: utf-8 -*-
 
 from __future__ import annotations
+from typing import Dict, Hashable, OrderedDict, Sequence, Tuple
 import numpy as np
 
 from core_components.ai.dispatchers.base import *
-from core_components.entities.library import BaseEntity, TargetableEntity, MobileEntity, TargetingEntity, CombatEntity, Charactor
+from core_components.entities.library import AICharactor, BaseEntity, TargetableEntity, MobileEntity, TargetingEntity, CombatEntity, Charactor
 from core_components.ai.events.library import FOVUpdateEvent, GameStartEvent, GameOverEvent, MeleeAttackEvent, FOVUpdateEvent, TargetAvailableAIEvent, OnTargetAIEvent, TargetOutOfRangeAIEvent
 from core_components.ai.actions.library import EntityAcquireTargetAction, EntityActionOnDestination, EntityActionOnTarget, EntityCollisionAction, EntityMeleeAction, FOVUpdateAction, GameStartAction, GameOverAction, EntityMoveAction, GeneralAction
 from core_components.maps.tiles.base import TileTuple, TileCoordinate
+from core_components.maps.pathfinding import FlowField, PathService
 
 A = TypeVar('A', EntityActionOnDestination, EntityActionOnTarget)
 
 class AIDispatcher(BaseEventDispatcher):
+    """Converts AI events into actions. Mobs chasing a target step along a shared Dijkstra flow field rooted at the target when 
+    `pathing` is 'flow', run their own path search with `get_path_to` when it is 'astar', or route over the map's hierarchical 
+    area graph when it is 'hierarchical', which suits large maps. The area graph is built with the map, through 
+    `DungeonGenerator.generate(area_graph_chunk_size=...)`; mobs fall back to `get_path_to` while a map has none.
+
+    When `cache_paths` is set, the path found for a mob is kept on `AICharactor.path`, capped at `max_path_length` steps, and 
+    the mob advances along it. The path is recomputed when it runs out, when the target has moved more than `path_tolerance` 
+    tiles from where it was, when the next step is blocked by an entity or no longer adjacent, or when the map's movement 
+    generation changes. `path_stats` reports the hits and misses.
+
+    In 'flow' mode the first mob to ask for a step in a turn gets the steps of every live mob chasing a target computed in one 
+    `PathService.next_steps` batch; the other mobs' events read their step from it while they, their target and the map's 
+    movement generation stay where they were and the step is still free."""
     MOVEMENT_ACTION = EntityMoveAction()
     COLLISION_ACTION = EntityCollisionAction()
     TARGET_ACQUISITION_ACTION = EntityAcquireTargetAction()
     MELEE_ATTACK = EntityMeleeAction()
+    ENTITY_BLOCKED_PENALTY = 10
+    MAX_FLOW_FIELDS = 8
+
+    pathing: str = 'flow'
+    cache_paths: bool = True
+    path_tolerance: int = 2
+    max_path_length: int = 20
+    path_hits: int
+    path_misses: int
+    path_service: PathService
+    _turn_steps: Dict[BaseEntity, Tuple[Hashable, TileCoordinate | None]]
+
+    def __init__(self) -> None:
+        self.path_service = PathService(max_fields=self.MAX_FLOW_FIELDS, cardinal=2, diagonal=0)
+        self.path_hits = 0
+        self.path_misses = 0
+        self._turn_steps = {}
+
+    @property
+    def flow_fields(self) -> OrderedDict[Hashable, FlowField]:
+        return self.path_service.fields
+
+    @property
+    def path_stats(self) -> Dict[str, int]:
+        return {'hits': self.path_hits, 'misses': self.path_misses}
 
     @classmethod
     def create_action_on_target(cls, action: A, state: GameState, entity: BaseEntity, target: BaseEntity | TileCoordinate) -> A:
@@ -37,13 +77,7 @@ class AIDispatcher(BaseEventDispatcher):
         If there is no valid path then returns an empty list.
         """
         game_map = state.map.active
-
-        # Copy the traversable array.
-        cost = np.array(game_map.blocks_movement, dtype=np.int8) + 1
-
-        for location in state.roster.entity_blocked_locations:
-            if location and cost[location.x, location.y]:
-                cost[location.x, location.y] += 10
+        cost = state.roster.get_movement_costs(game_map, penalty=self.ENTITY_BLOCKED_PENALTY).cost
 
         graph = tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=0)
         pathfinder = tcod.path.Pathfinder(graph)
@@ -53,6 +87,121 @@ class AIDispatcher(BaseEventDispatcher):
         path = pathfinder.path_to(end)[1:]
         return [game_map.grid.get_location(index[0], index[1]) for index in path]
     
+    def get_area_path(self, state: GameState, entity: BaseEntity, destination: TileCoordinate) -> List[TileCoordinate]:
+        """Compute and return a path to the target position over the hierarchical area graph of the active map.
+
+        Falls back to `get_path_to` when the map has no graph or its movement-blocking tiles have changed since it was built, 
+        when either end is off the graph, or when the first step is blocked by an entity. The graph is never built here, since 
+        building it takes seconds on the large maps it is meant for.
+        """
+        game_map = state.map.active
+        graph = game_map.get_area_graph()
+        if graph is None:
+            return self.get_path_to(state, entity, destination)
+        
+        path = graph.find_path(entity.location.to_tuple, destination.to_tuple)
+        occupied = state.roster.get_movement_costs(game_map, penalty=self.ENTITY_BLOCKED_PENALTY)
+
+        if path is None or (path and path[0] in occupied and path[0] != destination.to_tuple):
+            return self.get_path_to(state, entity, destination)
+        
+        return [game_map.grid.get_location(x, y) for x, y in path[:self.max_path_length]]
+
+    def movement_cost(self, state: GameState) -> np.ndarray:
+        """Returns the cost of stepping onto each tile of the active map, without the entity penalties."""
+        return state.roster.get_movement_costs(state.map.active, penalty=self.ENTITY_BLOCKED_PENALTY).terrain
+
+    def get_flow_field(self, state: GameState, destination: TileCoordinate) -> FlowField:
+        """Returns the flow field rooted at a destination on the active map. Fields are shared by every mob chasing the same 
+        destination and are only rebuilt when the destination moves or the map's movement-blocking tiles change."""
+        return self.path_service.flow_field(self.movement_cost(state), destination.to_tuple, key=self._field_key(state))
+
+    def get_flow_step(self, state: GameState, entity: BaseEntity, destination: TileCoordinate) -> TileCoordinate | None:
+        """Returns the next step of an entity toward a destination along the shared flow field. Tiles blocked by other entities are 
+        penalised as in `get_path_to`. The step is read from the turn's batch when it is still valid; otherwise the steps of every 
+        live mob chasing a target are batched again from their current locations."""
+        move_key = (entity.location.to_tuple, destination.to_tuple, self._field_key(state))
+        entry = self._turn_steps.pop(entity, None)
+        if entry is not None and entry[0] == move_key:
+            step = entry[1]
+            movement_costs = state.roster.get_movement_costs(state.map.active, penalty=self.ENTITY_BLOCKED_PENALTY)
+            if step is None or step.to_tuple == destination.to_tuple or step.to_tuple not in movement_costs:
+                return step
+
+        moves = [(mob, mob.target.location) for mob in state.roster.live_ai_actors if mob is not entity and getattr(mob, 'target', None) is not None]
+        moves.append((entity, destination))
+        steps = self.get_flow_steps(state, moves)
+        self._turn_steps = {mob: ((mob.location.to_tuple, goal.to_tuple, move_key[2]), step) for (mob, goal), step in zip(moves, steps)}
+        return self._turn_steps.pop(entity)[1]
+    
+    def get_flow_steps(self, state: GameState, moves: Sequence[Tuple[BaseEntity, TileCoordinate]]) -> List[TileCoordinate | None]:
+        """Returns the next step of every (entity, destination) pair of a turn in one batch through the path service, which builds 
+        one flow field per distinct destination."""
+        game_map = state.map.active
+        movement_costs = state.roster.get_movement_costs(game_map, penalty=self.ENTITY_BLOCKED_PENALTY)
+        pairs = [(entity.location.to_tuple, destination.to_tuple) for entity, destination in moves]
+        steps = self.path_service.next_steps(movement_costs.terrain, pairs, key=self._field_key(state), 
+                                             occupied=movement_costs.occupancy, occupied_penalty=self.ENTITY_BLOCKED_PENALTY)
+        return [game_map.grid.get_location(x, y) if x >= 0 else None for x, y in steps.tolist()]
+
+    @staticmethod
+    def _field_key(state: GameState) -> Hashable:
+        game_map = state.map.active
+        return (id(game_map), game_map.movement_generation)
+
+    def get_next_step(self, state: GameState, entity: BaseEntity, destination: TileCoordinate) -> TileCoordinate | None:
+        """Returns the next step of an entity toward a destination, advancing along its cached path when it is still valid."""
+        if self.cache_paths and isinstance(entity, AICharactor):
+            step = self._advance_cached_path(state, entity, destination)
+            if step is not None:
+                self.path_hits += 1
+                return step
+            
+            self.path_misses += 1
+
+        path = self._compute_path(state, entity, destination)
+
+        if self.cache_paths and isinstance(entity, AICharactor):
+            game_map = state.map.active
+            entity.path = path[1:self.max_path_length]
+            entity.path_target = destination.to_tuple
+            entity.path_generation = (id(game_map), game_map.movement_generation)
+
+        return path[0] if path else None
+
+    def _compute_path(self, state: GameState, entity: BaseEntity, destination: TileCoordinate) -> List[TileCoordinate]:
+        if self.pathing == 'hierarchical':
+            return self.get_area_path(state, entity, destination)
+        if self.pathing != 'flow':
+            return self.get_path_to(state, entity, destination)
+        
+        step = self.get_flow_step(state, entity, destination)
+        if step is None:
+            return []
+        
+        flow_field = self.get_flow_field(state, destination)
+        rest = flow_field.path_from(step.x, step.y, max_length=self.max_path_length - 1) if self.cache_paths else []
+        return [step] + [state.map.active.grid.get_location(x, y) for x, y in rest]
+
+    def _advance_cached_path(self, state: GameState, entity: AICharactor, destination: TileCoordinate) -> TileCoordinate | None:
+        """Pops and returns the next step of the entity's cached path, or clears the path and returns None when it is stale."""
+        game_map = state.map.active
+        if not entity.path or entity.path_target is None or entity.path_generation != (id(game_map), game_map.movement_generation):
+            entity.clear_path()
+            return None
+
+        target_drift = max(abs(destination.x - entity.path_target[0]), abs(destination.y - entity.path_target[1]))
+        step = entity.path[0]
+        step_distance = abs(step.x - entity.location.x) + abs(step.y - entity.location.y)
+        blocked = step.to_tuple != destination.to_tuple and step.to_tuple in state.roster.get_movement_costs(game_map, penalty=self.ENTITY_BLOCKED_PENALTY)
+
+        if target_drift > self.path_tolerance or step_distance != 1 or blocked:
+            entity.clear_path()
+            return None
+
+        entity.path = entity.path[1:]
+        return step
+
     def distance_to_target(self, entity: BaseEntity, target: BaseEntity) -> int | None:
         if target:
             dx = target.location.x - entity.location.x
@@ -125,7 +274,8 @@ class AIDispatcher(BaseEventDispatcher):
             state_action = self.create_action_on_target(self.MOVEMENT_ACTION, state, entity, target) # type: ignore
     
             if entity and target:
-                path = self.get_path_to(state, entity, target.location)
+                step = self.get_next_step(state, entity, target.location)
+                path = [step] if step is not None else []
             if path:
                 state_action.destination = path[0]  # Move to the next step in the path.
 
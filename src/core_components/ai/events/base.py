@@ -3,8 +3,15 @@
 # -*- coding: utf-8 -*-
 
 from __future__ import annotations
+from typing import Hashable
 
 
 class BaseGameEvent:
     message: str
+    coalescable: bool = False # Idempotent events are collapsed while an equal event is still queued
+
+    @property
+    def coalesce_key(self) -> Hashable:
+        """Events with equal keys are interchangeable while queued. Defaults to the event type."""
+        return type(self)
     
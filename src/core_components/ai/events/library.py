@@ -93,6 +93,8 @@ class GameOverEvent(SystemEvent):
 
 
 class FOVUpdateEvent(SystemEvent):
+    coalescable = True
+
     def __init__(self, message: str) -> None:
         super().__init__(message)
     """Triggers the FOV update for all entities."""
@@ -2,12 +2,13 @@
 # -*- coding: utf-8 -*-
 
 from __future__ import annotations
-from typing import List, Optional, Tuple, Type, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, Tuple, Type, TYPE_CHECKING
 
 from core_components.entities.attributes import *
 
 if TYPE_CHECKING:
     from core_components.ai.handlers import BaseHandler
+    from core_components.roster import Roster
 
 from core_components.ai.handlers import MobHandler
 from core_components.maps.tiles import TileCoordinate
@@ -16,13 +17,17 @@ from core_components.maps.tiles import TileCoordinate
 class BaseEntity:
     """
     A generic object to represent players, enemies, items, etc.
+
+    An entity spawned into a Roster keeps a reference to it in `roster` and reports its moves, blocking changes and death, so 
+    the roster can keep its indexes up to date without scanning every entity. The reference is dropped when the entity is copied.
     """
 
-    location: TileCoordinate
+    _location: TileCoordinate
     symbol: str
     color: Tuple[int, int, int]
     name: str
     is_spotted: bool = False # Is visible in another entity's FOV
+    roster: Roster | None = None # Roster notified when the entity moves
 
     def __init__(   self, 
                  location: TileCoordinate | None = None,
@@ -37,9 +42,25 @@ class BaseEntity:
         self.color = color
         self.name = name
 
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state.pop('roster', None)
+        return state
+
+    @property
+    def location(self) -> TileCoordinate:
+        return self._location
+    
+    @location.setter
+    def location(self, new_location: TileCoordinate) -> None:
+        old_location = self.__dict__.get('_location')
+        self._location = new_location
+        if self.roster is not None:
+            self.roster.entity_moved(self, old_location, new_location)
+
 
 class BlockingEntity(BaseEntity):
-    blocks_movement: bool = True
+    _blocks_movement: bool = True
 
     def __init__(   self, 
                     *, 
@@ -52,6 +73,17 @@ class BlockingEntity(BaseEntity):
         super().__init__(location=location, symbol=symbol, color=color, name=name)
         self.blocks_movement = blocks_movement
 
+    @property
+    def blocks_movement(self) -> bool:
+        return self._blocks_movement
+    
+    @blocks_movement.setter
+    def blocks_movement(self, blocks_movement: bool) -> None:
+        changed = blocks_movement != self._blocks_movement
+        self._blocks_movement = blocks_movement
+        if changed and self.roster is not None:
+            self.roster.entity_blocking_changed(self)
+
 
 class MobileEntity(BaseEntity):
     destination: TileCoordinate
@@ -128,7 +160,7 @@ class TargetableEntity(BaseEntity):
 class MortalEntity(BaseEntity):
     physical: PhysicalStats | None
     is_near_death: bool = False # Health is critically low
-    is_alive: bool = True # Entity is alive
+    _is_alive: bool = True # Entity is alive
     near_death_threshold: int = 3  # Health threshold to be considered near death
 
     def __init__(   self, 
@@ -142,6 +174,17 @@ class MortalEntity(BaseEntity):
         
         super().__init__(location=location, symbol=symbol, color=color, name=name)
         self.physical = physical
+
+    @property
+    def is_alive(self) -> bool:
+        return self._is_alive
+    
+    @is_alive.setter
+    def is_alive(self, is_alive: bool) -> None:
+        changed = is_alive != self._is_alive
+        self._is_alive = is_alive
+        if changed and self.roster is not None:
+            self.roster.entity_alive_changed(self)
     
     def take_damage(self, damage: int) -> None:
         if self.physical:
@@ -313,6 +356,8 @@ class PlayerCharactor(Charactor):
 
 class AICharactor(Charactor, AIEntity):
     path: List[TileCoordinate] = []
+    path_target: Tuple[int, int] | None = None # Target location the cached path was computed for
+    path_generation: Tuple[int, int] | None = None # (map id, movement generation) the cached path was computed on
     
     def __init__(   self,
                     *,
@@ -328,6 +373,13 @@ class AICharactor(Charactor, AIEntity):
         
         Charactor.__init__(self, location=location, symbol=symbol, color=color, name=name, fov_radius=fov_radius, physical=physical, combat=combat)
         AIEntity.__init__(self, location=location, symbol=symbol, color=color, name=name, ai_cls=ai_cls) 
+        self.clear_path()
+
+    def clear_path(self) -> None:
+        """Drops the cached path; each AICharactor owns its own path list."""
+        self.path = []
+        self.path_target = None
+        self.path_generation = None
 
 
     def die(self) -> None:
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+from copyreg import __newobj__
+from typing import Any, ClassVar, Dict, List, Tuple, Type
+import numpy as np
+from numpy.typing import ArrayLike
+
+from core_components.entities.library import BaseEntity, Charactor
+
+FLAG_BITS: Dict[str, int] = {'in_use': 1, 'has_physical': 2, 'is_alive': 4, 'blocks_movement': 8, 'is_spotted': 16, 
+                             'is_in_combat': 32, 'is_near_death': 64, 'is_targeting': 128}
+
+
+class _Column:
+    """Data descriptor reading and writing one column of the owner's store at the owner's slot."""
+    __slots__ = ("column",)
+
+    def __init__(self, column: str) -> None:
+        self.column = column
+
+    def __get__(self, owner: Any, owner_cls: type | None = None) -> Any:
+        if owner is None:
+            return self
+        return owner._store.columns[self.column][owner._slot].item()
+
+    def __set__(self, owner: Any, value: int) -> None:
+        owner._store.columns[self.column][owner._slot] = value
+
+
+class _Flag:
+    """Data descriptor reading and writing one bit of the flags column of the owner's store at the owner's slot."""
+    __slots__ = ("bit",)
+
+    def __init__(self, name: str) -> None:
+        self.bit = FLAG_BITS[name]
+
+    def __get__(self, owner: Any, owner_cls: type | None = None) -> Any:
+        if owner is None:
+            return self
+        return bool(owner._store.columns['flags'][owner._slot] & self.bit)
+
+    def __set__(self, owner: Any, value: bool) -> None:
+        flags = owner._store.columns['flags']
+        if value:
+            flags[owner._slot] |= self.bit
+        else:
+            flags[owner._slot] &= ~np.uint8(self.bit)
+
+
+class _StoredView:
+    """Base of the view classes. A stored object keeps its class with the view mixed in; the attributes named in `_stored` live
+    in the store, everything else stays in the object. Copies are detached: they get the original class and plain attributes."""
+    _store: EntityStore
+    _slot: int
+    _stored: ClassVar[Tuple[str, ...]] = ()
+    _unstored_cls: ClassVar[type]
+
+    def __reduce_ex__(self, protocol: Any) -> Tuple[Any, ...]:
+        state = {name: value for name, value in self.__dict__.items() if name not in ('roster', '_store', '_slot')}
+        state.update(self._stored_values())
+        return (__newobj__, (self._unstored_cls,), state)
+
+    def _stored_values(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self._stored}
+
+
+class _EntityView(_StoredView):
+    _stored = ('fov_radius', 'near_death_threshold', 'is_spotted', 'is_in_combat', 'is_near_death', 'is_targeting', '_is_alive', 
+               '_blocks_movement')
+
+    fov_radius = _Column('fov_radius')
+    near_death_threshold = _Column('near_death_threshold')
+    is_spotted = _Flag('is_spotted')
+    is_in_combat = _Flag('is_in_combat')
+    is_near_death = _Flag('is_near_death')
+    is_targeting = _Flag('is_targeting')
+    _is_alive = _Flag('is_alive')
+    _blocks_movement = _Flag('blocks_movement')
+
+    def _set_location(self, new_location: Any) -> None:
+        BaseEntity.location.fset(self, new_location) # type: ignore
+        self._store.columns['x'][self._slot] = new_location.x
+        self._store.columns['y'][self._slot] = new_location.y
+
+    location = property(BaseEntity.location.fget, _set_location)
+
+
+class _PhysicalView(_StoredView):
+    _stored = ('_hp', 'max_hp')
+
+    _hp = _Column('hp')
+    max_hp = _Column('max_hp')
+
+
+class _CombatView(_StoredView):
+    _stored = ('attack_power', 'defense')
+
+    attack_power = _Column('attack_power')
+    defense = _Column('defense')
+
+
+class EntityStore:
+    """An opt-in columnar store for the stats, positions and flags of charactors, so many of them can be processed with NumPy.
+
+    Each charactor added to the store gets a slot: its x, y, hp, max_hp, attack_power, defense, fov_radius, near death threshold 
+    and flag bits live in parallel arrays at that index. The charactor and its PhysicalStats and CombatStats keep working as 
+    before, but become thin views over the arrays, so changes made through the objects and changes made to the arrays are the 
+    same changes. The location object stays authoritative; x and y mirror it on every move. Slots of removed charactors are 
+    reused and the arrays double in size when they are full.
+
+    The arrays returned by `column` and `flag` are read-only; `apply_damage` writes hp and the flags in bulk and reports deaths
+    through the charactors, so a roster they belong to is notified as usual.
+    """
+
+    COLUMNS: ClassVar[Dict[str, Type[np.integer]]] = {'x': np.int32, 'y': np.int32, 'hp': np.int32, 'max_hp': np.int32,
+                                                       'attack_power': np.int32, 'defense': np.int32, 'fov_radius': np.int32,
+                                                       'near_death_threshold': np.int32, 'flags': np.uint8}
+    FLAGS: ClassVar[Dict[str, int]] = FLAG_BITS
+    _view_classes: ClassVar[Dict[Tuple[type, type], type]] = {}
+
+    columns: Dict[str, np.ndarray]
+    entities: List[Charactor | None]
+    _free: List[int]
+
+    def __init__(self, capacity: int = 64) -> None:
+        if capacity < 1:
+            raise ValueError("The entity store needs a positive capacity.")
+
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.COLUMNS.items()}
+        self.entities = [None] * capacity
+        self._free = list(range(capacity - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return len(self.entities) - len(self._free)
+
+    def __contains__(self, entity: object) -> bool:
+        return getattr(entity, '_store', None) is self
+
+    @property
+    def capacity(self) -> int:
+        return len(self.entities)
+
+    @property
+    def active(self) -> np.ndarray:
+        """Which slots hold a charactor."""
+        return self.flag('in_use')
+
+    def column(self, name: str) -> np.ndarray:
+        view = self.columns[name].view()
+        view.flags.writeable = False
+        return view
+
+    def flag(self, name: str) -> np.ndarray:
+        return (self.columns['flags'] & self.FLAGS[name]) != 0
+
+    def slot_of(self, entity: Charactor) -> int:
+        if entity not in self:
+            raise ValueError(f"{entity.name} is not in this entity store.")
+        return entity._slot # type: ignore
+
+    def add(self, entity: Charactor) -> int:
+        """Moves the charactor's stats, position and flags into a free slot and returns the slot."""
+        if entity in self:
+            return entity._slot # type: ignore
+        if not isinstance(entity, Charactor) or getattr(entity, '_store', None) is not None:
+            raise ValueError(f"{entity.name} cannot be added to this entity store.")
+
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        physical, combat = entity.physical, entity.combat
+        location = entity.__dict__.get('_location')
+
+        columns = self.columns
+        for column in columns.values():
+            column[slot] = 0
+        if location is not None:
+            columns['x'][slot], columns['y'][slot] = location.x, location.y
+        columns['flags'][slot] = self.FLAGS['in_use'] | (self.FLAGS['has_physical'] if physical is not None else 0)
+
+        self._attach(entity, _EntityView, slot)
+        if physical is not None:
+            self._attach(physical, _PhysicalView, slot)
+        if combat is not None:
+            self._attach(combat, _CombatView, slot)
+        self.entities[slot] = entity
+        return slot
+
+    def remove(self, entity: Charactor) -> None:
+        """Gives the charactor its stats, position and flags back as plain attributes and frees its slot."""
+        if entity not in self:
+            return
+
+        slot = self.slot_of(entity)
+        for stats in (entity.physical, entity.combat):
+            if isinstance(stats, _StoredView):
+                self._detach(stats)
+        self._detach(entity)
+        self.columns['flags'][slot] = 0
+        self.entities[slot] = None
+        self._free.append(slot)
+
+    def distances_to(self, x: int, y: int) -> np.ndarray:
+        """The Chebyshev distance of every slot to (x, y), as used for the combat ranges."""
+        return np.maximum(np.abs(self.columns['x'] - x), np.abs(self.columns['y'] - y))
+
+    def in_range(self, x: int, y: int, radius: int) -> np.ndarray:
+        """The slots of the live charactors within a Chebyshev radius of (x, y)."""
+        return np.flatnonzero(self.flag('in_use') & self.flag('is_alive') & (self.distances_to(x, y) <= radius))
+
+    def attack_damage(self, attackers: ArrayLike, targets: ArrayLike) -> np.ndarray:
+        """The damage of each attacker slot against the matching target slot: attack power less defense, at least 0."""
+        attackers, targets = np.asarray(attackers, dtype=np.intp), np.asarray(targets, dtype=np.intp)
+        return np.maximum(0, self.columns['attack_power'][attackers] - self.columns['defense'][targets])
+
+    def apply_damage(self, slots: ArrayLike, damage: ArrayLike) -> np.ndarray:
+        """Deals damage to the given slots at once, following `MortalEntity.take_damage`: hp is kept within [0, max_hp],
+        charactors at or below their near death threshold are flagged, and those without hp left die. Damage to the same slot
+        adds up. Returns the slots of the charactors that died."""
+        slots = np.asarray(slots, dtype=np.intp).ravel()
+        damage = np.broadcast_to(np.asarray(damage, dtype=np.int32), slots.shape)
+        mortal = self.flag('has_physical')[slots]
+        hit, damage = slots[mortal], damage[mortal]
+        if hit.size == 0:
+            return hit
+
+        totals = np.zeros(self.capacity, dtype=np.int64)
+        np.add.at(totals, hit, damage)
+        hit = np.unique(hit)
+        columns = self.columns
+        columns['hp'][hit] = np.clip(columns['hp'][hit] - totals[hit], 0, columns['max_hp'][hit])
+
+        near_death = hit[columns['hp'][hit] <= columns['near_death_threshold'][hit]]
+        columns['flags'][near_death] |= self.FLAGS['is_near_death']
+        died = hit[(columns['hp'][hit] <= 0) & self.flag('is_alive')[hit]]
+        for slot in died.tolist():
+            self.entities[slot].is_alive = False # type: ignore
+        return died
+
+    def _grow(self) -> None:
+        capacity = self.capacity
+        for name, column in self.columns.items():
+            self.columns[name] = np.concatenate((column, np.zeros_like(column)))
+        self.entities.extend([None] * capacity)
+        self._free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def _attach(self, owner: Any, view: type, slot: int) -> None:
+        values = {name: getattr(owner, name) for name in view._stored} # type: ignore
+        for name in view._stored: # type: ignore
+            owner.__dict__.pop(name, None)
+        owner.__class__ = self._view_class(type(owner), view)
+        owner._store, owner._slot = self, slot
+        for name, value in values.items():
+            setattr(owner, name, value)
+
+    @staticmethod
+    def _detach(owner: _StoredView) -> None:
+        values = owner._stored_values()
+        owner.__class__ = owner._unstored_cls
+        del owner._store, owner._slot # type: ignore
+        owner.__dict__.update(values)
+
+    @classmethod
+    def _view_class(cls, base: type, view: type) -> type:
+        view_class = cls._view_classes.get((base, view))
+        if view_class is None:
+            view_class = cls._view_classes[(base, view)] = type(f"Stored{base.__name__}", (view, base), {'_unstored_cls': base})
+        return view_class
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+from os import PathLike
+from typing import Any, Callable, Hashable, Iterable, List, OrderedDict, Tuple
+import numpy as np
+from tcod.map import compute_fov
+
+
+class FOVCache:
+    """A least-recently-used cache of field-of-view results. A GraphicTileMap keys its results on (x, y, radius, algorithm,
+    vision generation); the vision generation changes whenever a tile's vision-blocking bit changes, so stale results are never
+    returned and simply age out of the cache. Cached results are read-only and shared between callers.
+    
+    The cache is not thread-safe: look up and store results on one thread, and only hand the computation itself to workers."""
+
+    maxsize: int
+    hits: int
+    misses: int
+    _entries: OrderedDict[Hashable, np.ndarray]
+
+    def __init__(self, maxsize: int = 256) -> None:
+        if maxsize < 1:
+            raise ValueError("The FOV cache size must be a positive integer.")
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self), 'maxsize': self.maxsize}
+
+    def get(self, key: Hashable, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        """Returns the cached result for a key, computing and caching it on a miss. The least recently used result is evicted
+        when the cache is full."""
+        result = self.lookup(key)
+        if result is None:
+            result = self.store(key, compute())
+
+        return result
+
+    def lookup(self, key: Hashable) -> np.ndarray | None:
+        """Returns the cached result for a key and counts a hit, or counts a miss and returns None."""
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return result
+
+    def store(self, key: Hashable, result: np.ndarray) -> np.ndarray:
+        """Caches a result as read-only, evicting the least recently used result when the cache is full, and returns it."""
+        result.flags.writeable = False
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+        return result
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class VisibilityTable:
+    """A precomputed table of the tiles visible from every open tile of a static level, for one FOV radius and algorithm.
+
+    For each open tile, the field of view inside the (2 * radius + 1) square window centred on it is stored as a row of 
+    `np.packbits` bits. Fields of view never reach past their radius, so computing them on the window alone gives the same 
+    result as on the whole map. A 100x100 level at radius 8 needs 37 bytes per open tile. Field of view queries then unpack one 
+    row, and line of sight checks read a single bit.
+
+    A table is only valid for the transparency it was built from; `matches` checks this, e.g. after loading a saved table."""
+
+    radius: int
+    algorithm: int
+    shape: Tuple[int, int]
+    rows: np.ndarray
+    packed: np.ndarray
+    packed_transparency: np.ndarray
+
+    def __init__(self, rows: np.ndarray, packed: np.ndarray, packed_transparency: np.ndarray, radius: int, algorithm: int) -> None:
+        self.rows = rows
+        self.packed = packed
+        self.packed_transparency = packed_transparency
+        self.shape = rows.shape # type: ignore
+        self.radius = radius
+        self.algorithm = algorithm
+
+    @property
+    def window(self) -> int:
+        return 2 * self.radius + 1
+
+    @property
+    def nbytes(self) -> int:
+        return self.rows.nbytes + self.packed.nbytes + self.packed_transparency.nbytes
+
+    @classmethod
+    def build(cls, transparency: np.ndarray, radius: int, algorithm: int) -> VisibilityTable:
+        """Computes the visibility of every open tile in `transparency`."""
+        if radius < 1:
+            raise ValueError("A visibility table needs a positive FOV radius.")
+        
+        width, height = transparency.shape
+        window = 2 * radius + 1
+        open_x, open_y = np.nonzero(transparency)
+        rows = np.full(transparency.shape, fill_value=-1, dtype=np.int32)
+        rows[open_x, open_y] = np.arange(len(open_x), dtype=np.int32)
+        packed = np.zeros((len(open_x), -(-window * window // 8)), dtype=np.uint8)
+
+        visible_window = np.zeros((window, window), dtype=bool)
+        for row, (x, y) in enumerate(zip(open_x.tolist(), open_y.tolist())):
+            x_start, x_stop = max(0, x - radius), min(width, x + radius + 1)
+            y_start, y_stop = max(0, y - radius), min(height, y + radius + 1)
+            local_transparency = np.ascontiguousarray(transparency[x_start:x_stop, y_start:y_stop])
+            visible_window[:] = False
+            visible_window[x_start - x + radius:x_stop - x + radius, y_start - y + radius:y_stop - y + radius] = \
+                compute_fov(local_transparency, (x - x_start, y - y_start), radius=radius, algorithm=algorithm)
+            packed[row] = np.packbits(visible_window)
+
+        return cls(rows, packed, np.packbits(transparency), radius, algorithm)
+
+    def matches(self, transparency: np.ndarray) -> bool:
+        """Returns True when the table was built from this transparency mask."""
+        return transparency.shape == self.shape and np.array_equal(np.packbits(transparency), self.packed_transparency)
+
+    def covers(self, x: int, y: int, radius: int, algorithm: int) -> bool:
+        """Returns True when the table holds the field of view from (x, y) for this radius and algorithm."""
+        return radius == self.radius and algorithm == self.algorithm and 0 <= x < self.shape[0] and 0 <= y < self.shape[1] \
+            and self.rows[x, y] >= 0
+
+    def visible_from(self, x: int, y: int) -> np.ndarray:
+        """Returns the field of view from the open tile (x, y) as a mask of the whole map."""
+        radius = self.radius
+        visible_window = np.unpackbits(self.packed[self.rows[x, y]], count=self.window * self.window).reshape(self.window, self.window)
+        x_start, x_stop = max(0, x - radius), min(self.shape[0], x + radius + 1)
+        y_start, y_stop = max(0, y - radius), min(self.shape[1], y + radius + 1)
+        visible = np.zeros(self.shape, dtype=bool)
+        visible[x_start:x_stop, y_start:y_stop] = visible_window[x_start - x + radius:x_stop - x + radius, y_start - y + radius:y_stop - y + radius]
+        return visible
+
+    def is_visible(self, x: int, y: int, target_x: int, target_y: int) -> bool:
+        """Returns True when (target_x, target_y) is in the field of view from the open tile (x, y)."""
+        dx, dy = target_x - x + self.radius, target_y - y + self.radius
+        if not (0 <= dx < self.window and 0 <= dy < self.window):
+            return False
+        
+        bit = dx * self.window + dy
+        return bool(self.packed[self.rows[x, y], bit >> 3] & (0x80 >> (bit & 7)))
+
+    def save(self, file: str | PathLike) -> None:
+        """Saves the table to an .npz file, e.g. next to a memory-mapped level."""
+        np.savez(file, rows=self.rows, packed=self.packed, packed_transparency=self.packed_transparency, 
+                 radius=self.radius, algorithm=self.algorithm)
+
+    @classmethod
+    def load(cls, file: str | PathLike) -> VisibilityTable:
+        with np.load(file) as data:
+            return cls(data['rows'], data['packed'], data['packed_transparency'], int(data['radius']), int(data['algorithm']))
+
+    @staticmethod
+    def save_tables(file: str | PathLike, tables: Iterable[VisibilityTable]) -> None:
+        """Saves several tables to one .npz file, e.g. every table of a memory-mapped level."""
+        arrays = {}
+        for idx, table in enumerate(tables):
+            arrays.update({f"{idx}_rows": table.rows, f"{idx}_packed": table.packed, f"{idx}_packed_transparency": table.packed_transparency, 
+                           f"{idx}_radius": table.radius, f"{idx}_algorithm": table.algorithm})
+        np.savez(file, **arrays)
+
+    @classmethod
+    def load_tables(cls, file: str | PathLike) -> List[VisibilityTable]:
+        with np.load(file) as data:
+            n_tables = len(data.files) // 5
+            return [cls(data[f"{idx}_rows"], data[f"{idx}_packed"], data[f"{idx}_packed_transparency"], int(data[f"{idx}_radius"]), 
+                        int(data[f"{idx}_algorithm"])) for idx in range(n_tables)]
@@ -37,21 +37,28 @@ class DungeonGenerator(BaseMapGenerator):
     def generate(self, 
                  max_rooms: int=10, 
                  min_room_size: int=5, 
-                 max_room_size: int=20) -> DefaultTileMap:
+                 max_room_size: int=20,
+                 visibility_radius: int=0,
+                 area_graph_chunk_size: int=0) -> DefaultTileMap:
+        """Generates a dungeon. A positive `visibility_radius` precomputes the FOV_SHADOW visibility table of the finished walls, and 
+        a positive `area_graph_chunk_size` builds the hierarchical path graph of its areas."""
         #TODO Use LLM to generate more complex dungeons
         dungeon = self.spawn_map()
         
         self.add_rooms(dungeon=dungeon, max_rooms=max_rooms, min_room_size=min_room_size, max_room_size=max_room_size)
         self.add_corridors(dungeon=dungeon)
-        for area in dungeon.areas.values():
-            dungeon.set_tiles(area.to_mask, "floor")
+        dungeon.paint_many((area.to_mask, "floor") for area in dungeon.areas.values())
         dungeon.update_state()
+        if visibility_radius > 0:
+            dungeon.precompute_visibility(visibility_radius)
+        if area_graph_chunk_size > 0:
+            dungeon.build_area_graph(area_graph_chunk_size)
 
         return dungeon
     
     def spawn_map(self) -> DefaultTileMap:
         """Spawn a new map instance based on the generator's template."""
-        dungeon = deepcopy(self.map_template)
+        dungeon = self.map_template.clone()
         self.width = dungeon.grid.width
         self.height = dungeon.grid.height
         dungeon.set_tiles(graphic_name='wall') # Initialize all tiles as walls
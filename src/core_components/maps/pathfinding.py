@@ -0,0 +1,615 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+from collections import Counter, OrderedDict
+from heapq import heappop, heappush
+from time import perf_counter
+from typing import Any, Container, Dict, Hashable, Iterable, Iterator, List, Tuple, TYPE_CHECKING
+import numpy as np
+from numpy.typing import ArrayLike
+import tcod.path
+
+if TYPE_CHECKING:
+    from core_components.maps.tilemaps.base import GraphicTileMap
+
+# Steps considered when descending a flow field, in tie-breaking order
+CARDINAL_STEPS: Tuple[Tuple[int, int], ...] = ((0, -1), (0, 1), (-1, 0), (1, 0))
+DIAGONAL_STEPS: Tuple[Tuple[int, int], ...] = ((-1, -1), (1, -1), (-1, 1), (1, 1))
+
+
+class FlowField:
+    """A Dijkstra distance map rooted at one or more goal tiles. The distance of a tile is the cost of walking from it to the
+    nearest root, so every mob chasing the same goal can take its next step by descending the field instead of running its
+    own path search.
+
+    Costs follow `tcod.path.SimpleGraph`: a cost of 0 blocks a tile, and a positive cost is paid to step onto it.
+    """
+
+    roots: Tuple[Tuple[int, int], ...]
+    distance: np.ndarray
+    cardinal: int
+    diagonal: int
+
+    def __init__(self, cost: np.ndarray, roots: Iterable[Tuple[int, int]], cardinal: int = 2, diagonal: int = 0) -> None:
+        self.roots = tuple((int(x), int(y)) for x, y in roots)
+        self.cardinal = cardinal
+        self.diagonal = diagonal
+
+        graph = tcod.path.SimpleGraph(cost=cost, cardinal=cardinal, diagonal=diagonal)
+        pathfinder = tcod.path.Pathfinder(graph)
+        for root in self.roots:
+            pathfinder.add_root(root)
+        pathfinder.resolve()
+
+        self.distance = pathfinder.distance
+        self.distance.flags.writeable = False
+
+    @property
+    def unreachable(self) -> int:
+        """The distance of tiles that cannot reach a root."""
+        return int(np.iinfo(self.distance.dtype).max)
+
+    @property
+    def steps(self) -> Tuple[Tuple[int, int], ...]:
+        return CARDINAL_STEPS + (DIAGONAL_STEPS if self.diagonal else ())
+
+    def is_reachable(self, x: int, y: int) -> bool:
+        return int(self.distance[x, y]) != self.unreachable
+
+    def next_step(self, x: int, y: int, occupied: Container[Tuple[int, int]] = (), occupied_penalty: int = 0) -> Tuple[int, int] | None:
+        """Returns the neighbouring tile that descends the field fastest from (x, y), or None when no neighbour reaches a root.
+
+        Tiles in `occupied` cost `occupied_penalty` extra, so mobs route around each other using their current positions
+        without the field having to be rebuilt every time one of them moves. Roots are never penalised.
+        """
+        width, height = self.distance.shape
+        best_step, best_score = None, self.unreachable
+        for dx, dy in self.steps:
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                continue
+
+            distance = int(self.distance[nx, ny])
+            if distance == self.unreachable:
+                continue
+
+            score = distance + (occupied_penalty if (nx, ny) in occupied and (nx, ny) not in self.roots else 0)
+            if score < best_score:
+                best_step, best_score = (nx, ny), score
+
+        return best_step
+
+    def path_from(self, x: int, y: int, max_length: int | None = None) -> List[Tuple[int, int]]:
+        """Returns the steps from (x, y) down to a root, excluding (x, y) itself."""
+        path: List[Tuple[int, int]] = []
+        position = (x, y)
+        while position not in self.roots and (max_length is None or len(path) < max_length):
+            step = self.next_step(*position)
+            if step is None or self.distance[step] >= self.distance[position]:
+                break
+            path.append(step)
+            position = step
+
+        return path
+
+
+class PathService:
+    """Answers the path queries of a turn in one batch. The (start, goal) pairs are grouped by goal and each goal gets one flow field, 
+    rooted at the goal and kept for later turns until `max_fields` newer ones push it out. Fields are cached per goal and `key`, 
+    which callers should change whenever the cost grid changes, e.g. to the map's movement generation.
+
+    Results are plain coordinate arrays: one (n, 2) array of next steps by default, or one (k, 2) array per pair for full paths. 
+    `stats` counts the batches, pairs and field builds and times them.
+    """
+
+    max_fields: int
+    cardinal: int
+    diagonal: int
+    fields: OrderedDict[Hashable, FlowField]
+    counters: Counter[str]
+    timings: Counter[str]
+
+    def __init__(self, max_fields: int = 8, cardinal: int = 2, diagonal: int = 0) -> None:
+        if max_fields < 1:
+            raise ValueError("The path service must keep at least one flow field.")
+        
+        self.max_fields = max_fields
+        self.cardinal = cardinal
+        self.diagonal = diagonal
+        self.fields = OrderedDict()
+        self.counters = Counter()
+        self.timings = Counter()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, **{f'{name}_seconds': seconds for name, seconds in self.timings.items()}, 'fields': len(self.fields)}
+    
+    @property
+    def steps(self) -> Tuple[Tuple[int, int], ...]:
+        return CARDINAL_STEPS + (DIAGONAL_STEPS if self.diagonal else ())
+
+    def clear(self) -> None:
+        self.fields.clear()
+        self.counters.clear()
+        self.timings.clear()
+
+    def flow_field(self, cost: np.ndarray, goal: Tuple[int, int], key: Hashable = None) -> FlowField:
+        """Returns the flow field rooted at a goal, building it from `cost` unless it is cached under the same key."""
+        field_key = (key, int(goal[0]), int(goal[1]))
+        flow_field = self.fields.get(field_key)
+        if flow_field is not None:
+            self.counters['field_hits'] += 1
+            self.fields.move_to_end(field_key)
+            return flow_field
+        
+        start_time = perf_counter()
+        flow_field = self.fields[field_key] = FlowField(cost, [goal], cardinal=self.cardinal, diagonal=self.diagonal)
+        self.timings['build'] += perf_counter() - start_time
+        self.counters['fields_built'] += 1
+        if len(self.fields) > self.max_fields:
+            self.fields.popitem(last=False)
+
+        return flow_field
+
+    def next_steps(self, cost: np.ndarray, pairs: ArrayLike, key: Hashable = None, occupied: np.ndarray | None = None, 
+                   occupied_penalty: int = 0) -> np.ndarray:
+        """Returns the next step of each (start, goal) pair as an (n, 2) array, with (-1, -1) where the start is the goal or no 
+        neighbour reaches it. Steps match `FlowField.next_step`; tiles where `occupied` is nonzero cost `occupied_penalty` extra, 
+        except the goal itself."""
+        starts, goals = self._split_pairs(pairs)
+        steps = np.full(starts.shape, fill_value=-1, dtype=np.int32)
+        offsets = np.array(self.steps, dtype=np.int32)
+
+        for goal, members in self._group_by_goal(goals):
+            distance = self.flow_field(cost, goal, key).distance
+            start_time = perf_counter()
+            unreachable = int(np.iinfo(distance.dtype).max)
+            members = members[(starts[members, 0] != goal[0]) | (starts[members, 1] != goal[1])]
+
+            neighbours = starts[members, None, :] + offsets[None, :, :]
+            inbounds = (neighbours >= 0).all(axis=2) & (neighbours[..., 0] < distance.shape[0]) & (neighbours[..., 1] < distance.shape[1])
+            clipped = np.clip(neighbours, 0, np.array(distance.shape) - 1)
+            scores = np.where(inbounds, distance[clipped[..., 0], clipped[..., 1]], unreachable).astype(np.int64)
+            reachable = scores != unreachable
+            if occupied is not None and occupied_penalty:
+                is_goal = (clipped[..., 0] == goal[0]) & (clipped[..., 1] == goal[1])
+                scores += np.where(reachable & ~is_goal & (occupied[clipped[..., 0], clipped[..., 1]] != 0), occupied_penalty, 0)
+            scores[~reachable] = np.iinfo(np.int64).max
+
+            best = np.argmin(scores, axis=1)
+            found = reachable[np.arange(len(members)), best]
+            steps[members[found]] = neighbours[np.arange(len(members)), best][found]
+            self.timings['query'] += perf_counter() - start_time
+
+        self.counters['batches'] += 1
+        self.counters['pairs'] += len(starts)
+        return steps
+
+    def paths(self, cost: np.ndarray, pairs: ArrayLike, key: Hashable = None, max_length: int | None = None) -> List[np.ndarray]:
+        """Returns the full path of each (start, goal) pair as a (k, 2) array of steps excluding the start, empty when the goal 
+        cannot be reached."""
+        starts, goals = self._split_pairs(pairs)
+        paths: List[np.ndarray] = [np.empty((0, 2), dtype=np.int32)] * len(starts)
+
+        for goal, members in self._group_by_goal(goals):
+            flow_field = self.flow_field(cost, goal, key)
+            start_time = perf_counter()
+            for member in members.tolist():
+                path = flow_field.path_from(int(starts[member, 0]), int(starts[member, 1]), max_length=max_length)
+                if path:
+                    paths[member] = np.array(path, dtype=np.int32)
+            self.timings['query'] += perf_counter() - start_time
+
+        self.counters['batches'] += 1
+        self.counters['pairs'] += len(starts)
+        return paths
+
+    @staticmethod
+    def _split_pairs(pairs: ArrayLike) -> Tuple[np.ndarray, np.ndarray]:
+        pairs = np.asarray(pairs, dtype=np.int32).reshape(-1, 2, 2)
+        return pairs[:, 0], pairs[:, 1]
+    
+    @staticmethod
+    def _group_by_goal(goals: np.ndarray) -> Iterator[Tuple[Tuple[int, int], np.ndarray]]:
+        if not len(goals):
+            return
+        
+        unique_goals, goal_of_pair = np.unique(goals, axis=0, return_inverse=True)
+        goal_of_pair = goal_of_pair.reshape(-1)
+        for index, (x, y) in enumerate(unique_goals.tolist()):
+            yield (x, y), np.flatnonzero(goal_of_pair == index)
+
+
+def terrain_cost(blocks_movement: np.ndarray) -> np.ndarray:
+    """Returns the cost of stepping onto each tile of a movement-blocking mask, as every path search charges it: 1 for open tiles 
+    and 2 for tiles blocking movement, which are expensive but not impassable."""
+    return np.array(blocks_movement, dtype=np.int16) + 1
+
+
+class MovementCostGrid:
+    """The cost of stepping onto each tile of a map, maintained incrementally instead of rebuilt for every path search.
+
+    The terrain cost follows `terrain_cost`: 1 for open tiles and 2 for tiles blocking movement. It is read from the map once and 
+    only re-read when the map's movement generation changes. Tiles occupied by movement-blocking entities cost `penalty` extra per 
+    entity. The occupancy counts are not copied: the grid reads the (width, height) array it is given, which its owner keeps up to 
+    date, and `update` re-applies the penalty of a tile after its count changed. The arrays returned by `terrain` and `cost` are 
+    read-only views of the grid's own storage.
+    """
+
+    tile_map: GraphicTileMap
+    penalty: int
+    generation: int
+    occupancy: np.ndarray
+    _terrain: np.ndarray
+    _cost: np.ndarray
+
+    def __init__(self, tile_map: GraphicTileMap, occupancy: np.ndarray, penalty: int = 10) -> None:
+        if occupancy.shape != (tile_map.grid.width, tile_map.grid.height):
+            raise ValueError("The occupancy grid must match the shape of the tile map.")
+
+        self.tile_map = tile_map
+        self.penalty = penalty
+        self.occupancy = occupancy
+        self._bake_terrain()
+
+    def __contains__(self, location: object) -> bool:
+        """Returns True when an (x, y) tile is occupied by at least one movement-blocking entity."""
+        try:
+            x, y = location # type: ignore
+            return 0 <= x < self.occupancy.shape[0] and 0 <= y < self.occupancy.shape[1] and bool(self.occupancy[x, y])
+        
+        except (TypeError, ValueError):
+            return False
+
+    @property
+    def terrain(self) -> np.ndarray:
+        """The terrain cost of each tile, without the entity penalties."""
+        self.refresh()
+        return self._read_only(self._terrain)
+
+    @property
+    def cost(self) -> np.ndarray:
+        """The terrain cost of each tile plus the penalty of the entities occupying it."""
+        self.refresh()
+        return self._read_only(self._cost)
+
+    def refresh(self) -> None:
+        """Re-reads the terrain when the map's movement-blocking tiles have changed since it was baked."""
+        if self.generation != self.tile_map.movement_generation:
+            self._bake_terrain()
+
+    def update(self, x: int, y: int) -> None:
+        """Re-applies the entity penalty of a tile after its occupancy count changed."""
+        self._cost[x, y] = self._terrain[x, y] + self.penalty * int(self.occupancy[x, y])
+
+    def _bake_terrain(self) -> None:
+        self.generation = self.tile_map.movement_generation
+        self._terrain = terrain_cost(self.tile_map.blocks_movement)
+        self._cost = self._terrain + self.penalty * self.occupancy.astype(np.int32)
+
+    @staticmethod
+    def _read_only(array: np.ndarray) -> np.ndarray:
+        view = array.view()
+        view.flags.writeable = False
+        return view
+
+
+
+
+class AreaGraph:
+    """An abstract graph of a map's areas for hierarchical (HPA*-style) pathfinding on large maps.
+
+    Walkable tiles are split into clusters. Each area given becomes a cluster, claiming its tiles in the order given, and the 
+    remaining walkable tiles are clustered along a grid of `chunk_size` squares. Compact areas such as rooms make good clusters; long 
+    ones such as corridors are better left to the grid so that local searches stay small. Clusters are then split into their 
+    connected pieces. Each stretch of border between two clusters gets one pair of portal tiles near its middle, and the cost between 
+    every two portals of a cluster is computed once.
+
+    A query routes through the cluster graph with A* first, then picks the cheapest portals along that route and stitches the local 
+    paths between them together, so only the tiles around its two ends are searched. Local paths between portals are found on first 
+    use and kept. Paths are near-optimal: the route is chosen on the distances between cluster centres.
+
+    Measured with benchmarks/bench_area_graph.py on generated dungeons with 32-tile chunks: at 1000x1000 the graph takes about 9 s 
+    to build and a query about 7 ms cold and 1.5 ms warm, so queries miss a 1 ms budget until their local paths are kept. At 
+    200x200 paths cost 1.34 times the cheapest path on average and up to 1.96 times. Build graphs with the map, not during a turn.
+
+    Costs follow `tcod.path.SimpleGraph`: a cost of 0 blocks a tile, and a positive cost is paid to step onto it.
+    """
+
+    chunk_size: int
+    cost: np.ndarray
+    labels: np.ndarray
+    cluster_bounds: np.ndarray
+    cluster_centres: List[Tuple[float, float]]
+    cluster_nodes: List[List[int]]
+    cluster_edges: List[Dict[int, float]]
+    crossings: Dict[Tuple[int, int], List[Tuple[int, int]]]
+    nodes: List[Tuple[int, int]]
+    edges: List[Dict[int, int]]
+    _paths: Dict[Tuple[int, int], List[Tuple[int, int]]]
+    _window_costs: Dict[int, np.ndarray]
+
+    def __init__(self, cost: np.ndarray, areas: Iterable[np.ndarray] = (), chunk_size: int = 32) -> None:
+        if chunk_size < 1:
+            raise ValueError("The cluster chunk size must be a positive integer.")
+        
+        self.chunk_size = chunk_size
+        self.cost = np.array(cost, dtype=np.int32)
+        self.cost.flags.writeable = False
+        self._paths = {}
+        self._window_costs = {}
+
+        self._label_clusters(self.cost > 0, areas)
+        self._find_portals()
+        self._connect_portals()
+
+    @property
+    def n_clusters(self) -> int:
+        return len(self.cluster_nodes)
+    
+    @property
+    def n_nodes(self) -> int:
+        return len(self.nodes)
+
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]] | None:
+        """Returns the steps from `start` to `goal`, excluding `start`, or None when either end is blocked or no path exists."""
+        start, goal = (int(start[0]), int(start[1])), (int(goal[0]), int(goal[1]))
+        start_cluster, goal_cluster = int(self.labels[start]), int(self.labels[goal])
+        if start_cluster < 0 or goal_cluster < 0:
+            return None
+        
+        start_search = self._local_search(start_cluster, start)
+        if start_cluster == goal_cluster:
+            return self._path_to_root(start_search, goal)[::-1][1:]
+        
+        route = self._route_clusters(start_cluster, goal_cluster)
+        if route is None:
+            return None
+        
+        goal_search = self._local_search(goal_cluster, goal)
+        crossings = self._pick_crossings(route, start_search, goal, goal_search)
+
+        path = self._path_to_root(start_search, self.nodes[crossings[0][0]])[::-1][1:]
+        for index, (_, entry) in enumerate(crossings):
+            path.append(self.nodes[entry])
+            if index + 1 < len(crossings):
+                path += self._portal_path(entry, crossings[index + 1][0])
+        path += self._path_to_root(goal_search, self.nodes[crossings[-1][1]])[1:]
+
+        return path
+
+    def _label_clusters(self, walkable: np.ndarray, areas: Iterable[np.ndarray]) -> None:
+        width, height = walkable.shape
+        raw_labels = np.full(walkable.shape, fill_value=-1, dtype=np.int64)
+        n_areas = 0
+        for n_areas, mask in enumerate(areas, start=1):
+            raw_labels[mask & walkable & (raw_labels < 0)] = n_areas - 1
+
+        chunks_y = -(-height // self.chunk_size)
+        chunk_labels = n_areas + (np.arange(width) // self.chunk_size)[:, None] * chunks_y + (np.arange(height) // self.chunk_size)[None, :]
+        raw_labels = np.where(raw_labels >= 0, raw_labels, chunk_labels)
+
+        _, cluster_of_tile = np.unique(_connected_pieces(raw_labels, walkable)[walkable], return_inverse=True)
+        self.labels = np.full(walkable.shape, fill_value=-1, dtype=np.int32)
+        self.labels[walkable] = cluster_of_tile
+        self.labels.flags.writeable = False
+
+        n_clusters = int(cluster_of_tile.max()) + 1 if len(cluster_of_tile) else 0
+        tile_x, tile_y = np.nonzero(walkable)
+        order = np.argsort(cluster_of_tile, kind='stable')
+        starts = np.searchsorted(cluster_of_tile[order], np.arange(n_clusters))
+        self.cluster_bounds = np.empty((n_clusters, 4), dtype=np.int32)
+        if n_clusters:
+            self.cluster_bounds[:, 0] = np.minimum.reduceat(tile_x[order], starts)
+            self.cluster_bounds[:, 1] = np.maximum.reduceat(tile_x[order], starts) + 1
+            self.cluster_bounds[:, 2] = np.minimum.reduceat(tile_y[order], starts)
+            self.cluster_bounds[:, 3] = np.maximum.reduceat(tile_y[order], starts) + 1
+
+        n_tiles = np.bincount(cluster_of_tile, minlength=n_clusters)
+        centre_x = np.bincount(cluster_of_tile, weights=tile_x, minlength=n_clusters) / np.maximum(n_tiles, 1)
+        centre_y = np.bincount(cluster_of_tile, weights=tile_y, minlength=n_clusters) / np.maximum(n_tiles, 1)
+        self.cluster_centres = list(zip(centre_x.tolist(), centre_y.tolist()))
+        self.cluster_nodes = [[] for _ in range(n_clusters)]
+        self.cluster_edges = [{} for _ in range(n_clusters)]
+
+    def _find_portals(self) -> None:
+        node_of_tile: Dict[Tuple[int, int], int] = {}
+        self.nodes = []
+        self.edges = []
+        self.crossings = {}
+
+        def node(x: int, y: int) -> int:
+            if (x, y) not in node_of_tile:
+                node_of_tile[(x, y)] = len(self.nodes)
+                self.nodes.append((x, y))
+                self.edges.append({})
+                self.cluster_nodes[int(self.labels[x, y])].append(node_of_tile[(x, y)])
+            return node_of_tile[(x, y)]
+
+        # Gather the neighbouring tiles of different clusters, oriented from the lower cluster label to the higher one
+        borders: Dict[Tuple[int, int], List[Tuple[int, int, int, int]]] = {}
+        for dx, dy in ((1, 0), (0, 1)):
+            near, far = self.labels[:self.labels.shape[0] - dx, :self.labels.shape[1] - dy], self.labels[dx:, dy:]
+            xs, ys = np.nonzero((near >= 0) & (far >= 0) & (near != far))
+            for x, y, near_label, far_label in zip(xs.tolist(), ys.tolist(), near[xs, ys].tolist(), far[xs, ys].tolist()):
+                if near_label < far_label:
+                    borders.setdefault((near_label, far_label), []).append((x, y, x + dx, y + dy))
+                else:
+                    borders.setdefault((far_label, near_label), []).append((x + dx, y + dy, x, y))
+
+        # One portal per stretch of border, at the pair of tiles nearest its middle
+        for (cluster, other_cluster), border in borders.items():
+            for stretch in _border_stretches(border):
+                mean_x = sum(border[index][0] for index in stretch) / len(stretch)
+                mean_y = sum(border[index][1] for index in stretch) / len(stretch)
+                x, y, other_x, other_y = border[min(stretch, key=lambda index: abs(border[index][0] - mean_x) + abs(border[index][1] - mean_y))]
+                near_node, far_node = node(x, y), node(other_x, other_y)
+                self.edges[near_node][far_node] = int(self.cost[other_x, other_y])
+                self.edges[far_node][near_node] = int(self.cost[x, y])
+                self.crossings.setdefault((cluster, other_cluster), []).append((near_node, far_node))
+                self.crossings.setdefault((other_cluster, cluster), []).append((far_node, near_node))
+
+            (x, y), (other_x, other_y) = self.cluster_centres[cluster], self.cluster_centres[other_cluster]
+            self.cluster_edges[cluster][other_cluster] = self.cluster_edges[other_cluster][cluster] = abs(x - other_x) + abs(y - other_y)
+
+    def _connect_portals(self) -> None:
+        for cluster, cluster_nodes in enumerate(self.cluster_nodes):
+            if len(cluster_nodes) < 2:
+                continue
+
+            local_x = [self.nodes[node][0] - int(self.cluster_bounds[cluster, 0]) for node in cluster_nodes]
+            local_y = [self.nodes[node][1] - int(self.cluster_bounds[cluster, 2]) for node in cluster_nodes]
+            for node in cluster_nodes:
+                distance, _, _ = self._local_search(cluster, self.nodes[node])
+                for other, other_distance in zip(cluster_nodes, distance[local_x, local_y].tolist()):
+                    if other != node:
+                        self.edges[node][other] = other_distance
+
+    def _cluster_cost(self, cluster: int) -> np.ndarray:
+        """Returns the cost of one cluster's tiles within its bounds, with the tiles of other clusters blocked."""
+        cost = self._window_costs.get(cluster)
+        if cost is None:
+            x_start, x_stop, y_start, y_stop = self.cluster_bounds[cluster].tolist()
+            cost = self.cost[x_start:x_stop, y_start:y_stop] * (self.labels[x_start:x_stop, y_start:y_stop] == cluster)
+            self._window_costs[cluster] = cost
+
+        return cost
+
+    def _local_search(self, cluster: int, root: Tuple[int, int]) -> Tuple[np.ndarray, int, int]:
+        """Returns the distances from `root` over the tiles of one cluster, with the origin of their window."""
+        cost = self._cluster_cost(cluster)
+        x_start, y_start = int(self.cluster_bounds[cluster, 0]), int(self.cluster_bounds[cluster, 2])
+        distance = np.full(cost.shape, fill_value=np.iinfo(np.int32).max, dtype=np.int32)
+        distance[root[0] - x_start, root[1] - y_start] = 0
+        tcod.path.dijkstra2d(distance, cost, cardinal=1, diagonal=None, out=distance)
+        return distance, x_start, y_start
+    
+    @staticmethod
+    def _search_distance(search: Tuple[np.ndarray, int, int], tile: Tuple[int, int]) -> int:
+        distance, x_start, y_start = search
+        return int(distance[tile[0] - x_start, tile[1] - y_start])
+
+    @staticmethod
+    def _path_to_root(search: Tuple[np.ndarray, int, int], tile: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Returns the tiles from `tile` back to the root of a local search in the same cluster, both included."""
+        distance, x_start, y_start = search
+        path = tcod.path.hillclimb2d(distance, (tile[0] - x_start, tile[1] - y_start), cardinal=True, diagonal=False)
+        return [(x + x_start, y + y_start) for x, y in path.tolist()]
+    
+    def _portal_path(self, node: int, other: int) -> List[Tuple[int, int]]:
+        """Returns the steps between two portals of the same cluster, excluding `node`."""
+        path = self._paths.get((node, other))
+        if path is None:
+            search = self._local_search(int(self.labels[self.nodes[node]]), self.nodes[node])
+            path = self._paths[(node, other)] = self._path_to_root(search, self.nodes[other])[::-1][1:]
+        
+        return list(path)
+
+    def _route_clusters(self, start_cluster: int, goal_cluster: int) -> List[int] | None:
+        """Runs A* over the cluster graph and returns the clusters from start to goal, or None when they are not connected."""
+        goal_x, goal_y = self.cluster_centres[goal_cluster]
+        best: Dict[int, float] = {start_cluster: 0.0}
+        parent: Dict[int, int] = {start_cluster: -1}
+        frontier: List[Tuple[float, float, int]] = [(0.0, 0.0, start_cluster)]
+
+        while frontier:
+            _, distance, cluster = heappop(frontier)
+            if cluster == goal_cluster:
+                break
+            if distance > best[cluster]:
+                continue
+
+            for other, cost in self.cluster_edges[cluster].items():
+                other_distance = distance + cost
+                if other_distance < best.get(other, float('inf')):
+                    best[other], parent[other] = other_distance, cluster
+                    x, y = self.cluster_centres[other]
+                    heappush(frontier, (other_distance + abs(x - goal_x) + abs(y - goal_y), other_distance, other))
+        
+        if goal_cluster not in parent:
+            return None
+        
+        route = [goal_cluster]
+        while parent[route[-1]] != -1:
+            route.append(parent[route[-1]])
+
+        return route[::-1]
+    
+    def _pick_crossings(self, route: List[int], start_search: Tuple[np.ndarray, int, int], goal: Tuple[int, int], 
+                        goal_search: Tuple[np.ndarray, int, int]) -> List[Tuple[int, int]]:
+        """Returns the cheapest (exit portal, entry portal) pair for each step of a cluster route, by dynamic programming over the 
+        portals of consecutive clusters."""
+        costs: Dict[int, int] = {}
+        choices: List[Dict[int, Tuple[int, int]]] = []
+        for index, (cluster, next_cluster) in enumerate(zip(route, route[1:])):
+            next_costs: Dict[int, int] = {}
+            choice: Dict[int, Tuple[int, int]] = {}
+            for node, entry in self.crossings[(cluster, next_cluster)]:
+                if index == 0:
+                    cost, previous = self._search_distance(start_search, self.nodes[node]), -1
+                else:
+                    cost, previous = min((cost + (self.edges[previous][node] if previous != node else 0), previous) for previous, cost in costs.items())
+
+                cost += self.edges[node][entry]
+                if cost < next_costs.get(entry, np.iinfo(np.int32).max):
+                    next_costs[entry], choice[entry] = cost, (node, previous)
+
+            costs = next_costs
+            choices.append(choice)
+
+        # Walking from an entry portal to the goal costs the reverse of the goal's local search, stepping onto the goal instead
+        entry = min(costs, key=lambda entry: costs[entry] + self._search_distance(goal_search, self.nodes[entry]) 
+                    - int(self.cost[self.nodes[entry]]))
+        crossings: List[Tuple[int, int]] = []
+        for choice in reversed(choices):
+            node, previous = choice[entry]
+            crossings.append((node, entry))
+            entry = previous
+
+        return crossings[::-1]
+
+
+def _connected_pieces(labels: np.ndarray, walkable: np.ndarray) -> np.ndarray:
+    """Returns an array where walkable tiles hold the flat index of a tile in the same piece: the tiles of a label that are 
+    connected through cardinal steps. The smallest index spreads through each piece, with pointer jumping to shorten the rounds."""
+    pieces = np.arange(labels.size, dtype=np.int32 if labels.size < np.iinfo(np.int32).max else np.int64).reshape(labels.shape)
+    joined_x = walkable[:-1] & walkable[1:] & (labels[:-1] == labels[1:])
+    joined_y = walkable[:, :-1] & walkable[:, 1:] & (labels[:, :-1] == labels[:, 1:])
+
+    while True:
+        previous = pieces.copy()
+        for near, far, joined in ((pieces[:-1], pieces[1:], joined_x), (pieces[:, :-1], pieces[:, 1:], joined_y)):
+            lowest = np.minimum(near, far)
+            np.minimum(near, lowest, out=near, where=joined)
+            np.minimum(far, lowest, out=far, where=joined)
+        pieces = pieces.ravel()[pieces.ravel()[pieces]]
+        if np.array_equal(pieces, previous):
+            return pieces
+
+
+def _border_stretches(border: List[Tuple[int, int, int, int]]) -> List[List[int]]:
+    """Groups the indices of the (x, y, other_x, other_y) tile pairs of one border into stretches, with a union-find. Two pairs 
+    join the same stretch when their tiles on each side are the same or cardinal neighbours, so every tile of a stretch can reach 
+    every other one without leaving its side of the border."""
+    parent = list(range(len(border)))
+
+    def find(index: int) -> int:
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    pairs_at: Dict[Tuple[int, int], List[int]] = {}
+    for index, (x, y, other_x, other_y) in enumerate(border):
+        for dx, dy in ((0, 0),) + CARDINAL_STEPS:
+            for other in pairs_at.get((x + dx, y + dy), ()):
+                if abs(border[other][2] - other_x) + abs(border[other][3] - other_y) <= 1:
+                    parent[find(other)] = find(index)
+        pairs_at.setdefault((x, y), []).append(index)
+
+    stretches: Dict[int, List[int]] = {}
+    for index in range(len(border)):
+        stretches.setdefault(find(index), []).append(index)
+
+    return list(stretches.values())
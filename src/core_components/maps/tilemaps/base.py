@@ -5,12 +5,21 @@ from __future__ import annotations
 from warnings import warn
 import numpy as np
 import itertools
-from typing import Any, List, Protocol, Dict, Tuple, TypedDict, OrderedDict
-from copy import deepcopy
-import numpy as np
+from types import EllipsisType, MappingProxyType
+from typing import Any, ClassVar, Iterable, List, Mapping, Protocol, Sequence, Dict, Tuple, TypedDict, OrderedDict
+from concurrent.futures import Executor, Future
+from copy import copy, deepcopy
+from os import PathLike, path
+import hashlib
+import pickle
+
+from tcod import libtcodpy
+from tcod.map import compute_fov
 
+from core_components.maps.fov import FOVCache, VisibilityTable
+from core_components.maps.pathfinding import AreaGraph, terrain_cost
 from core_components.maps.tiles import BaseTileGrid, TileTuple, TileArea, TileCoordinate
-from core_components.ui.graphics import ascii_graphic
+from core_components.ui.graphics import ascii_graphic, console_graphic
 
 # A typed dictionary for map graphics
 class GraphicsManifestDict(TypedDict):
@@ -38,6 +47,37 @@ def create_states(n: int) -> List[str]:
     # of length n as tuples, which are then joined into strings.
     return [''.join(i) for i in itertools.product('01', repeat=n)]
 
+def mask_bounds(mask: np.ndarray) -> Tuple[slice, slice] | None:
+    """
+    Returns the bounding box of the True cells of a 2D boolean mask.
+
+    Args:
+        mask: A 2D boolean array.
+
+    Returns:
+        A pair of slices covering every True cell, or None if the mask is empty.
+    """
+    rows = np.flatnonzero(mask.any(axis=1))
+    if rows.size == 0:
+        return None
+    
+    columns = np.flatnonzero(mask.any(axis=0))
+    return (slice(int(rows[0]), int(rows[-1]) + 1), slice(int(columns[0]), int(columns[-1]) + 1))
+
+def read_only_view(array: np.ndarray) -> np.ndarray:
+    """
+    Returns a view of an array that cannot be written through. The underlying array stays writeable.
+
+    Args:
+        array: The array to view.
+
+    Returns:
+        A non-writeable view sharing memory with `array`.
+    """
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
 def graphics_state_assignment(manifest):
     statebits = manifest['state_definition']['bits']
     n = len(statebits)
@@ -88,67 +128,80 @@ def graphics_state_assignment(manifest):
     return manifest
 
 
-class GraphicTileMap(Protocol):
-    """The GraphicTileMap defines the interface for all TileMaps in the game. This ensures that all TileMaps conform to a standard interface. A GraphicTileMap
-    holds the graphics, dtypes, and tile states for the map. It has a TileGrid that manages the tile data and provides methods for initializing and manipulating 
-    the TileCoordinateSystem. It also has a graphics dictionary that holds the graphic definitions for the tiles. The graphics dictionary can be stored as JSON 
-    and is loaded at runtime to set the GraphicTileMap attributes. The GraphicTileMap methods allow for reading, updating, and resetting the tile states and 
-    graphics on the map.
+class CompiledManifest:
+    """A CompiledManifest holds everything a GraphicTileMap derives from its graphics manifest: the colors, dtypes, graphics, the palette, the
+    statespace lookup tables and the render lookup table. Compiling a manifest is done once per manifest content; `CompiledManifest.compile` 
+    caches the result by a hash of the manifest, excluding its dimensions, so every map built from the same manifest shares one instance 
+    by reference. A compiled manifest is immutable: its attributes cannot be reassigned, its arrays are read-only, and its dicts are exposed 
+    as read-only mappings with tuples in place of lists. Copying or deep-copying it returns the same instance.
+    """
+    __slots__ = ("key", "_graphics_manifest", "statespace", "colors", "dtypes", "graphics", "graphic_ids", "palette", "render_lut", "fixed_state", "_frozen")
 
-    Implementations of this protocol are responsible for managing the state and graphics of the tiles on the map bases on the specific definitions in the graphics 
-    manifest. Each new map should have its own associated graphics manifest standard.
+    _cache: ClassVar[Dict[str, CompiledManifest]] = {}
 
-    For a full implementation, see the `core_components.maps.library` module.
-    """
-    _graphics_manifest: GraphicsManifestDict
-    _graphics_resources: Dict[str, Any | None]
-    _grid: BaseTileGrid
-    statespace: Dict[str, Any] | None
-    colors: Dict[str, np.ndarray | None]
-    dtypes: Dict[str, np.dtype | None ]
-    graphics: Dict[str, np.ndarray | None]
-    tiles: np.ndarray
-    areas: OrderedDict[str, TileArea] = OrderedDict()
-    paths: OrderedDict[str, TileArea] = OrderedDict()
+    key: str
+    _graphics_manifest: Dict[str, Any]
+    statespace: Mapping[str, Any] | None
+    colors: Mapping[str, np.ndarray]
+    dtypes: Mapping[str, np.dtype | None]
+    graphics: Mapping[str, np.ndarray]
+    graphic_ids: Mapping[str, int]
+    palette: np.ndarray
+    render_lut: np.ndarray
+    fixed_state: Mapping[str, Tuple[int, int]]
 
-    def __init__(self, graphics_manifest: GraphicsManifestDict | None) -> None:
+    def __init__(self, graphics_manifest: GraphicsManifestDict, key: str | None = None) -> None:
+        self.key = key if key is not None else self.hash_manifest(graphics_manifest)
+        self._graphics_manifest = {name: deepcopy(value) for name, value in graphics_manifest.items() if name != 'dimensions'}
 
-        if graphics_manifest:
+        # Copy information from the graphics manifest into the compiled resources
+        self.statespace = deepcopy(self._graphics_manifest['statespace'])
+        self.colors = {}
+        self.dtypes = deepcopy(self._graphics_manifest['dtypes'])
+        self.graphics = {}
 
-            # Initialize the internal copy of the graphics manifest and resources
-            self._graphics_manifest = deepcopy(graphics_manifest) # May be possible to not persist this at all if we just use the manifest to initialize the grid and graphics
-            self._graphics_resources = dict.fromkeys(graphics_manifest) 
-            
-            # Link attributes to graphics resources
-            for key in self._graphics_resources.keys():
-                    setattr(self, key, self._graphics_resources[key])
-            
-            # Copy information from the graphics manifest into the resources dictionary
-            self.statespace = deepcopy(self._graphics_manifest['statespace'])
-            self.colors = {}
-            self.dtypes = deepcopy(self._graphics_manifest['dtypes'])
-            self.graphics = {}
-
-            # Initialize the datatypes, colors, and graphics
-            self._initialize_colors()
-            self._initialize_dtypes()
-            self._initialize_graphics()
-            self._initialize_state_vectors()
-            self._initialize_state_map()
-            
-            # Initialize the grid
-            if "tile_grid" in self.dtypes:
-                dtype = self.dtypes["tile_grid"]
-                if dtype is not None:
-                    self._grid = BaseTileGrid(dtype)
+        # Initialize the datatypes, colors, and graphics
+        self._initialize_colors()
+        self._initialize_dtypes()
+        self._initialize_graphics()
+        self._initialize_state_vectors()
+        self._initialize_state_map()
+        self._initialize_render_lut()
+        self._initialize_fixed_state()
+        self._freeze()
 
-                    self.grid.size = graphics_manifest['dimensions']["grid_size"]
-                    self.grid._initialize_grid()
-                    self.tiles = self.grid.tiles
-                    self.tiles['graphic_type'][:] = self.graphics['default']
+    def __setattr__(self, name: str, value: Any) -> None:
+        if getattr(self, "_frozen", False):
+            raise AttributeError(f"CompiledManifest is immutable; cannot set '{name}'.")
+        object.__setattr__(self, name, value)
+
+    def __copy__(self) -> CompiledManifest:
+        return self
 
-                    self.reset_state()
-                    self.update_state()
+    def __deepcopy__(self, memo: Dict[int, Any]) -> CompiledManifest:
+        return self
+
+    def __repr__(self) -> str:
+        return f"CompiledManifest(key={self.key[:12]}, graphics={list(self.graphic_ids)})"
+
+    @classmethod
+    def compile(cls, graphics_manifest: GraphicsManifestDict) -> CompiledManifest:
+        """Returns the compiled manifest for a graphics manifest, compiling and caching it on first use."""
+        key = cls.hash_manifest(graphics_manifest)
+        if key not in cls._cache:
+            cls._cache[key] = cls(graphics_manifest, key=key)
+        return cls._cache[key]
+
+    @staticmethod
+    def hash_manifest(graphics_manifest: GraphicsManifestDict) -> str:
+        """Returns a content hash of a graphics manifest. The dimensions are left out since they are not compiled."""
+        content = [(name, value) for name, value in graphics_manifest.items() if name != 'dimensions']
+        return hashlib.sha256(repr(content).encode()).hexdigest()
+
+    @property
+    def packed_state(self) -> bool:
+        """True when the statespace bits are stored in a single packed state plane instead of one tile_grid field per bit."""
+        return self.statespace is not None and self.statespace.get('storage', 'fields') == 'packed'
 
     def _initialize_colors(self) -> None:
         """Generates the color graphic definitions for the map"""
@@ -162,6 +215,7 @@ class GraphicTileMap(Protocol):
         # Generate the tile state vector dtype based on the provided state bits
         if self.statespace is not None:
             state_bit_dtypes = [(name, np.bool) for name in self.statespace['bits']]
+            grid_state_dtypes = [] if self.packed_state else state_bit_dtypes
             self.dtypes['tile_state_vector'] = np.dtype(state_bit_dtypes, metadata={"__name__": "tile_state_vector"})
 
         # Generate the tile graphic dtype based on the provided state labels
@@ -170,13 +224,14 @@ class GraphicTileMap(Protocol):
             self.dtypes['tile_graphic'] = np.dtype([('name', 'U16')] + state_dtypes, metadata={"__name__": "tile_graphic"})
 
         # Generate the tile grid dtype based on the provided tile graphic and state dtypes
-            graphic_dtypes = [('graphic_type', self.dtypes['tile_graphic']), ('graphic', ascii_graphic)]
-            self.dtypes["tile_grid"] = np.dtype( graphic_dtypes + state_bit_dtypes, metadata={"__name__": "tile_grid"})
+            graphic_id_dtype = np.uint8 if len(self._graphics_manifest['graphics']) <= 256 else np.uint16
+            graphic_dtypes = [('graphic_id', graphic_id_dtype), ('graphic', ascii_graphic)]
+            self.dtypes["tile_grid"] = np.dtype( graphic_dtypes + grid_state_dtypes, metadata={"__name__": "tile_grid"})
 
     def _initialize_graphics(self) -> None:
         graphic_dtype = self.dtypes['tile_graphic']
         for graphic_name, package in self._graphics_manifest['graphics'].items():
-            graphic = np.empty(1, dtype=graphic_dtype)
+            graphic = np.zeros(1, dtype=graphic_dtype)
 
             graphic['name'] = graphic_name
 
@@ -185,6 +240,10 @@ class GraphicTileMap(Protocol):
             
             self.graphics[graphic_name] = graphic
 
+        # The palette holds one tile_graphic record per graphic; tiles only store the palette index of their graphic
+        self.graphic_ids = {graphic_name: idx for idx, graphic_name in enumerate(self.graphics)}
+        self.palette = np.concatenate(list(self.graphics.values())) if self.graphics else np.empty(0, dtype=graphic_dtype)
+
     def _initialize_state_vectors(self) -> None:
         if self.statespace is not None and self.statespace['vector_tuples'] is not None:
             state_vectors = []
@@ -208,7 +267,254 @@ class GraphicTileMap(Protocol):
                         break
 
             self.statespace['label_map'] = tuple(label_map)
-    
+            self._initialize_state_resolver()
+
+    def _initialize_state_resolver(self) -> None:
+        """Compiles the lookup tables used to resolve packed state indices into statespace vectors and state labels.
+
+        A tile's state bits are folded into a single integer (first bit is the most significant), so the tables are
+        indexed directly by that integer and `update_state` only needs a gather instead of comparing every tile
+        against every statespace vector.
+        """
+        if self.statespace is not None and self.statespace['vector_tuples'] is not None:
+            n_state_bits = len(self.statespace['bits'])
+            label_names = list(self.statespace['dtype_labels'].get('names', []))
+            index_lut = np.full(2 ** n_state_bits, fill_value=-1, dtype=np.int16)
+            label_lut = np.full(2 ** n_state_bits, fill_value=-1, dtype=np.int16)
+
+            for vector_index, vector_tuple in enumerate(self.statespace['vector_tuples']):
+                packed_index = self.pack_state_vector(vector_tuple)
+                index_lut[packed_index] = vector_index
+
+                if vector_index < len(self.statespace['label_map']):
+                    label = self.statespace['label_map'][vector_index]
+                    if label in label_names:
+                        label_lut[packed_index] = label_names.index(label)
+
+            self.statespace['index_lut'] = index_lut
+            self.statespace['label_lut'] = label_lut
+
+    def _initialize_render_lut(self) -> None:
+        """Compiles the (graphic id, packed state index) -> console graphic lookup table used to resolve and render tiles."""
+        n_state_bits = len(self.statespace['bits']) if self.statespace is not None else 0
+        render_lut = np.zeros((len(self.palette), 2 ** n_state_bits), dtype=console_graphic)
+
+        if self.statespace is not None and 'label_lut' in self.statespace:
+            label_names = self.statespace['dtype_labels'].get('names', [])
+            for packed_index, label_index in enumerate(self.statespace['label_lut']):
+                if label_index >= 0:
+                    render_lut[:, packed_index] = self.palette[label_names[label_index]]
+
+        self.render_lut = render_lut
+
+    def _initialize_fixed_state(self) -> None:
+        """Compiles each graphic's fixed state bits into a (mask, value) pair over the packed state index."""
+        self.fixed_state = {}
+        if self.statespace is None:
+            return
+        
+        n_state_bits = len(self.statespace['bits'])
+        for graphic_name, graphic_def in self._graphics_manifest['graphics'].items():
+            fixed_mask, fixed_value = 0, 0
+            for idx, bit in enumerate(graphic_def.get('fixed_state_bits', ())):
+                if bit is not None:
+                    fixed_mask |= 1 << (n_state_bits - 1 - idx)
+                    fixed_value |= int(bool(bit)) << (n_state_bits - 1 - idx)
+            self.fixed_state[graphic_name] = (fixed_mask, fixed_value)
+
+    @staticmethod
+    def pack_state_vector(vector_tuple: Tuple[int, ...]) -> int:
+        """Folds a statespace vector tuple into its packed state index."""
+        packed_index = 0
+        for bit in vector_tuple:
+            packed_index = (packed_index << 1) | int(bool(bit))
+        return packed_index
+
+    def _freeze(self) -> None:
+        arrays = [*self.colors.values(), *self.graphics.values(), self.palette, self.render_lut]
+        if self.statespace is not None:
+            arrays += [*self.statespace.get('vectors', []), self.statespace.get('index_lut'), self.statespace.get('label_lut')]
+
+        for array in arrays:
+            if isinstance(array, np.ndarray):
+                array.flags.writeable = False
+
+        # The lookup dicts are shared by every map built from the manifest, so they are exposed as read-only mappings
+        for name in ("statespace", "colors", "dtypes", "graphics", "graphic_ids", "fixed_state"):
+            setattr(self, name, self._freeze_value(getattr(self, name)))
+
+        self._frozen = True
+
+    @classmethod
+    def _freeze_value(cls, value: Any) -> Any:
+        """Returns dicts as read-only mappings and lists as tuples, recursively."""
+        if isinstance(value, dict):
+            return MappingProxyType({key: cls._freeze_value(item) for key, item in value.items()})
+        if isinstance(value, list):
+            return tuple(cls._freeze_value(item) for item in value)
+        return value
+
+
+class GraphicTileMap(Protocol):
+    """The GraphicTileMap defines the interface for all TileMaps in the game. This ensures that all TileMaps conform to a standard interface. A GraphicTileMap
+    holds the graphics, dtypes, and tile states for the map. It has a TileGrid that manages the tile data and provides methods for initializing and manipulating 
+    the TileCoordinateSystem. It also has a graphics dictionary that holds the graphic definitions for the tiles. The graphics dictionary can be stored as JSON 
+    and is loaded at runtime to set the GraphicTileMap attributes. The GraphicTileMap methods allow for reading, updating, and resetting the tile states and 
+    graphics on the map.
+
+    Implementations of this protocol are responsible for managing the state and graphics of the tiles on the map bases on the specific definitions in the graphics 
+    manifest. Each new map should have its own associated graphics manifest standard.
+
+    For a full implementation, see the `core_components.maps.library` module.
+    """
+    _manifest: CompiledManifest
+    _graphics_resources: Dict[str, Any | None]
+    _grid: BaseTileGrid
+    _state_plane: np.ndarray | None = None
+    _dirty: np.ndarray | None = None
+    _updated: np.ndarray | None = None
+    _render_buffer: np.ndarray | None = None
+    _transparency: Tuple[int, np.ndarray] | None = None
+    _vision_generation: int = 0
+    _movement_generation: int = 0
+    _visibility: Dict[Tuple[int, int], Tuple[int, VisibilityTable | Future]]
+    _area_graph: Tuple[int, AreaGraph] | None = None
+    vision_bit: str = 'blocks_vision'
+    movement_bit: str = 'blocks_movement'
+    fov_cache: FOVCache
+    tiles: np.ndarray
+    areas: OrderedDict[str, TileArea]
+    paths: OrderedDict[str, TileArea]
+
+    def __init__(self, graphics_manifest: GraphicsManifestDict | None, tile_file: str | PathLike | None = None, mode: str = 'w+') -> None:
+        """Args:
+            graphics_manifest: The graphics manifest of the map.
+            tile_file: When set, the tiles are stored in this file through `np.memmap` instead of in process memory. Its header in 
+                '<tile_file>.meta' records the grid shape, the tile dtype and the manifest hash, and `flush` pickles the areas and 
+                paths to '<tile_file>.areas' and saves the finished visibility tables to '<tile_file>.vis.npz'. In packed storage 
+                mode the state plane is stored in '<tile_file>.state'.
+            mode: The memmap mode of the tile file. 'w+' creates a new map; 'r+', 'r' and 'c' open a saved map as it was flushed, 
+                and raise a ValueError when its header does not match the manifest. Only open tile files you trust, since the 
+                areas are unpickled.
+        """
+        self.areas = OrderedDict()
+        self.paths = OrderedDict()
+        self.fov_cache = FOVCache()
+        self._visibility = {}
+
+        if graphics_manifest:
+
+            # Share the compiled manifest resources with every map built from the same manifest; the map keeps the rest
+            self._manifest = CompiledManifest.compile(graphics_manifest)
+            self._graphics_resources = {key: value for key, value in graphics_manifest.items() if not hasattr(self._manifest, key)}
+
+            # Initialize the grid
+            if "tile_grid" in self.dtypes:
+                dtype = self.dtypes["tile_grid"]
+                if dtype is not None:
+                    self._grid = BaseTileGrid(dtype, filename=tile_file, mode=mode, metadata={'manifest': self._manifest.key})
+
+                    self.grid.size = graphics_manifest['dimensions']["grid_size"] # Allocates or maps the tiles
+                    self.tiles = self.grid.tiles
+                    if self.grid.is_memmap and self.grid.mode != 'w+':
+                        self._load_tiles()
+                    else:
+                        self._initialize_tiles()
+
+    def _initialize_tiles(self) -> None:
+        """Sets every tile to the default graphic with a cleared state and resolves the tile graphics."""
+        self.tiles['graphic_id'][:] = self.graphic_ids['default']
+        self._state_plane = self._allocate_state_plane()
+        self._dirty = np.full(self.tiles.shape, fill_value=True, dtype=bool)
+        self._updated = np.full(self.tiles.shape, fill_value=False, dtype=bool)
+        self._render_buffer = None
+
+        self.reset_state()
+        self.update_state()
+
+    def _load_tiles(self) -> None:
+        """Adopts the tiles, areas, paths and visibility tables of a saved tile file. Its graphics were resolved before it was 
+        flushed, so nothing is re-resolved."""
+        try:
+            with open(f"{self.grid.filename}.areas", 'rb') as file:
+                self.areas, self.paths = pickle.load(file)
+        except OSError as e:
+            raise ValueError(f"The tile file '{self.grid.filename}' has no saved areas.") from e
+        
+        self._state_plane = self._allocate_state_plane()
+        self._dirty = np.full(self.tiles.shape, fill_value=False, dtype=bool)
+        self._updated = np.full(self.tiles.shape, fill_value=False, dtype=bool)
+        self._render_buffer = None
+
+        if path.exists(f"{self.grid.filename}.vis.npz"):
+            for table in VisibilityTable.load_tables(f"{self.grid.filename}.vis.npz"):
+                self.set_visibility_table(table)
+
+    def _allocate_state_plane(self) -> np.ndarray | None:
+        if not self.packed_state:
+            return None
+        
+        if self.grid.is_memmap:
+            state_file = f"{self.grid.filename}.state"
+            state_size = self.tiles.size * self.state_index_dtype.itemsize
+            if self.grid.mode != 'w+' and (not path.exists(state_file) or path.getsize(state_file) != state_size):
+                raise ValueError(f"The state file '{state_file}' does not match the tile file.")
+            return np.memmap(state_file, dtype=self.state_index_dtype, mode=self.grid.mode, shape=self.tiles.shape)
+        
+        return np.zeros(self.tiles.shape, dtype=self.state_index_dtype)
+
+    def flush(self) -> None:
+        """Resolves any dirty tiles and writes a memory-mapped map to its files. Does nothing for in-memory maps. A map opened 
+        copy-on-write keeps its changes in memory, so its files are left as they were."""
+        if not self.grid.is_memmap or self.grid.mode == 'r':
+            return
+        
+        self.update_state()
+        self.grid.flush()
+        if isinstance(self._state_plane, np.memmap):
+            self._state_plane.flush()
+        if self.grid.mode != 'c':
+            with open(f"{self.grid.filename}.areas", 'wb') as file:
+                pickle.dump((self.areas, self.paths), file)
+            tables = [self.get_visibility_table(radius, algorithm) for radius, algorithm in list(self._visibility)]
+            VisibilityTable.save_tables(f"{self.grid.filename}.vis.npz", [table for table in tables if table is not None])
+
+    @property
+    def manifest(self) -> CompiledManifest:
+        return self._manifest
+
+    @property
+    def _graphics_manifest(self) -> Dict[str, Any]:
+        return self._manifest._graphics_manifest
+
+    @property
+    def statespace(self) -> Mapping[str, Any] | None:
+        return self._manifest.statespace
+
+    @property
+    def colors(self) -> Mapping[str, np.ndarray]:
+        return self._manifest.colors
+
+    @property
+    def dtypes(self) -> Mapping[str, np.dtype | None]:
+        return self._manifest.dtypes
+
+    @property
+    def graphics(self) -> Mapping[str, np.ndarray]:
+        return self._manifest.graphics
+
+    @property
+    def graphic_ids(self) -> Mapping[str, int]:
+        return self._manifest.graphic_ids
+
+    @property
+    def palette(self) -> np.ndarray:
+        return self._manifest.palette
+
+    @property
+    def render_lut(self) -> np.ndarray:
+        return self._manifest.render_lut
+
     @property
     def grid(self) -> BaseTileGrid:
         return self._grid
@@ -245,11 +551,162 @@ class GraphicTileMap(Protocol):
 
     @property
     def statespace_index_map(self) -> np.ndarray:
-        label_indices = np.where(np.all(self.state_tensor_aligned == self.statespace_tensor, axis=3))
+        if self.statespace is None or 'index_lut' not in self.statespace:
+            return np.full(self.tiles.shape, fill_value=-1, dtype=int)
+
+        return self.statespace['index_lut'][self.get_state_index()].astype(int)
+
+    @property
+    def packed_state(self) -> bool:
+        return self._manifest.packed_state
+
+    @property
+    def state_plane(self) -> np.ndarray | None:
+        return self._state_plane
+
+    @property
+    def vision_generation(self) -> int:
+        """A counter that changes whenever the vision-blocking bit of any tile changes through the tile map API. Direct writes 
+        to `tiles` are not tracked."""
+        return self._vision_generation
 
-        index_map = np.full(self.tiles.shape, fill_value=-1, dtype=int)
-        index_map[label_indices[0], label_indices[1]] = label_indices[2]
-        return index_map
+    @property
+    def movement_generation(self) -> int:
+        """A counter that changes whenever the movement-blocking bit of any tile changes through the tile map API. Direct writes 
+        to `tiles` are not tracked."""
+        return self._movement_generation
+
+    def _touch_state_bit(self, bit: str) -> None:
+        """Advances the generation counter tracking a state bit, if any."""
+        if bit == self.vision_bit:
+            self._vision_generation += 1
+        if bit == self.movement_bit:
+            self._movement_generation += 1
+
+    @property
+    def transparency(self) -> np.ndarray:
+        """Returns a read-only mask of the tiles that do not block vision, recomputed only when the vision generation changes."""
+        if self._transparency is None or self._transparency[0] != self._vision_generation:
+            if self.statespace is not None and self.vision_bit in self.statespace['bits']:
+                transparency = ~self.get_state_bits(self.vision_bit)
+            else:
+                transparency = np.full(self.tiles.shape, fill_value=True, dtype=bool)
+            transparency.flags.writeable = False
+            self._transparency = (self._vision_generation, transparency)
+
+        return self._transparency[1]
+
+    def compute_fov(self, x: int, y: int, radius: int = 0, algorithm: int = libtcodpy.FOV_RESTRICTIVE) -> np.ndarray:
+        """Returns the tiles visible from (x, y) as a read-only mask. Results are cached in `fov_cache` by origin, radius, 
+        algorithm and vision generation, so repeated calls from an unchanged point of view do not recompute the field of view."""
+        key = (x, y, radius, algorithm, self._vision_generation)
+        return self.fov_cache.get(key, lambda: self._compute_fov(self.transparency, key, self.get_visibility_table(radius, algorithm)))
+
+    def compute_fov_many(self, povs: Sequence[Tuple[int, int, int, int]], executor: Executor | None = None) -> List[np.ndarray]:
+        """Returns the read-only field of view of each (x, y, radius, algorithm) point of view, in the order given. Cached results 
+        are looked up first; the misses are computed on `executor` when one is given, all reading the same read-only transparency 
+        mask, and are cached on the calling thread as they are collected. The visibility tables are also looked up on the calling 
+        thread, so the workers never touch the map's caches."""
+        transparency = self.transparency
+        keys = [(x, y, radius, algorithm, self._vision_generation) for x, y, radius, algorithm in povs]
+        results: Dict[Tuple[int, int, int, int, int], np.ndarray | None] = {}
+        for key in keys:
+            if key not in results:
+                results[key] = self.fov_cache.lookup(key)
+
+        misses = [key for key, result in results.items() if result is None]
+        tables = {(radius, algorithm): self.get_visibility_table(radius, algorithm) for _, _, radius, algorithm, _ in misses}
+        compute = lambda key: self._compute_fov(transparency, key, tables[key[2], key[3]])
+        computed = executor.map(compute, misses) if executor is not None and len(misses) > 1 else map(compute, misses)
+        for key, result in zip(misses, computed):
+            results[key] = self.fov_cache.store(key, result)
+
+        return [results[key] for key in keys] # type: ignore
+
+    @staticmethod
+    def _compute_fov(transparency: np.ndarray, key: Tuple[int, int, int, int, int], table: VisibilityTable | None) -> np.ndarray:
+        x, y, radius, algorithm, _ = key
+        if table is not None and table.covers(x, y, radius, algorithm):
+            return table.visible_from(x, y)
+        
+        return compute_fov(transparency, (x, y), radius=radius, algorithm=algorithm)
+
+    def has_line_of_sight(self, x: int, y: int, target_x: int, target_y: int, radius: int = 0, algorithm: int = libtcodpy.FOV_RESTRICTIVE) -> bool:
+        """Returns True when (target_x, target_y) is in the field of view from (x, y). Reads a single bit when a precomputed 
+        visibility table covers the point of view."""
+        table = self.get_visibility_table(radius, algorithm)
+        if table is not None and table.covers(x, y, radius, algorithm):
+            return table.is_visible(x, y, target_x, target_y)
+        
+        return bool(self.compute_fov(x, y, radius=radius, algorithm=algorithm)[target_x, target_y])
+
+    def precompute_visibility(self, radius: int, algorithm: int = libtcodpy.FOV_SHADOW, executor: Executor | None = None) -> VisibilityTable | Future:
+        """Precomputes the visibility table of every open tile for a FOV radius and algorithm from the current walls. With an 
+        `executor` the table is built in the background and returns a Future; FOV queries fall back to shadowcasting until it is 
+        done. The table is dropped as soon as the vision generation changes."""
+        transparency = self.transparency
+        table = executor.submit(VisibilityTable.build, transparency, radius, algorithm) if executor is not None \
+            else VisibilityTable.build(transparency, radius, algorithm)
+        self._visibility[(radius, algorithm)] = (self._vision_generation, table)
+        return table
+
+    def set_visibility_table(self, table: VisibilityTable) -> None:
+        """Adopts a visibility table, e.g. one loaded with `VisibilityTable.load`. Raises a ValueError when the table was built 
+        from different walls."""
+        if not table.matches(self.transparency):
+            raise ValueError("The visibility table was built for a different transparency mask.")
+        
+        self._visibility[(table.radius, table.algorithm)] = (self._vision_generation, table)
+
+    def get_visibility_table(self, radius: int, algorithm: int) -> VisibilityTable | None:
+        """Returns the finished visibility table for a radius and algorithm, or None when there is none or the walls have changed."""
+        entry = self._visibility.get((radius, algorithm))
+        if entry is None:
+            return None
+        
+        generation, table = entry
+        if generation != self._vision_generation:
+            self._visibility.pop((radius, algorithm), None)
+            return None
+        
+        if isinstance(table, Future):
+            if not table.done() or table.exception() is not None:
+                return None
+            table = table.result()
+            self._visibility[(radius, algorithm)] = (generation, table)
+        
+        return table
+
+    def build_area_graph(self, chunk_size: int = 32) -> AreaGraph:
+        """Builds the hierarchical path graph of the map, with a cluster per room and the rest of the map clustered in 
+        `chunk_size` squares. It uses the same `terrain_cost` as the movement cost grid, so tiles blocking movement are expensive 
+        rather than impassable and every pathing mode can enter the same tiles. The graph is dropped as soon as the movement 
+        generation changes."""
+        rooms = [area.to_mask for name, area in self.areas.items() if not name.startswith('_')]
+        graph = AreaGraph(terrain_cost(self.blocks_movement), rooms, chunk_size=chunk_size)
+        self._area_graph = (self._movement_generation, graph)
+        return graph
+
+    def get_area_graph(self) -> AreaGraph | None:
+        """Returns the hierarchical path graph, or None when there is none or the movement-blocking tiles have changed."""
+        if self._area_graph is None or self._area_graph[0] != self._movement_generation:
+            self._area_graph = None
+            return None
+        
+        return self._area_graph[1]
+
+    def state_bit_mask(self, bit: str) -> int:
+        """Returns the mask of a statespace bit within the packed state index."""
+        if self.statespace is None:
+            raise ValueError("The tile map has no statespace.")
+        
+        n_state_bits = len(self.statespace['bits'])
+        return 1 << (n_state_bits - 1 - self.statespace['bits'].index(bit))
+
+    @property
+    def state_index_dtype(self) -> np.dtype:
+        n_state_bits = len(self.statespace['bits']) if self.statespace is not None else 0
+        return np.dtype(np.uint8) if n_state_bits <= 8 else np.dtype(np.uint16)
         
     @property
     def state_tensor(self) -> np.ndarray | None:
@@ -262,7 +719,7 @@ class GraphicTileMap(Protocol):
         """
         if self.statespace is not None and self.statespace['vector_tuples'] is not None:
             n_state_bits = len(self.statespace['bits'])
-            state_tensor_dimensions = [self.tiles[bit] for bit in self.statespace['bits']]
+            state_tensor_dimensions = [self.get_state_bits(bit) for bit in self.statespace['bits']]
             
             return np.stack(state_tensor_dimensions, axis = 0).transpose(1,2,0).reshape(*self.tiles.shape, 1, n_state_bits) # 1D State Vector + 1D State Bits + 2 Grid Dimensions = 4D State Tensor
 
@@ -282,9 +739,50 @@ class GraphicTileMap(Protocol):
             
             return np.stack(state_tensor_dimensions, axis=2).reshape(*self.tiles.shape, n_states, n_state_bits) # type: ignore State Tensor x number of possible states = 4D State Tensor
 
-    def get_tiles(self) -> np.ndarray | None:
+    @property
+    def dirty(self) -> np.ndarray | None:
+        """Returns a read-only mask of the tiles whose graphics are waiting to be re-resolved by `update_state`."""
+        if self._dirty is None:
+            return None
+        
+        return read_only_view(self._dirty)
+
+    @property
+    def dirty_region(self) -> Tuple[slice, slice] | None:
+        """Returns the bounding box of the dirty tiles as a pair of slices, or None if no tiles are dirty."""
+        return mask_bounds(self._dirty) if self._dirty is not None else None
+
+    def mark_dirty(self, layout: np.ndarray | Tuple[slice, slice] | None = None) -> None:
+        """Flags tiles for re-resolution by `update_state`.
+
+        Args:
+            layout: A boolean mask or a pair of slices covering the tiles to flag. Flags every tile when None.
+        """
+        if self._dirty is None:
+            return
+        
+        if layout is None:
+            self._dirty[:] = True
+        elif isinstance(layout, tuple):
+            self._dirty[layout] = True
+        else:
+            self._dirty |= layout
+
+    def consume_updated_region(self) -> Tuple[slice, slice] | None:
+        """Returns the bounding box of the tiles re-resolved by `update_state` since the last call and clears it. 
+        Renderers can use it to redraw only the part of the map that changed."""
+        if self._updated is None:
+            return None
+        
+        region = mask_bounds(self._updated)
+        self._updated[:] = False
+        return region
+
+    def get_tiles(self, copy: bool = False) -> np.ndarray | None:
+        """Returns the tile_graphic record of every tile, gathered from the palette. The result is read-only unless `copy` is True."""
         if self.graphics is not None:
-            return deepcopy(self.tiles['graphic_type'])
+            tiles = self.palette[self.tiles['graphic_id']]
+            return tiles if copy else read_only_view(tiles)
 
     def set_tiles(self, layout: np.ndarray | None = None, graphic_name: str = 'default', join_type: str = 'merge') -> None:
 
@@ -303,9 +801,53 @@ class GraphicTileMap(Protocol):
             # Set the fixed state bits for the tiles based on the graphic
             self.set_fixed_state_bits(merged_layout, graphic_name=graphic_name)
 
+    def paint_many(self, layers: Iterable[Tuple[np.ndarray | Tuple[slice, slice], str]]) -> None:
+        """Paints a batch of graphics onto the tile map. Each layer is a (region, graphic_name) pair, where the region is either a 
+        boolean mask of the whole map or a pair of slices. Layers are applied in order, so later layers paint over earlier ones.
+
+        Unlike `set_tiles`, each layer only touches the tiles inside its region: their graphic ids and fixed state bits are written and 
+        they are flagged dirty, leaving the rest of the map untouched. Call `update_state` once after painting to resolve the graphics.
+        """
+        if self.graphics is None or self.statespace is None:
+            return
+        
+        for region, graphic_name in layers:
+            if isinstance(region, tuple):
+                bounds, mask = region, Ellipsis
+            else:
+                bounds = mask_bounds(region)
+                if bounds is None:
+                    continue
+                mask = region[bounds]
+
+            self.tiles['graphic_id'][bounds][mask] = self.graphic_ids[graphic_name]
+            self._paint_fixed_state(bounds, mask, graphic_name)
+            if self._dirty is not None:
+                self._dirty[bounds][mask] = True
+
+    def _paint_fixed_state(self, bounds: Tuple[slice, slice], mask: np.ndarray | EllipsisType, graphic_name: str) -> None:
+        fixed_mask, fixed_value = self._manifest.fixed_state[graphic_name]
+        if not fixed_mask or self.statespace is None:
+            return
+        
+        for bit in (self.vision_bit, self.movement_bit):
+            if bit in self.statespace['bits'] and fixed_mask & self.state_bit_mask(bit):
+                self._touch_state_bit(bit)
+
+        if self._state_plane is not None:
+            plane = self._state_plane[bounds]
+            plane[mask] = (plane[mask] & ~self._state_plane.dtype.type(fixed_mask)) | fixed_value
+            return
+        
+        for bit in self.statespace['bits']:
+            bit_mask = self.state_bit_mask(bit)
+            if fixed_mask & bit_mask:
+                self.tiles[bit][bounds][mask] = bool(fixed_value & bit_mask)
+
     def reset_tiles(self) -> None:
         if self.graphics is not None:
-           self.tiles['graphic_type'][:] = self.graphics['default']
+           self.tiles['graphic_id'][:] = self.graphic_ids['default']
+           self.mark_dirty()
 
     def get_statespace_vector(self, index: int) -> np.ndarray | None:
         if self.statespace is not None:
@@ -318,9 +860,10 @@ class GraphicTileMap(Protocol):
             layout = np.full(self.tiles.shape, fill_value=True, dtype=bool)
         
         if self.graphics is not None and graphic_name is not None:
-            tiles = self.get_tiles()
-            if tiles is not None:
-                layout = tiles['name'] == graphic_name
+            if graphic_name in self.graphic_ids:
+                layout = self.tiles['graphic_id'] == self.graphic_ids[graphic_name]
+            else:
+                layout = np.full(self.tiles.shape, fill_value=False, dtype=bool)
         
         return layout
 
@@ -374,36 +917,125 @@ class GraphicTileMap(Protocol):
             graphic_name: The name of the graphic to apply to the specified layout.
         """
         if layout is not None and self.graphics is not None:
-            self.tiles['graphic_type'][layout] = self.graphics[graphic_name]
+            self.tiles['graphic_id'][layout] = self.graphic_ids[graphic_name]
+            self.mark_dirty(layout)
         elif self.graphics is not None and layout is None and graphic_name != 'default':
-            self.tiles['graphic_type'][:] = self.graphics[graphic_name]
+            self.tiles['graphic_id'][:] = self.graphic_ids[graphic_name]
+            self.mark_dirty()
         elif self.graphics is not None and layout is None and graphic_name == 'default':
-            self.tiles['graphic_type'][:] = self.graphics['default']
+            self.tiles['graphic_id'][:] = self.graphic_ids['default']
+            self.mark_dirty()
 
-    def get_state_bits(self, bit: str) -> np.ndarray:
-        return deepcopy(self.tiles[bit])
+    def get_state_bits(self, bit: str, copy: bool = False) -> np.ndarray:
+        """Returns a state bit of every tile as a read-only view, or as a writeable copy when `copy` is True."""
+        if self._state_plane is not None:
+            state_bits = (self._state_plane & self.state_bit_mask(bit)) != 0
+            return state_bits if copy else read_only_view(state_bits)
+        
+        return np.copy(self.tiles[bit]) if copy else read_only_view(self.tiles[bit])
     
     def set_state_bits(self, bit: str, mask: np.ndarray) -> None:
+        changed = self.get_state_bits(bit) != mask
+        if self._dirty is not None:
+            self._dirty |= changed
+
+        if bit in (self.vision_bit, self.movement_bit) and changed.any():
+            self._touch_state_bit(bit)
+
+        if self._state_plane is not None:
+            bit_mask = self._state_plane.dtype.type(self.state_bit_mask(bit))
+            self._state_plane &= ~bit_mask
+            self._state_plane[np.broadcast_to(np.asarray(mask, dtype=bool), self._state_plane.shape)] |= bit_mask
+            return
+        
         self.tiles[bit][:] = mask
 
     def reset_state_bits(self, bit: str) -> None:
+        if self._dirty is not None:
+            self._dirty |= self.get_state_bits(bit)
+
+        self._touch_state_bit(bit)
+
+        if self._state_plane is not None:
+            self._state_plane &= ~self._state_plane.dtype.type(self.state_bit_mask(bit))
+            return
+        
         self.tiles[bit][:] = False
 
-    def get_state(self) -> np.ndarray | None:
+    def get_state(self, copy: bool = False) -> np.ndarray | None:
+        """Returns the resolved graphic of every tile as a read-only view, or as a writeable copy when `copy` is True."""
         if self.graphics is not None:
-            return deepcopy(self.tiles['graphic'][:])
+            return np.copy(self.tiles['graphic']) if copy else read_only_view(self.tiles['graphic'])
     
-    def update_state(self) -> None:
+    def get_state_index(self, region: Tuple[slice, slice] | None = None) -> np.ndarray:
+        """Returns the packed state index of every tile, or of the tiles inside `region`. The first statespace bit is 
+        the most significant bit."""
+        region = region if region is not None else (slice(None), slice(None))
+
+        if self._state_plane is not None:
+            return self._state_plane[region]
+        
+        n_state_bits = len(self.statespace['bits']) if self.statespace is not None else 0
+        state_index = np.zeros(self.tiles[region].shape, dtype=self.state_index_dtype)
+
         if self.statespace is not None:
-            for index in np.unique(self.statespace_index_map):
-                mask = self.statespace_index_map == index
-                state_label = self.statespace['label_map'][index]
-                color = self.tiles['graphic_type'][state_label][mask]
-                if color is not None:
-                    self.tiles['graphic'][mask] = color
+            for idx, bit in enumerate(self.statespace['bits']):
+                state_index |= self.tiles[bit][region].astype(self.state_index_dtype) << (n_state_bits - 1 - idx)
+
+        return state_index
+
+    def update_state(self) -> None:
+        """Re-resolves the graphics of the dirty tiles from their current state labels."""
+        if self.statespace is None or 'label_lut' not in self.statespace:
+            return
+        
+        region = self.dirty_region if self._dirty is not None else (slice(None), slice(None))
+        if region is None:
+            return
+        
+        dirty = self._dirty[region] if self._dirty is not None else np.full(self.tiles.shape, fill_value=True, dtype=bool)
+        graphics = self.tiles['graphic'][region]
+        graphic_ids = self.tiles['graphic_id'][region][dirty]
+        state_index = self.get_state_index(region)[dirty]
+        resolved = self.render_lut[graphic_ids, state_index]
+        graphics[dirty] = resolved
+
+        if self._render_buffer is not None and self._render_buffer.shape == self.tiles.shape:
+            self._render_buffer[region][dirty] = resolved
+
+        if self._dirty is not None and self._updated is not None:
+            self._updated[region] |= dirty
+            self._dirty[region] = False
+
+    def get_render_buffer(self) -> np.ndarray:
+        """Returns the resolved graphics as a read-only, Fortran-ordered console_graphic buffer laid out like 
+        `Console.rgb` for consoles created with order="F". 
+
+        The buffer is filled from the render lookup table on first use and afterwards kept current by `update_state`, 
+        which only rewrites the dirty tiles, so tiles changed since the last `update_state` show up after the next one."""
+        if self._render_buffer is None or self._render_buffer.shape != self.tiles.shape:
+            self._render_buffer = np.empty(self.tiles.shape, dtype=console_graphic, order='F')
+            self._fill_render_buffer()
+        elif self.statespace is None or 'label_lut' not in self.statespace:
+            self._fill_render_buffer()
+
+        return read_only_view(self._render_buffer)
+
+    def _fill_render_buffer(self) -> None:
+        """Resolves every tile through the render lookup table into the render buffer."""
+        n_state_indices = self.render_lut.shape[1]
+        lut_index = self.tiles['graphic_id'].astype(np.intp) * n_state_indices + self.get_state_index()
+        np.take(self.render_lut.reshape(-1), lut_index, out=self._render_buffer)
 
     def reset_state(self) -> None:
-        if self.statespace is not None:
+        self.mark_dirty()
+        self._touch_state_bit(self.vision_bit)
+        self._touch_state_bit(self.movement_bit)
+
+        if self._state_plane is not None:
+            self._state_plane[:] = 0
+        
+        elif self.statespace is not None:
             for bit in self.statespace['bits']:
                 self.tiles[bit][:] = False
             
@@ -413,7 +1045,51 @@ class GraphicTileMap(Protocol):
         self.areas.clear()
         self.paths.clear()
 
+    def clone(self) -> GraphicTileMap:
+        """Returns a copy of the tile map. The compiled manifest is shared by reference, so nothing else in the map is walked; the 
+        tiles and the state plane are copied with a single `np.copy` each, and the areas and paths are copied so the clone owns 
+        them. The dirty and updated masks are only copied when they have tiles set; a resolved template gets fresh masks, which 
+        are zero pages until written. This is what makes spawning small maps cheap; on large grids the tile copy dominates, and a 
+        clone costs about as much as `deepcopy` (see benchmarks/bench_map_clone.py)."""
+        clone = copy(self)
+        clone._grid = self.grid.clone()
+        clone.tiles = clone.grid.tiles
+        clone._state_plane = None if self._state_plane is None else np.copy(self._state_plane)
+        clone._dirty = self._copy_mask(self._dirty)
+        clone._updated = self._copy_mask(self._updated)
+        clone._render_buffer = None
+        clone.fov_cache = FOVCache(self.fov_cache.maxsize)
+        clone._visibility = dict(self._visibility)
+        clone.areas = deepcopy(self.areas)
+        clone.paths = deepcopy(self.paths)
+
+        return clone
+
+    @staticmethod
+    def _copy_mask(mask: np.ndarray | None) -> np.ndarray | None:
+        if mask is None:
+            return None
+        return np.copy(mask) if mask.any() else np.zeros(mask.shape, dtype=bool)
+
+    def empty_like(self) -> GraphicTileMap:
+        """Returns a new tile map with the same compiled manifest and grid size as this one, with every tile set to the default 
+        graphic and a cleared state. The manifest is not recompiled."""
+        empty = copy(self)
+        empty._grid = self.grid.clone(tiles=np.zeros_like(self.tiles))
+        empty.tiles = empty.grid.tiles
+        empty.areas = OrderedDict()
+        empty.paths = OrderedDict()
+        empty.fov_cache = FOVCache(self.fov_cache.maxsize)
+        empty._visibility = {}
+        empty._area_graph = None
+        empty._initialize_tiles()
+
+        return empty
+
     def object_collision(self, location: TileCoordinate) -> bool:
         isblocked = False
-        isblocked = bool(self.tiles['blocks_movement'][location.x, location.y])
+        if self._state_plane is not None:
+            isblocked = bool(self._state_plane[location.x, location.y] & self.state_bit_mask('blocks_movement'))
+        else:
+            isblocked = bool(self.tiles['blocks_movement'][location.x, location.y])
         return isblocked
\ No newline at end of file
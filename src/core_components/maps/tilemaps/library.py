@@ -23,6 +23,7 @@ DEFAULT_MANIFEST = GraphicsManifestDict({'dimensions': {'grid_size': TileTuple((
                                                                                             }
                                                                             },
                                                             'label_map': (),
+                                                            'storage': 'fields',
                                                                 },
                                          'colors': {"fill_bluebell": (ord(" "), (255, 255, 255), (50, 50, 150)),
                                                     "fill_light_yellow": (ord(" "), (255, 255, 255), (200, 180, 50)),
@@ -53,9 +54,11 @@ DEFAULT_MANIFEST = GraphicsManifestDict({'dimensions': {'grid_size': TileTuple((
 
 
 class DefaultTileMap(GraphicTileMap):
+    """The default tile map. The state bit properties return read-only views of the tile map; use 
+    `get_state_bits(bit, copy=True)` for a writeable copy."""
 
-    def __init__(self, graphics_manifest=DEFAULT_MANIFEST) -> None:
-        super().__init__(graphics_manifest=graphics_manifest)
+    def __init__(self, graphics_manifest=DEFAULT_MANIFEST, tile_file=None, mode='w+') -> None:
+        super().__init__(graphics_manifest=graphics_manifest, tile_file=tile_file, mode=mode)
     
     @property
     def blocks_movement(self) -> np.ndarray:
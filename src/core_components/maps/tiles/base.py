@@ -5,8 +5,10 @@ from __future__ import annotations
 from warnings import warn
 import numpy as np
 import random
-from typing import Protocol, Dict, Tuple, List, NewType
-from copy import deepcopy
+from typing import Any, Protocol, Dict, Tuple, List, NewType
+from copy import copy, deepcopy
+from os import PathLike, fspath, path
+import json
 import numpy as np
 
 
@@ -128,9 +130,27 @@ class BaseTileGrid(TileCoordinateSystem):
 
     _tiles: np.ndarray
     _dtype: np.dtype
-    
-    def __init__(self, dtype: np.dtype, size: TileTuple | None = None) -> None:
-
+    _filename: str | None = None
+    _mode: str = 'w+'
+    _metadata: Dict[str, Any]
+    
+    def __init__(self, dtype: np.dtype, size: TileTuple | None = None, filename: str | PathLike | None = None, mode: str = 'w+', 
+                 metadata: Dict[str, Any] | None = None) -> None:
+        """Args:
+            dtype: The structured dtype of a tile.
+            size: The size of the grid. The tiles are allocated when the size is set.
+            filename: When set, the tiles are backed by an `np.memmap` of this file instead of process memory. The shape and dtype 
+                of the tiles are written to a '<filename>.meta' header next to it, and checked when the file is opened again.
+            mode: The memmap mode: 'w+' creates or overwrites the file, 'r+' opens it for reading and writing, 'r' opens it 
+                read-only and 'c' opens it copy-on-write.
+            metadata: JSON-serialisable values stored in the header with the shape and dtype, which must also match on open.
+        """
+        if mode not in ('w+', 'r+', 'r', 'c'):
+            raise ValueError(f"Unsupported memmap mode '{mode}'.")
+        
+        self._filename = fspath(filename) if filename is not None else None
+        self._mode = mode
+        self._metadata = dict(metadata) if metadata is not None else {}
         self._dtype = dtype
         if self._dtype.names:
             for prop in self._dtype.names:
@@ -186,9 +206,66 @@ class BaseTileGrid(TileCoordinateSystem):
     def set_area(self, *args, **kwargs) -> None:
         raise NotImplementedError()
         
+    @property
+    def filename(self) -> str | None:
+        """Returns the file backing the tiles, or None when the tiles live in process memory."""
+        return self._filename
+    
+    @property
+    def mode(self) -> str:
+        return self._mode
+    
+    @property
+    def is_memmap(self) -> bool:
+        return self._filename is not None
+    
+    @property
+    def header(self) -> Dict[str, Any]:
+        """The header written next to a memory-mapped grid: its shape, dtype descriptor and metadata, as stored in JSON."""
+        header = {'shape': [self.width, self.height], 'dtype': self._dtype.descr, **self._metadata}
+        return json.loads(json.dumps(header))
+    
+    def flush(self) -> None:
+        """Writes pending changes of a memory-mapped grid to its file."""
+        if isinstance(self._tiles, np.memmap):
+            self._tiles.flush()
+        
     def _initialize_grid(self) -> None:
         """This method should be overridden by subclasses to initialize the tile grid."""
-        self._tiles = np.zeros((self.width, self.height), dtype=self._dtype)
+        if self._filename is not None:
+            if self._mode == 'w+':
+                self._write_header()
+            else:
+                self._check_header()
+            self._tiles = np.memmap(self._filename, dtype=self._dtype, mode=self._mode, shape=(self.width, self.height))
+        else:
+            self._tiles = np.zeros((self.width, self.height), dtype=self._dtype)
+
+    def _write_header(self) -> None:
+        with open(f"{self._filename}.meta", 'w') as file:
+            json.dump(self.header, file)
+
+    def _check_header(self) -> None:
+        """Raises a ValueError unless the tile file was written for a grid with this shape, dtype and metadata."""
+        try:
+            with open(f"{self._filename}.meta") as file:
+                header = json.load(file)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"The tile file '{self._filename}' has no readable header.") from e
+        
+        expected = self.header
+        mismatched = [key for key in expected.keys() | header.keys() if header.get(key) != expected.get(key)]
+        if mismatched:
+            raise ValueError(f"The tile file '{self._filename}' does not match this grid: {', '.join(sorted(mismatched))} differ.")
+        if path.getsize(self._filename) != self.width * self.height * self._dtype.itemsize:
+            raise ValueError(f"The tile file '{self._filename}' does not match the size in its header.")
+
+    def clone(self, tiles: np.ndarray | None = None) -> BaseTileGrid:
+        """Returns an in-memory grid with the same dtype and size as this one, holding a copy of its tiles or the given tiles."""
+        clone = copy(self)
+        clone._filename = None
+        clone._tiles = np.copy(self.tiles) if tiles is None else tiles
+        return clone
         
 
 class TileCoordinate(TileCoordinateSystemElement):
@@ -2,15 +2,18 @@
 # -*- coding: utf-8 -*-
 
 from __future__ import annotations
-from typing import Set, List, Callable, TYPE_CHECKING, TypeVar
+from typing import Dict, Set, List, Callable, Iterable, Tuple, TYPE_CHECKING, TypeVar
 import random
 import numpy as np
+from numpy.typing import ArrayLike
 from copy import deepcopy
 
 from core_components.entities.library import *
 from core_components.entities import attributes
+from core_components.entities.store import EntityStore
 from core_components.maps.tilemaps import DEFAULT_MANIFEST, DefaultTileMap
 from core_components.maps.tiles import TileTuple
+from core_components.maps.pathfinding import MovementCostGrid
 
 if TYPE_CHECKING:
     from state import GameState
@@ -43,19 +46,50 @@ class Roster:
                             physical=attributes.PhysicalStats(max_hp=16, constitution=12),
                             combat=attributes.CombatStats(defense=1, attack_power=4))
 
-    """ The Roster component manages the state of all entities in the game. """
+    """ The Roster component manages the state of all entities in the game. 
+    
+    Entities spawned by the roster report their moves and blocking changes through `entity_moved` and `entity_blocking_changed`, 
+    which keep the movement cost grid of the active map up to date for pathfinding and the spatial index of entities by (x, y) 
+    tile up to date for location queries. The occupancy grid counts the movement-blocking entities on each tile of the active 
+    map, for vectorised "is anything blocking here" checks; the movement cost grid reads its penalties from the same array. 
+    With `use_store`, the charactors' stats, positions and flags are also kept in a columnar EntityStore for NumPy processing. 
+    
+    The player, actors, live actors, live AI actors and blocking entities are kept in category sets that are updated when an 
+    entity is added, removed, dies (`entity_alive_changed`) or stops blocking, so the properties reading them only copy the set 
+    instead of filtering every entity. The sets are insertion-ordered dicts, so actors are listed in the order they spawned. """
 
-    __slots__ = ("state", "entities", "spawn")
+    __slots__ = ("state", "entities", "spawn", "movement_costs", "occupancy", "occupancy_map", "spatial_index", "store", 
+                 "_player", "_actors", "_live_actors", "_live_ai_actors", "_blockers")
     
     state: GameState
     entities: Set[BaseEntity]
     spawn: Callable
+    movement_costs: MovementCostGrid | None
+    occupancy: np.ndarray | None
+    occupancy_map: DefaultTileMap | None
+    spatial_index: Dict[Tuple[int, int], List[BaseEntity]]
+    store: EntityStore | None
+    _player: Charactor | None
+    _actors: Dict[MortalEntity, None]
+    _live_actors: Dict[MortalEntity, None]
+    _live_ai_actors: Dict[AICharactor, None]
+    _blockers: Dict[BlockingEntity, None]
 
     def __init__(self, state: GameState | None = None) -> None:
         if state is not None:
             self.state = state
     
         self.entities = set()    
+        self.movement_costs = None
+        self.occupancy = None
+        self.occupancy_map = None
+        self.spatial_index = {}
+        self.store = None
+        self._player = None
+        self._actors = {}
+        self._live_actors = {}
+        self._live_ai_actors = {}
+        self._blockers = {}
 
     @property
     def entity_locations(self) -> List[TileCoordinate]:
@@ -63,62 +97,50 @@ class Roster:
 
     @property
     def player(self) -> Charactor | None:
-        for entity in self.entities:
-            if isinstance(entity, PlayerCharactor):
-                return entity
+        return self._player
       
     @player.setter
     def player(self, new_player: Charactor) -> None:
-        if self.player is not None:
-            self.entities.remove(self.player)
+        if self._player is not None and self._player is not new_player:
+            self.remove_entity(self._player)
     
-        self.entities.add(new_player)
+        self.add_entity(new_player)
 
     @property
     def all_actors(self) -> List[BaseEntity]:
-        potential_actors = [entity for entity in self.entities if hasattr(entity, 'is_alive')]
-        return [entity for entity in potential_actors] #type: ignore
+        return list(self._actors)
     
     @property
     def all_non_actors(self) -> List[BaseEntity]:
-        potential_non_actors = [entity for entity in self.entities if not hasattr(entity, 'is_alive')]
-        return [entity for entity in potential_non_actors] #type: ignore
+        return [entity for entity in self.entities if entity not in self._actors]
 
     @property
     def entity_blocked_locations(self) -> List[TileCoordinate]:
-        potential_blockers = [obj for obj in self.entities if hasattr(obj, 'blocks_movement')]
-        return [blocker.location for blocker in potential_blockers if blocker.blocks_movement] #type: ignore
+        return [blocker.location for blocker in self._blockers]
     
     @property
     def live_actors(self) -> List[BaseEntity]:
-        potential_actors = [entity for entity in self.entities if hasattr(entity, 'is_alive')]
-        return [entity for entity in potential_actors if entity.is_alive] #type: ignore
+        return list(self._live_actors)
     
     @property
     def live_ai_actors(self) -> List[AICharactor]:
-        return [entity for entity in self.live_actors if isinstance(entity, AICharactor)]
+        return list(self._live_ai_actors)
 
     def entity_collision(self, entity) -> BlockingEntity | None:
         """Check if the given entity's destination collides with any other entity that blocks movement."""
-    
-        for location in self.entity_blocked_locations:
-            potential_blocker = self.get_entity_at_location(location)[0]
-            if entity.destination == location and isinstance(potential_blocker, BlockingEntity):
+        for potential_blocker in self.spatial_index.get(entity.destination.to_tuple, ()):
+            if potential_blocker is not entity and isinstance(potential_blocker, BlockingEntity) and potential_blocker.blocks_movement:
                 return potential_blocker  # Return the first blocking entity found.
 
         return None
     
     def get_entity_at_location(self, location: TileCoordinate) -> List[BaseEntity]:
-        found_entity = []
-        for entity in self.entities:
-            if entity.location == location:
-                found_entity += [entity]
-        
-        return found_entity
+        return list(self.spatial_index.get(location.to_tuple, ()))
     
     def spawn_player(self, game_map: DefaultTileMap) -> None:
         """Spawn the player in a random room."""
         
+        self.rebuild_occupancy(game_map)
         start_rooms = [area for area in game_map.areas.keys() if not area.startswith('_')]
         start_room = random.choice(start_rooms)
         spawn_location = game_map.areas[start_room].get_random_location()
@@ -128,12 +150,182 @@ class Roster:
         """Spawn a copy of this entity at the given location and return it."""
         clone = deepcopy(entity)
         clone.location = location
-        self.entities.add(clone)
+        self.add_entity(clone)
         return clone
     
+    def add_entity(self, entity: BaseEntity) -> None:
+        """Adds an entity to the roster. There is one player, so adding a different player removes the current one."""
+        if entity in self.entities:
+            return
+        if isinstance(entity, PlayerCharactor) and self._player is not None:
+            self.remove_entity(self._player)
+        
+        self.entities.add(entity)
+        entity.roster = self
+        if isinstance(entity, PlayerCharactor):
+            self._player = entity
+        if isinstance(entity, MortalEntity):
+            self._actors[entity] = None
+            self.entity_alive_changed(entity)
+        if hasattr(entity, 'location'):
+            self.spatial_index.setdefault(entity.location.to_tuple, []).append(entity)
+            if isinstance(entity, BlockingEntity) and entity.blocks_movement:
+                self._blockers[entity] = None
+                self._occupy(entity.location)
+        if self.store is not None and isinstance(entity, Charactor):
+            self.store.add(entity)
+
+    def remove_entity(self, entity: BaseEntity) -> None:
+        if entity not in self.entities:
+            return
+        
+        self.entities.remove(entity)
+        entity.roster = None
+        if self.store is not None and isinstance(entity, Charactor):
+            self.store.remove(entity)
+        if entity is self._player:
+            self._player = None
+        self._actors.pop(entity, None) # type: ignore
+        self._live_actors.pop(entity, None) # type: ignore
+        self._live_ai_actors.pop(entity, None) # type: ignore
+        if hasattr(entity, 'location'):
+            self._unindex(entity, entity.location)
+            if entity in self._blockers:
+                del self._blockers[entity] # type: ignore
+                self._vacate(entity.location)
+
+    def use_store(self, store: EntityStore | None = None) -> EntityStore:
+        """Opts in to keeping the charactors' stats, positions and flags in a columnar entity store, creating one if none is 
+        given. Charactors already on the roster are moved into it, and charactors added or removed later follow."""
+        if self.store is None:
+            self.store = store if store is not None else EntityStore()
+            for entity in self.entities:
+                if isinstance(entity, Charactor):
+                    self.store.add(entity)
+
+        return self.store
+
+    def entity_moved(self, entity: BaseEntity, old_location: TileCoordinate | None, new_location: TileCoordinate) -> None:
+        """Moves the entity's index entry and movement penalty along with it."""
+        if old_location is not None:
+            self._unindex(entity, old_location)
+        self.spatial_index.setdefault(new_location.to_tuple, []).append(entity)
+
+        if old_location is None and isinstance(entity, BlockingEntity) and entity.blocks_movement:
+            self._blockers[entity] = None # Placed for the first time
+        if entity in self._blockers:
+            if old_location is not None:
+                self._vacate(old_location)
+            self._occupy(new_location)
+
+    def entity_blocking_changed(self, entity: BlockingEntity) -> None:
+        """Applies or removes the entity's movement penalty, e.g. when it dies and leaves remains that do not block."""
+        if not hasattr(entity, 'location'):
+            return
+        
+        if entity.blocks_movement:
+            self._blockers[entity] = None
+            self._occupy(entity.location)
+        else:
+            self._blockers.pop(entity, None)
+            self._vacate(entity.location)
+
+    def entity_alive_changed(self, entity: MortalEntity) -> None:
+        """Moves the entity in or out of the live actors, e.g. when it takes lethal damage."""
+        if entity.is_alive:
+            self._live_actors[entity] = None
+            if isinstance(entity, AICharactor):
+                self._live_ai_actors[entity] = None
+        else:
+            self._live_actors.pop(entity, None)
+            self._live_ai_actors.pop(entity, None) # type: ignore
+
+    def _unindex(self, entity: BaseEntity, location: TileCoordinate) -> None:
+        entities_here = self.spatial_index.get(location.to_tuple)
+        if entities_here is not None and entity in entities_here:
+            entities_here.remove(entity)
+            if not entities_here:
+                del self.spatial_index[location.to_tuple]
+
+    def _occupy(self, location: TileCoordinate) -> None:
+        if self.occupancy is not None:
+            self.occupancy[location.x, location.y] += 1
+            if self.movement_costs is not None:
+                self.movement_costs.update(location.x, location.y)
+
+    def _vacate(self, location: TileCoordinate) -> None:
+        if self.occupancy is not None and self.occupancy[location.x, location.y] > 0:
+            self.occupancy[location.x, location.y] -= 1
+            if self.movement_costs is not None:
+                self.movement_costs.update(location.x, location.y)
+
+    def rebuild_occupancy(self, game_map: DefaultTileMap) -> None:
+        """Recounts the movement-blocking entities on a map, which becomes the map the occupancy grid is kept for. The movement 
+        cost grid of the previous map is dropped, since it reads the old counts."""
+        self.occupancy = self._count_occupancy((game_map.grid.width, game_map.grid.height), self._blockers)
+        self.occupancy_map = game_map
+        self.movement_costs = None
+
+    def get_occupancy(self, game_map: DefaultTileMap) -> np.ndarray:
+        """Returns the number of movement-blocking entities on each tile of a map as a read-only (width, height) array, which 
+        can be used directly as a mask. It is counted from the blocking entities once, then kept up to date as they spawn, move, 
+        die and are removed; it is recounted when a different map is asked for."""
+        if self.occupancy is None or self.occupancy_map is not game_map:
+            self.rebuild_occupancy(game_map)
+
+        view = self.occupancy.view() # type: ignore
+        view.flags.writeable = False
+        return view
+
+    def occupied_at(self, game_map: DefaultTileMap, points: ArrayLike) -> np.ndarray:
+        """Returns whether each (x, y) point of an (n, 2) array is occupied by a movement-blocking entity, e.g. to validate the 
+        proposed moves of every mob at once. Points off the map are not occupied."""
+        occupancy = self.get_occupancy(game_map)
+        points = np.asarray(points, dtype=np.intp).reshape(-1, 2)
+        x, y = points[:, 0], points[:, 1]
+        on_map = (x >= 0) & (x < occupancy.shape[0]) & (y >= 0) & (y < occupancy.shape[1])
+        occupied = np.zeros(len(points), dtype=bool)
+        occupied[on_map] = occupancy[x[on_map], y[on_map]] > 0
+        return occupied
+
+    def check_occupancy(self) -> List[Tuple[int, int]]:
+        """Recounts the movement-blocking entities from scratch and returns the (x, y) tiles where the maintained occupancy grid, 
+        or the penalties the movement cost grid applied from it, disagree with the count; an empty list means both are consistent."""
+        if self.occupancy is None:
+            return []
+
+        blockers = [entity for entity in self.entities if isinstance(entity, BlockingEntity) and entity.blocks_movement and hasattr(entity, 'location')]
+        expected = self._count_occupancy(self.occupancy.shape, blockers)
+        mismatched = self.occupancy != expected
+        if self.movement_costs is not None:
+            movement_costs = self.movement_costs
+            mismatched |= movement_costs.cost != movement_costs.terrain + movement_costs.penalty * expected.astype(np.int32)
+
+        return [(int(x), int(y)) for x, y in zip(*np.nonzero(mismatched))]
+
+    @staticmethod
+    def _count_occupancy(shape: Tuple[int, int], blockers: Iterable[BlockingEntity]) -> np.ndarray:
+        occupancy = np.zeros(shape, dtype=np.uint16)
+        for blocker in blockers:
+            occupancy[blocker.location.x, blocker.location.y] += 1
+
+        return occupancy
+
+    def get_movement_costs(self, game_map: DefaultTileMap, penalty: int = 10) -> MovementCostGrid:
+        """Returns the movement cost grid of a map with the entity penalties applied. The grid is built from the blocking 
+        entities once, then kept up to date as they move; it is rebuilt when the map or the penalty changes. The penalties are 
+        read from the roster's occupancy grid, which is shared rather than copied."""
+        occupancy = self.get_occupancy(game_map)
+        movement_costs = self.movement_costs
+        if movement_costs is None or movement_costs.tile_map is not game_map or movement_costs.penalty != penalty:
+            movement_costs = self.movement_costs = MovementCostGrid(game_map, occupancy, penalty=penalty)
+
+        return movement_costs
+    
     def initialize_random_mobs(self, game_map: DefaultTileMap, max_mobs_per_area: int) -> None:
         """Generate mobs """
         n_total_mobs_spawned_in_this_map = 0
+        occupancy = self.get_occupancy(game_map)
         max_total_mobs_in_this_map = len(game_map.areas) * max_mobs_per_area
         
         rooms = [area for name, area in game_map.areas.items() if not name.startswith('_corridor')]
@@ -151,12 +343,10 @@ class Roster:
                 attempts = 100  # Prevent infinite loops
 
                 while n_mobs_spawned_in_this_room < max_mobs_in_this_room and attempts > 0:
-                    current_mob_locations = [mob.location for mob in self.live_ai_actors]
-
                     spawn_location = room.get_random_location()
                     attempts -= 1
                     
-                    if not any(mob_location == spawn_location for mob_location in current_mob_locations):
+                    if not occupancy[spawn_location.x, spawn_location.y]:
                         if random.random() < 0.8:
                             self.spawn_at_location(entity=self.ORC, location=spawn_location)
                         else:
@@ -169,8 +359,6 @@ class Roster:
         corridors = [area for name, area in game_map.areas.items() if name.startswith('_corridor')]
 
         while n_total_mobs_spawned_in_this_map < max_total_mobs_in_this_map:
-            current_mob_locations = [mob.location for mob in self.live_ai_actors]
-
             for corridor in corridors:
                 
                 open_terrain_layout = game_map.blocks_movement == False
@@ -181,7 +369,7 @@ class Roster:
                 spawn_location = TileCoordinate(location_tuple, corridor.parent_map_size)
 
                 if not any(room.contains(spawn_location) for room in game_map.areas.values()):
-                    if not any(mob_location == spawn_location for mob_location in current_mob_locations):
+                    if not occupancy[spawn_location.x, spawn_location.y]:
                         if random.random() < 0.8:
                             self.spawn_at_location(entity=self.ORC, location=spawn_location)
                         else:
@@ -1 +1 @@
-from core_components.ui.graphics.tile_types import ascii_graphic
\ No newline at end of file
+from core_components.ui.graphics.tile_types import ascii_graphic, console_graphic
\ No newline at end of file
@@ -9,5 +9,15 @@ ascii_graphic = np.dtype(
     ], metadata={"__name__": "ascii_graphic"}
 )
 
+# Console graphic dtype definition. Same fields as ascii_graphic, laid out like tcod's Console.rgb (4-byte aligned)
+console_graphic = np.dtype(
+    {
+        "names": ["ch", "fg", "bg"],
+        "formats": [np.int32, "3B", "3B"],
+        "offsets": [0, 4, 8],
+        "itemsize": 12,
+    }, metadata={"__name__": "console_graphic"}
+)
+
 # SHROUD represents unexplored, unseen tiles
 SHROUD = np.array((ord(" "), (255, 255, 255), (0, 0, 0)), dtype=ascii_graphic)
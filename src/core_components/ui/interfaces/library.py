@@ -13,8 +13,6 @@ from core_components.ui.graphics import colors
 if TYPE_CHECKING:
     from state import GameState
 
-from core_components.ui.graphics.tile_types import SHROUD
-
 
 class HealthBarWidget(BaseUIWidget):
     """ A simple health bar widget to display an entity's health. """
@@ -65,9 +63,8 @@ class MainMapDisplay(BaseUIWidget):
         """
         Renders the map.
 
-        If a tile is in the "visible" array, then draw it with the "light" colors.
-        If it isn't, but it's in the "explored" array, then draw it with the "dark" colors.
-        Otherwise, the default is "SHROUD".
+        Each tile is drawn with the graphic of its state label (shroud, first_look, visible or explored), copied from 
+        the tile map's render buffer, which `update_state` keeps current for the dirty tiles.
         """
         player = state.roster.player
         game_map = state.map.active
@@ -81,11 +78,7 @@ class MainMapDisplay(BaseUIWidget):
         #     console_width = window_width - 5
         #     console_height = window_height - 5
 
-        console.rgb[0 : self.width, 0 : self.height] = np.select(
-            condlist=[game_map.visible, game_map.seen],
-            choicelist=[game_map.tiles['graphic_type']['visible'], game_map.tiles['graphic_type']['explored']],
-            default=SHROUD,
-        ) 
+        console.rgb[0 : self.width, 0 : self.height] = game_map.get_render_buffer()[0 : self.width, 0 : self.height]
 
         if len(actors) > 0:
             for actor in state.roster.live_actors:
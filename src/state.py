@@ -3,7 +3,8 @@
 
 from __future__ import annotations
 import time
-from typing import List, Tuple
+from collections import Counter
+from typing import Any, Dict, Hashable, List, Set, Tuple
 import queue
 from queue import Queue
 import tcod
@@ -19,6 +20,51 @@ from core_components import Roster
 from core_components import Atlas
 from core_components import UIDisplay
 
+class CoalescingQueue(Queue):
+    """A FIFO queue that collapses repeated idempotent items. An item whose class sets `coalescable = True` is dropped when an 
+    item with the same `coalesce_key` is still waiting in the queue. The waiting item is handled after everything already queued, 
+    so an event such as FOVUpdateEvent still sees the latest state when it runs. Received and coalesced items are counted per type."""
+
+    _pending: Set[Hashable]
+    received: Counter[str]
+    coalesced: Counter[str]
+
+    def _init(self, maxsize: int) -> None:
+        super()._init(maxsize)
+        self._pending = set()
+        self.received = Counter()
+        self.coalesced = Counter()
+
+    def _put(self, item: Any) -> None:
+        self.received[type(item).__name__] += 1
+        key = self.coalesce_key(item)
+        if key is not None:
+            if key in self._pending:
+                self.coalesced[type(item).__name__] += 1
+                self.unfinished_tasks -= 1 # Queue.put counts the dropped item as a task
+                return
+            self._pending.add(key)
+
+        super()._put(item)
+
+    def _get(self) -> Any:
+        item = super()._get()
+        key = self.coalesce_key(item)
+        if key is not None:
+            self._pending.discard(key)
+        return item
+    
+    @property
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Returns the received and coalesced item counts per item type."""
+        with self.mutex:
+            return {'received': dict(self.received), 'coalesced': dict(self.coalesced)}
+    
+    @staticmethod
+    def coalesce_key(item: Any) -> Hashable | None:
+        return item.coalesce_key if getattr(item, 'coalescable', False) else None
+
+
 class GameState:
     """
     The States class has a roster of entities, the game map, and the UI states. It is used by the Engine to pass the state of the entities, game map, and UI 
@@ -30,8 +76,8 @@ class GameState:
     __slots__ = ("roster", "map","ui", "events", "actions", "dispatchers", "game_over", "log")
     
     ui: UIDisplay
-    events: Queue[BaseGameEvent | tcod.event.Event]
-    actions: Queue[GeneralAction]
+    events: CoalescingQueue[BaseGameEvent | tcod.event.Event]
+    actions: CoalescingQueue[GeneralAction]
     dispatchers: List[BaseEventDispatcher]
     game_over: threading.Event
     roster: Roster
@@ -45,12 +91,17 @@ class GameState:
         self.ui = UIDisplay()
         self.ui.state = self
         
-        self.events = Queue()
-        self.actions = Queue()
+        self.events = CoalescingQueue()
+        self.actions = CoalescingQueue()
         self.game_over = threading.Event()
         self.dispatchers = [SystemDispatcher(), InputDispatcher(), AIDispatcher()]   
         self.log = MessageLog()
         
+    @property
+    def queue_stats(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """Returns the received and coalesced counts of the event and action queues."""
+        return {'events': self.events.stats, 'actions': self.actions.stats}
+
     def dispatch(self) -> None:
 
         while True:
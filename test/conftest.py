@@ -0,0 +1,21 @@
+import pytest
+import random
+from typing import Callable
+from sys import path
+path.append('c:\\Users\\jason\\workspaces\\repos\\jrl\\src')
+
+from state import GameState
+
+
+@pytest.fixture
+def populated_state() -> Callable[..., GameState]:
+    """Returns a factory of seeded game states with a generated map, the player and up to `n_mobs` random mobs per area."""
+    def populate(seed: int = 6, n_mobs: int = 5) -> GameState:
+        random.seed(seed)
+        state = GameState()
+        state.map.create_map()
+        state.roster.spawn_player(state.map.active)
+        state.roster.initialize_random_mobs(state.map.active, n_mobs)
+        return state
+
+    return populate
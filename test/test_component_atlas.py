@@ -18,7 +18,7 @@ def test_component_atlas_initialization():
 def test_component_atlas_create_map():
     atlas = Atlas()
     atlas.create_map()
-    n_walls = np.sum(atlas.active.tiles['graphic_type']['name'] == 'wall')
+    n_walls = np.sum(atlas.active.get_tiles()['name'] == 'wall')
     n_blocks_movement = np.sum(atlas.active.tiles['blocks_movement'])
     n_blocks_vision = np.sum(atlas.active.tiles['blocks_vision'])
     assert n_walls > 0
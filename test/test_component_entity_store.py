@@ -0,0 +1,78 @@
+import pytest
+from copy import deepcopy
+from sys import path
+path.append('c:\\Users\\jason\\workspaces\\repos\\jrl\\src')
+
+import numpy as np
+
+from core_components.entities.library import MobCharactor
+from core_components.entities.store import EntityStore
+
+
+# Tests for EntityStore
+def test_entity_store_views_share_the_columns(populated_state):
+    # Arrange
+    state = populated_state()
+    state.roster.use_store(EntityStore(capacity=4))
+    roster, grid = state.roster, state.map.active.grid
+    store = roster.store
+    player = roster.player
+    mob = roster.live_ai_actors[0]
+    slot = store.slot_of(mob)
+
+    # Act
+    mob.take_damage(2)
+    mob.location = grid.get_location(1, 2)
+    player.fov_radius = 6
+    player.near_death_threshold = 9
+    copy = deepcopy(mob)
+    roster.remove_entity(mob)
+    spawned = roster.spawn_at_location(entity=roster.ORC, location=grid.get_location(3, 4))
+
+    # Assert
+    try:
+        assert len(store) == len(roster.entities) and store.capacity >= len(store), "Expected the store to grow to hold every charactor"
+        assert store.column('fov_radius')[store.slot_of(player)] == 6, "Expected attributes set on a charactor to land in its column"
+        assert store.column('near_death_threshold')[store.slot_of(player)] == 9, "Expected the near death threshold to stay in sync"
+        assert copy.physical.hp == mob.physical.hp == mob.physical.max_hp - 2 and (copy.location.x, copy.location.y) == (1, 2), "Expected stats and moves to be kept"
+        assert type(copy) is MobCharactor and copy not in store, "Expected copies of stored charactors to be detached"
+        assert type(mob) is MobCharactor and mob not in store and 'fov_radius' in mob.__dict__, "Expected removal to restore plain attributes"
+        assert store.slot_of(spawned) == slot and store.column('x')[slot] == 3 and store.column('hp')[slot] == 10, "Expected the freed slot to be reused"
+        assert not store.column('hp').flags.writeable, "Expected read-only columns"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_entity_store_resolves_damage_in_bulk(populated_state):
+    # Arrange
+    state = populated_state()
+    state.roster.use_store(EntityStore(capacity=4))
+    roster, store = state.roster, state.roster.store
+    player = roster.player
+    mobs = roster.live_ai_actors
+    slots = np.array([store.slot_of(mob) for mob in mobs[:3]])
+    live_slots = sorted(store.slot_of(actor) for actor in roster.live_actors)
+
+    # Act
+    in_range = store.in_range(player.location.x, player.location.y, 100)
+    damage = store.attack_damage(np.full(3, store.slot_of(player)), slots)
+    died = store.apply_damage(np.concatenate((slots, slots[:1])), np.concatenate((damage, [100])))
+
+    # Assert
+    try:
+        assert sorted(in_range.tolist()) == live_slots, "Expected every live charactor in range"
+        assert damage.tolist() == [max(0, player.combat.attack_power - mob.combat.defense) for mob in mobs[:3]], "Expected attack power less defense"
+        assert died.tolist() == [slots[0]], "Expected only the mob hit twice to die"
+        assert not mobs[0].is_alive and mobs[0] not in roster.live_ai_actors, "Expected the roster to hear about deaths from the store"
+        assert [mob.physical.hp for mob in mobs[1:3]] == [mob.physical.max_hp - dealt for mob, dealt in zip(mobs[1:3], damage[1:])], "Expected hp to drop by the damage"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
@@ -0,0 +1,58 @@
+import pytest
+from sys import path
+path.append('c:\\Users\\jason\\workspaces\\repos\\jrl\\src')
+
+from core_components.ai.events import FOVUpdateEvent, GameStartEvent
+from core_components.ai.actions import FOVUpdateAction, NoAction
+from state import CoalescingQueue, GameState
+
+
+# Tests for CoalescingQueue
+def test_coalescing_queue_collapses_pending_events():
+    # Arrange
+    events = CoalescingQueue()
+
+    # Act
+    events.put(FOVUpdateEvent(""))
+    events.put(GameStartEvent())
+    events.put(FOVUpdateEvent(""))
+    events.put(FOVUpdateEvent(""))
+    first_batch = [events.get_nowait() for _ in range(events.qsize())]
+    events.put(FOVUpdateEvent(""))
+    second_batch = [events.get_nowait() for _ in range(events.qsize())]
+
+    # Assert
+    try:
+        assert [type(event) for event in first_batch] == [FOVUpdateEvent, GameStartEvent], "Expected queued FOV updates to collapse into the first one"
+        assert [type(event) for event in second_batch] == [FOVUpdateEvent], "Expected a new FOV update once the pending one was taken"
+        assert events.stats == {'received': {'FOVUpdateEvent': 4, 'GameStartEvent': 1}, 'coalesced': {'FOVUpdateEvent': 2}}, "Expected received and coalesced counts per type"
+        assert events.unfinished_tasks == 3, "Expected coalesced events not to be counted as tasks"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_game_state_coalesces_fov_actions():
+    # Arrange
+    state = GameState()
+
+    # Act
+    state.actions.put(FOVUpdateAction(state))
+    state.actions.put(NoAction())
+    state.actions.put(FOVUpdateAction(state))
+    state.actions.put(NoAction())
+
+    # Assert
+    try:
+        assert state.actions.qsize() == 3, "Expected the repeated FOV update action to be dropped and non-coalescable actions kept"
+        assert state.queue_stats['actions']['coalesced'] == {'FOVUpdateAction': 1}, "Expected the game state to report coalesced actions"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
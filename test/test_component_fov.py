@@ -0,0 +1,270 @@
+import pytest
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sys import path
+path.append('c:\\Users\\jason\\workspaces\\repos\\jrl\\src')
+import numpy as np
+from tcod import libtcodpy
+from tcod.map import compute_fov
+
+from core_components.maps.fov import FOVCache, VisibilityTable
+from core_components.maps.generators import DungeonGenerator
+from core_components.maps.tilemaps import DefaultTileMap
+from core_components.ai.actions import FOVUpdateAction
+
+
+def open_map() -> DefaultTileMap:
+    tile_map = DefaultTileMap()
+    floor = np.full(tile_map.tiles.shape, fill_value=False)
+    floor[1:-1, 1:-1] = True
+    tile_map.set_tiles(floor, 'floor')
+    tile_map.update_state()
+    return tile_map
+
+
+# Tests for FOVCache
+def test_fov_cache_lru_eviction():
+    # Arrange
+    cache = FOVCache(maxsize=2)
+    computed = []
+    def compute(key):
+        computed.append(key)
+        return np.full((2, 2), fill_value=key)
+
+    # Act
+    cache.get(1, lambda: compute(1))
+    cache.get(2, lambda: compute(2))
+    cache.get(1, lambda: compute(1))
+    cache.get(3, lambda: compute(3))
+    result = cache.get(1, lambda: compute(1))
+
+    # Assert
+    try:
+        assert computed == [1, 2, 3], "Expected cached keys not to be recomputed"
+        assert 2 not in cache and 1 in cache and 3 in cache, "Expected the least recently used key to be evicted"
+        assert (cache.hits, cache.misses) == (2, 3), "Expected hits and misses to be counted"
+        assert not result.flags.writeable, "Expected cached results to be read-only"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+# Tests for the tile map FOV cache
+def test_tile_map_compute_fov_cached():
+    # Arrange
+    tile_map = open_map()
+    expected_fov = compute_fov(~tile_map.blocks_vision, (10, 10), radius=8, algorithm=libtcodpy.FOV_RESTRICTIVE)
+
+    # Act
+    first_fov = tile_map.compute_fov(10, 10, radius=8)
+    second_fov = tile_map.compute_fov(10, 10, radius=8)
+    shadow_fov = tile_map.compute_fov(10, 10, radius=8, algorithm=libtcodpy.FOV_SHADOW)
+
+    # Assert
+    try:
+        assert np.array_equal(first_fov, expected_fov), "Expected the cached FOV to match tcod's compute_fov"
+        assert second_fov is first_fov, "Expected a repeated FOV query to be served from the cache"
+        assert shadow_fov is not first_fov, "Expected the algorithm to be part of the cache key"
+        assert tile_map.fov_cache.hits == 1 and tile_map.fov_cache.misses == 2, "Expected one hit and two misses"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_tile_map_vision_generation():
+    # Arrange
+    tile_map = open_map()
+    wall = np.full(tile_map.tiles.shape, fill_value=False)
+    wall[12, 5:15] = True
+    visible = np.full(tile_map.tiles.shape, fill_value=True)
+    before_fov = tile_map.compute_fov(10, 10, radius=8)
+    generation = tile_map.vision_generation
+
+    # Act
+    tile_map.set_state_bits('visible', visible)
+    unchanged_generation = tile_map.vision_generation
+    tile_map.paint_many([(wall, 'wall')])
+    after_fov = tile_map.compute_fov(10, 10, radius=8)
+
+    # Assert
+    try:
+        assert unchanged_generation == generation, "Expected other state bits to leave the vision generation unchanged"
+        assert tile_map.vision_generation != generation, "Expected painting walls to bump the vision generation"
+        assert before_fov[14, 10] and not after_fov[14, 10], "Expected the new wall to block the recomputed FOV"
+        assert tile_map.clone().fov_cache is not tile_map.fov_cache, "Expected clones to start with their own FOV cache"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+# Tests for FOVUpdateAction spotting
+def test_fov_update_reverse_spotting_is_symmetric(populated_state):
+    # Arrange
+    state = populated_state(seed=7, n_mobs=30)
+    player, mobs = state.roster.player, state.roster.live_ai_actors
+    transparency = state.map.active.transparency
+    expected_spotting = [bool(compute_fov(transparency, (mob.location.x, mob.location.y), radius=mob.fov_radius, 
+                                          algorithm=libtcodpy.FOV_SYMMETRIC_SHADOWCAST)[player.location.x, player.location.y]) for mob in mobs]
+
+    # Act
+    action = FOVUpdateAction(state)
+    action.spotting = 'reverse'
+    actual_spotting = action.reverse_spotting(player, mobs)
+    action.perform()
+
+    # Assert
+    try:
+        assert actual_spotting == expected_spotting, "Expected one reverse FOV to agree with each mob's own symmetric FOV"
+        assert [mob.is_spotting for mob in mobs] == expected_spotting, "Expected perform to set the spotting flags in reverse mode"
+        assert state.map.active.fov_cache.misses == 2, "Expected one player FOV and one reverse spotting FOV"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_fov_update_threaded_spotting_matches_sequential(populated_state):
+    # Arrange
+    state = populated_state(seed=11, n_mobs=30)
+    player, mobs = state.roster.player, state.roster.live_ai_actors
+    sequential_action = FOVUpdateAction(state)
+    threaded_action = FOVUpdateAction(state)
+    threaded_action.workers = 4
+
+    # Act
+    sequential_spotting = sequential_action.exact_spotting(player, mobs)
+    state.map.active.fov_cache.clear()
+    threaded_spotting = threaded_action.exact_spotting(player, mobs)
+
+    # Assert
+    try:
+        assert threaded_spotting == sequential_spotting, "Expected threaded spotting to match the sequential path in roster order"
+        assert state.map.active.fov_cache.misses == len({(mob.location.x, mob.location.y) for mob in mobs}), "Expected one FOV per mob location"
+        assert FOVUpdateAction.executor(4) is FOVUpdateAction.executor(4), "Expected actions to share one thread pool"
+        assert FOVUpdateAction.executor(1) is None, "Expected one worker to take the sequential path"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+# Tests for VisibilityTable
+def test_visibility_table_matches_compute_fov(tmp_path):
+    # Arrange
+    random.seed(3)
+    tile_map = DungeonGenerator().generate(visibility_radius=8)
+    table = tile_map.get_visibility_table(8, libtcodpy.FOV_SHADOW)
+    open_x, open_y = np.nonzero(tile_map.transparency)
+
+    # Act
+    table.save(tmp_path / 'visibility.npz') # type: ignore
+    loaded_table = VisibilityTable.load(tmp_path / 'visibility.npz')
+
+    # Assert
+    try:
+        assert table is not None and len(table.packed) == len(open_x), "Expected one packed row per open tile"
+        for x, y in list(zip(open_x.tolist(), open_y.tolist()))[::7]:
+            expected_fov = compute_fov(tile_map.transparency, (x, y), radius=8, algorithm=libtcodpy.FOV_SHADOW)
+            assert np.array_equal(table.visible_from(x, y), expected_fov), f"Expected the table FOV from {(x, y)} to match compute_fov" # type: ignore
+            target_x, target_y = min(x + 3, tile_map.grid.width - 1), y
+            assert table.is_visible(x, y, target_x, target_y) == expected_fov[target_x, target_y], "Expected is_visible to read the same bit" # type: ignore
+        assert loaded_table.matches(tile_map.transparency), "Expected a saved table to match the walls it was built from"
+        assert np.array_equal(loaded_table.packed, table.packed), "Expected the saved table to round trip" # type: ignore
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_tile_map_visibility_table_lifecycle():
+    # Arrange
+    tile_map = open_map()
+    wall = np.full(tile_map.tiles.shape, fill_value=False)
+    wall[12, 5:15] = True
+
+    # Act
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = tile_map.precompute_visibility(8, libtcodpy.FOV_RESTRICTIVE, executor=executor)
+        future.result() # type: ignore
+    background_table = tile_map.get_visibility_table(8, libtcodpy.FOV_RESTRICTIVE)
+    before_fov = tile_map.compute_fov(10, 10, radius=8)
+    tile_map.paint_many([(wall, 'wall')])
+    after_fov = tile_map.compute_fov(10, 10, radius=8)
+
+    # Assert
+    try:
+        assert isinstance(background_table, VisibilityTable), "Expected a finished background build to be adopted"
+        assert tile_map.has_line_of_sight(10, 10, 14, 10, radius=8) == bool(after_fov[14, 10]), "Expected line of sight to follow the current walls"
+        assert before_fov[14, 10] and not after_fov[14, 10], "Expected changed walls to bypass the stale table"
+        assert tile_map.get_visibility_table(8, libtcodpy.FOV_RESTRICTIVE) is None, "Expected changed walls to drop the table"
+        with pytest.raises(ValueError):
+            tile_map.set_visibility_table(background_table) # type: ignore
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_tile_map_compute_fov_many_workers_leave_tables_alone():
+    # Arrange
+    class RecordingDict(dict):
+        def __init__(self, *args) -> None:
+            super().__init__(*args)
+            self.threads = set()
+        def get(self, *args):
+            self.threads.add(threading.get_ident())
+            return super().get(*args)
+        def pop(self, *args):
+            self.threads.add(threading.get_ident())
+            return super().pop(*args)
+        def __setitem__(self, key, value) -> None:
+            self.threads.add(threading.get_ident())
+            super().__setitem__(key, value)
+        def __delitem__(self, key) -> None:
+            self.threads.add(threading.get_ident())
+            super().__delitem__(key)
+
+    tile_map = open_map()
+    tile_map.precompute_visibility(8, libtcodpy.FOV_RESTRICTIVE)
+    tile_map.precompute_visibility(4, libtcodpy.FOV_RESTRICTIVE)
+    wall = np.full(tile_map.tiles.shape, fill_value=False)
+    wall[12, 5:15] = True
+    tile_map.paint_many([(wall, 'wall')])
+    tile_map._visibility = RecordingDict(tile_map._visibility)
+    povs = [(x, 10, radius, libtcodpy.FOV_RESTRICTIVE) for x in range(2, 20) for radius in (4, 8)]
+
+    # Act
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        fovs = tile_map.compute_fov_many(povs, executor=executor)
+
+    # Assert
+    try:
+        assert tile_map._visibility.threads == {threading.get_ident()}, "Expected only the calling thread to read or drop visibility tables"
+        assert len(tile_map._visibility) == 0, "Expected the stale tables to be dropped"
+        for (x, y, radius, algorithm), fov in zip(povs, fovs):
+            assert np.array_equal(fov, compute_fov(tile_map.transparency, (x, y), radius=radius, algorithm=algorithm)), "Expected FOVs from the current walls"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
@@ -36,7 +36,7 @@ def test_generator_spawn_map():
         assert id(dungeon) != id(dungeon_gen.map_template), "Expected spawned map to be a new instance and not the same as the template"
         assert dungeon.grid.width == dungeon_gen.width, "Expected spawned map width to match generator width"
         assert dungeon.grid.height == dungeon_gen.height, "Expected spawned map height to match generator height"
-        assert (dungeon.tiles['graphic_type']['name'] == 'wall').all(), "Expected all tiles in spawned map to be initialized as walls"
+        assert (dungeon.get_tiles()['name'] == 'wall').all(), "Expected all tiles in spawned map to be initialized as walls"
         assert dungeon.blocks_movement.sum() == dungeon.tiles.size, "Expected all tiles in spawned map to block movement"
         assert dungeon.blocks_vision.sum() == dungeon.tiles.size, "Expected all tiles in spawned map to block vision"
 
@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from copy import deepcopy
 import itertools
 import pytest
@@ -68,7 +69,7 @@ def test_default_tile_map_statespace():
 
         # Assert
         try:
-            assert isinstance(tile_map.statespace, dict), "Expected statespace to be a dictionary"
+            assert isinstance(tile_map.statespace, Mapping), "Expected statespace to be a mapping"
             assert len(tile_map.statespace) > 0, "Expected statespace to be initialized"
             assert actual_dtype_metadata == expected_dtype_metadata, "Expected statespace dtype to be 'tile_state_vector'"
             assert np.array_equal(actual_state_vector, expected_state_vector), "Expected state_vector to match expected_state_vector" #type: ignore
@@ -100,7 +101,7 @@ def test_default_tile_map_colors():
 
         # Assert
         try:
-            assert isinstance(tile_map.colors, dict), "Expected colors to be a dictionary"
+            assert isinstance(tile_map.colors, Mapping), "Expected colors to be a mapping"
             assert len(tile_map.colors) > 0, "Expected colors to be initialized"
             assert actual_ord_negated != expected_ord_negated, "Expected 'ch' field not to be ord('A')"
             assert np.array_equal(actual_fg, expected_fg), "Expected 'fg' field to be (255, 255, 255)"
@@ -126,7 +127,7 @@ def test_default_tile_map_dtypes():
 
         # Assert
         try:
-            assert isinstance(dtypes, dict), "Expected dtypes to be a dictionary"
+            assert isinstance(dtypes, Mapping), "Expected dtypes to be a mapping"
             assert len(dtypes) > 0, "Expected dtypes to be initialized"
             assert actual_dtype_names == expected_dtype_names, f"Expected dtype names to be {expected_dtype_names}"
             assert actual_metadata_names == expected_metadata_names, f"Expected metadata names to be {expected_metadata_names}"
@@ -152,7 +153,7 @@ def test_default_tile_map_graphics():
 
         # Assert
         try:
-            assert isinstance(tile_map.graphics, dict), "Expected graphics to be a dictionary"
+            assert isinstance(tile_map.graphics, Mapping), "Expected graphics to be a mapping"
             assert len(tile_map.graphics) > 0, "Expected graphics to be initialized"
             assert actual_dtype_metadata == expected_dtype_metadata, "Expected graphics dtype to be 'tile_graphic'"
             assert all([g in actual_graphics for g in expected_graphics]), f"Expected graphics keys to be {expected_graphics}"
@@ -208,11 +209,11 @@ def test_default_tile_map_state_bit_management():
     expected_set_bits = np.full([*tile_map.tiles.shape], fill_value=True)
 
     # Act
-    actual_initial_bits = tile_map.get_state_bits('visible')
+    actual_initial_bits = tile_map.get_state_bits('visible', copy=True)
     tile_map.set_state_bits('visible', expected_set_bits)
-    actual_set_bits = tile_map.get_state_bits('visible')
+    actual_set_bits = tile_map.get_state_bits('visible', copy=True)
     tile_map.reset_state_bits('visible')
-    actual_reset_bits = tile_map.get_state_bits('visible')
+    actual_reset_bits = tile_map.get_state_bits('visible', copy=True)
 
     # Assert
     try:
@@ -280,7 +281,7 @@ def test_default_tile_map_set_tile_noargs():
 
         # Act
         tile_map.set_tiles()
-        actual_tile_names = tile_map.tiles['graphic_type'].flatten()['name']
+        actual_tile_names = tile_map.get_tiles().flatten()['name']
         actual_blocks_movement = tile_map.tiles['blocks_movement'].flatten()
         actual_blocks_vision = tile_map.tiles['blocks_vision'].flatten()
 
@@ -310,7 +311,7 @@ def test_default_tile_map_set_tiles_args():
 
         # Act
         tile_map.set_tiles(layout, 'floor')
-        actual_tile_names = tile_map.tiles['graphic_type'][10:15, 10:15].flatten()['name']
+        actual_tile_names = tile_map.get_tiles()[10:15, 10:15].flatten()['name']
         actual_blocks_movement = tile_map.tiles['blocks_movement'][10:15, 10:15].flatten()
         actual_blocks_vision = tile_map.tiles['blocks_vision'][10:15, 10:15].flatten()
 
@@ -331,7 +332,7 @@ def test_default_tile_map_set_tiles_args():
 def test_default_tile_map_merge_tile_merge():
     # Arrange
     tile_map = DefaultTileMap()
-    tile_map.tiles['graphic_type'][2:4, 2:4] = tile_map.graphics['floor']
+    tile_map.tiles['graphic_id'][2:4, 2:4] = tile_map.graphic_ids['floor']
 
     if tile_map.graphics and tile_map.graphics['default'] is not None:
         layout1 = np.full([*tile_map.tiles.shape], fill_value=False)
@@ -362,7 +363,7 @@ def test_default_tile_map_merge_tile_merge():
 def test_default_tile_map_merge_tile_inner():
     # Arrange
     tile_map = DefaultTileMap()
-    tile_map.tiles['graphic_type'][2:4, 2:4] = tile_map.graphics['floor']
+    tile_map.tiles['graphic_id'][2:4, 2:4] = tile_map.graphic_ids['floor']
 
     if tile_map.graphics and tile_map.graphics['default'] is not None:
         layout1 = np.full([*tile_map.tiles.shape], fill_value=False)
@@ -393,7 +394,7 @@ def test_default_tile_map_merge_tile_inner():
 def test_default_tile_map_merge_tile_outer():
     # Arrange
     tile_map = DefaultTileMap()
-    tile_map.tiles['graphic_type'][2:4, 2:4] = tile_map.graphics['floor']
+    tile_map.tiles['graphic_id'][2:4, 2:4] = tile_map.graphic_ids['floor']
 
     if tile_map.graphics and tile_map.graphics['default'] is not None:
         layout1 = np.full([*tile_map.tiles.shape], fill_value=False)
@@ -476,7 +477,7 @@ def test_graphic_tile_map_get_tile_layout():
 
     mask = np.full([*tile_map.tiles.shape], fill_value=True)
     mask[20:30, 20:30] = False
-    tile_map.tiles['graphic_type'][mask] = tile_map.graphics['floor']
+    tile_map.tiles['graphic_id'][mask] = tile_map.graphic_ids['floor']
 
     if tile_map.graphics and tile_map.graphics['default'] is not None:
         expected_layout_no_graphic_name = np.full([*tile_map.tiles.shape], fill_value=True)
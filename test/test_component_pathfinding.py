@@ -0,0 +1,414 @@
+import pytest
+import random
+from sys import path
+path.append('c:\\Users\\jason\\workspaces\\repos\\jrl\\src')
+import numpy as np
+import tcod.path
+
+from copy import deepcopy
+from core_components.maps.pathfinding import AreaGraph, FlowField, PathService, terrain_cost
+from core_components.maps.generators import DungeonGenerator
+from core_components.ai.dispatchers import AIDispatcher
+from core_components.ai.events import TargetOutOfRangeAIEvent
+
+
+def random_cost(seed: int = 0, shape=(40, 30)) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    cost = rng.integers(1, 4, size=shape).astype(np.int8)
+    cost[rng.random(shape) < 0.2] = 0
+    return cost
+
+
+# Tests for FlowField
+def test_flow_field_paths_are_shortest():
+    # Arrange
+    cost = random_cost()
+    root = (20, 15)
+    cost[root] = 1
+    flow_field = FlowField(cost, [root])
+    rng = np.random.default_rng(1)
+
+    # Act & Assert
+    try:
+        for _ in range(50):
+            start = tuple(int(v) for v in rng.integers(0, cost.shape))
+            if not cost[start] or not flow_field.is_reachable(*start):
+                continue
+            pathfinder = tcod.path.Pathfinder(tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=0))
+            pathfinder.add_root(start)
+            pathfinder.resolve(root)
+            flow_path = flow_field.path_from(*start)
+            assert flow_path[-1] == root, f"Expected the flow path from {start} to end at the root"
+            assert 2 * sum(int(cost[step]) for step in flow_path) == int(pathfinder.distance[root]), f"Expected the flow path from {start} to be a shortest path"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_flow_field_next_step_avoids_occupied_tiles():
+    # Arrange
+    cost = np.ones((5, 5), dtype=np.int8)
+    flow_field = FlowField(cost, [(4, 2)])
+
+    # Act
+    free_step = flow_field.next_step(2, 2)
+    blocked_step = flow_field.next_step(2, 2, occupied={(3, 2)}, occupied_penalty=10)
+    root_step = flow_field.next_step(3, 2, occupied={(4, 2)}, occupied_penalty=10)
+
+    # Assert
+    try:
+        assert free_step == (3, 2), "Expected the step to descend the field toward the root"
+        assert blocked_step in ((2, 1), (2, 3)), "Expected an occupied tile to be routed around"
+        assert root_step == (4, 2), "Expected the root itself never to be penalised"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+# Tests for PathService
+def test_path_service_batches_by_goal():
+    # Arrange
+    cost = random_cost(seed=4)
+    goals = [(5, 5), (20, 20), (30, 10)]
+    for goal in goals:
+        cost[goal] = 1
+    rng = np.random.default_rng(5)
+    occupied = (rng.random(cost.shape) < 0.1).astype(np.int16)
+    pairs = [(tuple(int(v) for v in rng.integers(0, cost.shape)), goals[i % 3]) for i in range(60)] + [(goals[0], goals[0])]
+    service = PathService()
+
+    # Act
+    steps = service.next_steps(cost, pairs, key=0, occupied=occupied, occupied_penalty=10)
+    paths = service.paths(cost, pairs, key=0)
+
+    # Assert
+    try:
+        assert steps.shape == (len(pairs), 2), "Expected one row of coordinates per pair"
+        assert service.stats['fields_built'] == 3 and service.stats['field_hits'] == 3, "Expected one flow field per distinct goal, reused by the second batch"
+        occupied_tiles = {tuple(tile) for tile in np.argwhere(occupied).tolist()}
+        for (start, goal), step, path in zip(pairs, steps.tolist(), paths):
+            flow_field = FlowField(cost, [goal])
+            expected = None if start == goal else flow_field.next_step(*start, occupied=occupied_tiles, occupied_penalty=10)
+            assert (tuple(step) if step[0] >= 0 else None) == expected, f"Expected the batched step from {start} to match the flow field"
+            assert path.tolist() == [list(tile) for tile in flow_field.path_from(*start)], f"Expected the full path from {start} as an array"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+# Tests for AreaGraph
+def test_area_graph_paths_are_valid():
+    # Arrange
+    cost = random_cost(seed=2, shape=(60, 45))
+    rooms = [np.zeros(cost.shape, dtype=bool) for _ in range(2)]
+    rooms[0][5:20, 5:15] = True
+    rooms[1][30:50, 20:40] = True
+    graph = AreaGraph(cost, rooms, chunk_size=8)
+    rng = np.random.default_rng(3)
+
+    # Act & Assert
+    try:
+        for _ in range(100):
+            start = tuple(int(v) for v in rng.integers(0, cost.shape))
+            goal = tuple(int(v) for v in rng.integers(0, cost.shape))
+            path = graph.find_path(start, goal)
+            if not cost[start] or not cost[goal]:
+                assert path is None, f"Expected no path from or to the blocked tiles of {start} -> {goal}"
+                continue
+
+            pathfinder = tcod.path.Pathfinder(tcod.path.SimpleGraph(cost=cost, cardinal=1, diagonal=0))
+            pathfinder.add_root(start)
+            pathfinder.resolve(goal)
+            reachable = int(pathfinder.distance[goal]) != int(np.iinfo(pathfinder.distance.dtype).max)
+            assert (path is not None) == reachable, f"Expected the graph to agree with a full search on whether {goal} is reachable from {start}"
+            if path is None:
+                continue
+
+            position = start
+            for step in path:
+                assert abs(step[0] - position[0]) + abs(step[1] - position[1]) == 1 and cost[step], f"Expected {start} -> {goal} to take single steps over open tiles"
+                position = step
+            assert position == goal, f"Expected the path from {start} to end at {goal}"
+            assert sum(int(cost[step]) for step in path) >= int(pathfinder.distance[goal]), "Expected no path to beat the full search"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_area_graph_lifecycle():
+    # Arrange
+    random.seed(4)
+    tile_map = DungeonGenerator().generate(area_graph_chunk_size=16)
+
+    # Act
+    graph = tile_map.get_area_graph()
+    rooms = [name for name in tile_map.areas if not name.startswith('_')]
+    room_centre = tile_map.areas[rooms[0]].center.to_tuple
+    other_centre = tile_map.areas[rooms[-1]].center.to_tuple
+    path = graph.find_path(room_centre, other_centre) if graph is not None else None
+    tile_map.set_tiles(graphic_name='floor')
+    stale_graph = tile_map.get_area_graph()
+
+    # Assert
+    try:
+        assert graph is not None, "Expected the generator to build the area graph"
+        assert path and path[-1] == other_centre, "Expected rooms joined by corridors to be connected in the graph"
+        assert stale_graph is None, "Expected the graph to be dropped once the movement-blocking tiles change"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_area_graph_shares_the_movement_terrain_cost(populated_state):
+    # Arrange
+    state = populated_state(seed=4, n_mobs=1)
+    tile_map, dispatcher = state.map.active, AIDispatcher()
+    graph = tile_map.build_area_graph(16)
+    terrain = dispatcher.movement_cost(state)
+    rng = np.random.default_rng(5)
+    wall_x, wall_y = np.nonzero(tile_map.blocks_movement)
+    open_x, open_y = np.nonzero(~tile_map.blocks_movement)
+
+    # Act
+    queries = []
+    for i, j in zip(rng.integers(len(open_x), size=20), rng.integers(len(wall_x), size=20)):
+        start, goal = (int(open_x[i]), int(open_y[i])), (int(wall_x[j]), int(wall_y[j]))
+        pathfinder = tcod.path.Pathfinder(tcod.path.SimpleGraph(cost=terrain, cardinal=1, diagonal=0))
+        pathfinder.add_root(start)
+        pathfinder.resolve(goal)
+        queries.append((start, goal, graph.find_path(start, goal), int(pathfinder.distance[goal])))
+
+    # Assert
+    try:
+        assert np.array_equal(graph.cost, terrain), "Expected the area graph to use the movement cost grid's terrain cost"
+        for start, goal, path, distance in queries:
+            assert path is not None and path[-1] == goal, f"Expected the graph to reach the wall tile {goal} like the other pathing modes"
+            assert sum(int(terrain[step]) for step in path) >= distance, "Expected no path to beat the full search"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+# Tests for the AIDispatcher flow field
+def test_ai_dispatcher_shares_flow_field(populated_state):
+    # Arrange
+    state = populated_state(seed=5, n_mobs=10)
+    player, mobs = state.roster.player, state.roster.live_ai_actors
+    dispatcher = AIDispatcher()
+
+    # Act
+    actions = [dispatcher._ev_targetoutofrangeaievent(TargetOutOfRangeAIEvent(mob, player), state) for mob in mobs]
+    n_fields = len(dispatcher.flow_fields)
+    state.map.active.set_tiles(graphic_name='floor')
+    dispatcher.get_flow_field(state, player.location)
+
+    # Assert
+    try:
+        assert n_fields == 1, "Expected every mob chasing the player to share one flow field"
+        assert len(dispatcher.flow_fields) == 2, "Expected a movement-blocking change to build a new flow field"
+        for mob, action in zip(mobs, actions):
+            step = getattr(action, 'destination', None)
+            if step is not None:
+                assert max(abs(step.x - mob.location.x), abs(step.y - mob.location.y)) == 1, "Expected each mob to take a single step"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_ai_dispatcher_batches_a_turn_of_flow_steps(populated_state):
+    # Arrange
+    state = populated_state(seed=5, n_mobs=10)
+    player, mobs = state.roster.player, state.roster.live_ai_actors
+    dispatcher = AIDispatcher()
+    dispatcher.cache_paths = False
+    for mob in mobs:
+        mob.acquire_target(player)
+    expected_steps = [dispatcher.get_flow_steps(state, [(mob, player.location)])[0] for mob in mobs]
+    batches_before_turn = dispatcher.path_service.counters['batches']
+
+    # Act
+    actions = [dispatcher._ev_targetoutofrangeaievent(TargetOutOfRangeAIEvent(mob, player), state) for mob in mobs]
+    batches_after_turn = dispatcher.path_service.counters['batches']
+    mobs[0].location = expected_steps[0] or mobs[0].location
+    dispatcher.get_next_step(state, mobs[0], player.location)
+    batches_after_move = dispatcher.path_service.counters['batches']
+
+    # Assert
+    try:
+        assert batches_after_turn - batches_before_turn == 1, "Expected one batch for every mob of the turn"
+        for action, step in zip(actions, expected_steps):
+            destination = getattr(action, 'destination', None)
+            assert (destination.to_tuple if destination else None) == (step.to_tuple if step else None), "Expected the batched step of each mob"
+        assert batches_after_move - batches_after_turn == 1, "Expected a mob that moved to batch the next turn"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+# Tests for the AIDispatcher path cache
+@pytest.mark.parametrize('pathing', ['flow', 'astar', 'hierarchical'])
+def test_ai_dispatcher_path_cache(pathing, populated_state):
+    # Arrange
+    state = populated_state(seed=9, n_mobs=1)
+    player, mob = state.roster.player, state.roster.live_ai_actors[0]
+    dispatcher = AIDispatcher()
+    dispatcher.pathing = pathing
+    dispatcher.max_path_length = 6
+
+    def chase_step():
+        step = dispatcher.get_next_step(state, mob, player.location)
+        if step is not None:
+            mob.location = step
+        return step
+
+    # Act
+    first_step = chase_step()
+    cached_length = len(mob.path)
+    for _ in range(3):
+        chase_step()
+    stats_after_cached_steps = dict(dispatcher.path_stats)
+    state.map.active.set_tiles(graphic_name='floor')
+    chase_step()
+    stats_after_map_change = dict(dispatcher.path_stats)
+
+    # Assert
+    try:
+        assert first_step is not None, "Expected the mob to find a path to the player"
+        assert 0 < cached_length <= 5, "Expected the cached path to be capped at max_path_length steps"
+        assert stats_after_cached_steps['misses'] == 1, "Expected following the cached path not to recompute it"
+        assert stats_after_cached_steps['hits'] >= 1, "Expected cached steps to count as hits"
+        assert stats_after_map_change['misses'] == 2, "Expected a movement generation change to recompute the path"
+        assert mob.path_generation == (id(state.map.active), state.map.active.movement_generation), "Expected the path to record the map generation"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_ai_dispatcher_area_path_leaves_building_to_the_map(populated_state):
+    # Arrange
+    state = populated_state(seed=9, n_mobs=1)
+    game_map = state.map.active
+    player, mob = state.roster.player, state.roster.live_ai_actors[0]
+    dispatcher = AIDispatcher()
+    dispatcher.pathing = 'hierarchical'
+
+    # Act
+    fallback_path = dispatcher.get_area_path(state, mob, player.location)
+    graph_after_fallback = game_map.get_area_graph()
+    graph = game_map.build_area_graph(16)
+    area_path = dispatcher.get_area_path(state, mob, player.location)
+
+    # Assert
+    try:
+        assert graph_after_fallback is None, "Expected the dispatcher not to build an area graph"
+        assert fallback_path == dispatcher.get_path_to(state, mob, player.location), "Expected a full-grid path without a graph"
+        assert [step.to_tuple for step in area_path] == graph.find_path(mob.location.to_tuple, player.location.to_tuple)[:dispatcher.max_path_length], "Expected the built graph to be used"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_ai_dispatcher_path_cache_invalidation(populated_state):
+    # Arrange
+    state = populated_state(seed=9, n_mobs=2)
+    player = state.roster.player
+    mob, other_mob = state.roster.live_ai_actors
+    dispatcher = AIDispatcher()
+    dispatcher.pathing = 'astar'
+    first_step = dispatcher.get_next_step(state, mob, player.location)
+    mob.location = first_step
+
+    # Act
+    other_location = other_mob.location
+    other_mob.location = mob.path[0]
+    blocked_misses = dispatcher.path_stats['misses']
+    dispatcher.get_next_step(state, mob, player.location)
+    blocked_misses = dispatcher.path_stats['misses'] - blocked_misses
+    other_mob.location = other_location
+    far_target = state.map.active.grid.get_location(player.location.x, max(0, player.location.y - dispatcher.path_tolerance - 1))
+    drift_misses = dispatcher.path_stats['misses']
+    dispatcher.get_next_step(state, mob, far_target)
+    drift_misses = dispatcher.path_stats['misses'] - drift_misses
+
+    # Assert
+    try:
+        assert blocked_misses == 1, "Expected a step blocked by another entity to recompute the path"
+        assert drift_misses == 1, "Expected a target moving beyond the tolerance to recompute the path"
+        assert mob.path is not other_mob.path, "Expected each mob to own its path list"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+# Tests for MovementCostGrid
+def test_movement_cost_grid_tracks_entities(populated_state):
+    # Arrange
+    state = populated_state(seed=3, n_mobs=4)
+    game_map = state.map.active
+    movement_costs = state.roster.get_movement_costs(game_map, penalty=10)
+
+    def naive_cost():
+        cost = np.array(game_map.blocks_movement, dtype=np.int16) + 1
+        for location in state.roster.entity_blocked_locations:
+            cost[location.x, location.y] += 10
+        return cost
+
+    # Act
+    mobs = state.roster.live_ai_actors
+    mobs[0].location = game_map.grid.get_location(mobs[0].location.x, mobs[0].location.y + 1)
+    mobs[1].destination = mobs[0].location
+    mobs[1].move()
+    mobs[2].die()
+    state.roster.spawn_at_location(entity=state.roster.ORC, location=state.roster.player.location)
+    after_moves, expected_after_moves = movement_costs.cost.copy(), naive_cost()
+    game_map.set_tiles(graphic_name='floor')
+    after_map_change = movement_costs.cost.copy()
+    copied_mob = deepcopy(mobs[3])
+
+    # Assert
+    try:
+        assert state.roster.get_movement_costs(game_map, penalty=10) is movement_costs, "Expected the grid to persist between calls"
+        assert np.array_equal(after_moves, expected_after_moves), "Expected the costs to follow entity moves"
+        assert np.array_equal(after_map_change, naive_cost()), "Expected the terrain to be re-read after a movement generation change"
+        assert not movement_costs.cost.flags.writeable, "Expected the cost grid to be read-only"
+        assert copied_mob.roster is None, "Expected a copied entity not to report to the roster"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
@@ -0,0 +1,161 @@
+import pytest
+import random
+import numpy as np
+from sys import path
+path.append('c:\\Users\\jason\\workspaces\\repos\\jrl\\src')
+
+from core_components.entities.library import AICharactor, MortalEntity, PlayerCharactor
+
+
+# Tests for the Roster spatial index
+def test_roster_spatial_index_follows_entities(populated_state):
+    # Arrange
+    state = populated_state()
+    roster, grid = state.roster, state.map.active.grid
+    mobs = roster.live_ai_actors
+
+    # Act
+    for mob in mobs[:3]:
+        mob.destination = grid.get_location(random.randrange(grid.width), random.randrange(grid.height))
+        mob.move()
+    roster.remove_entity(mobs[3])
+    removed_location = mobs[3].location
+
+    # Assert
+    try:
+        for entity in roster.entities:
+            assert entity in roster.get_entity_at_location(entity.location), f"Expected {entity.name} to be indexed at its location"
+        assert sum(len(entities) for entities in roster.spatial_index.values()) == len(roster.entities), "Expected each entity to be indexed once"
+        assert mobs[3] not in roster.get_entity_at_location(removed_location), "Expected a removed entity to leave the index"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_roster_entity_collision_uses_index(populated_state):
+    # Arrange
+    state = populated_state()
+    roster, player = state.roster, state.roster.player
+    mob = roster.live_ai_actors[0]
+
+    # Act
+    player.destination = mob.location
+    blocking_collision = roster.entity_collision(player)
+    mob.die()
+    remains_collision = roster.entity_collision(player)
+    player.destination = player.location
+    own_collision = roster.entity_collision(player)
+
+    # Assert
+    try:
+        assert blocking_collision is mob, "Expected the mob at the destination to block the player"
+        assert remains_collision is None, "Expected remains that no longer block movement not to collide"
+        assert own_collision is None, "Expected an entity never to collide with itself"
+        assert mob in roster.get_entity_at_location(mob.location), "Expected the mob to still be found at its location"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_roster_categories_follow_spawn_death_and_removal(populated_state):
+    # Arrange
+    state = populated_state()
+    roster = state.roster
+    mobs = roster.live_ai_actors
+    killed, removed = mobs[0], mobs[1]
+
+    # Act
+    killed.take_damage(killed.physical.hp)
+    killed.die()
+    roster.remove_entity(removed)
+    spawned = roster.spawn_at_location(entity=roster.TROLL, location=roster.player.location)
+
+    # Assert
+    try:
+        assert roster.player is next(entity for entity in roster.entities if isinstance(entity, PlayerCharactor)), "Expected the player to be tracked"
+        assert roster.live_ai_actors[-1] is spawned, "Expected a spawned mob to join the live AI actors"
+        assert killed not in roster.live_actors and killed in roster.all_actors, "Expected a dead mob to leave the live actors only"
+        assert removed not in roster.all_actors, "Expected a removed mob to leave every category"
+        for category, expected in ((roster.live_actors, [e for e in roster.entities if isinstance(e, MortalEntity) and e.is_alive]), 
+                                   (roster.live_ai_actors, [e for e in roster.entities if isinstance(e, AICharactor) and e.is_alive]), 
+                                   (roster.entity_blocked_locations, [e.location for e in roster.entities if e.blocks_movement])):
+            assert sorted(map(id, category)) == sorted(map(id, expected)), "Expected each category to match a full scan of the entities"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_roster_respawning_the_player_replaces_it(populated_state):
+    # Arrange
+    state = populated_state()
+    roster, game_map = state.roster, state.map.active
+    old_player = roster.player
+    old_location = old_player.location
+
+    # Act
+    roster.spawn_player(game_map)
+    players = [entity for entity in roster.entities if isinstance(entity, PlayerCharactor)]
+    mismatched = roster.check_occupancy()
+
+    # Assert
+    try:
+        assert players == [roster.player] and roster.player is not old_player, "Expected a single, new player"
+        assert old_player not in roster.live_actors and old_player.roster is None, "Expected the old player to leave the roster"
+        assert old_player not in roster.get_entity_at_location(old_location), "Expected the old player to leave the spatial index"
+        assert mismatched == [], "Expected the old player to leave the occupancy grid"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_roster_occupancy_grid_stays_consistent(populated_state):
+    # Arrange
+    state = populated_state()
+    roster, game_map = state.roster, state.map.active
+    grid = game_map.grid
+    roster.get_movement_costs(game_map)
+    mobs = roster.live_ai_actors
+
+    # Act
+    for mob in mobs[:3]:
+        mob.destination = grid.get_location(random.randrange(grid.width), random.randrange(grid.height))
+        mob.move()
+    mobs[3].take_damage(mobs[3].physical.hp)
+    mobs[3].die()
+    roster.remove_entity(mobs[4])
+    roster.spawn_at_location(entity=roster.ORC, location=mobs[4].location)
+    occupancy = roster.get_occupancy(game_map)
+    proposed = [mob.location.to_tuple for mob in mobs[:5]] + [(-1, 0), (grid.width, grid.height)]
+    occupied = roster.occupied_at(game_map, proposed).tolist()
+    consistency = roster.check_occupancy()
+    shared = np.shares_memory(occupancy, roster.get_movement_costs(game_map).occupancy)
+    other_map = game_map.empty_like()
+    roster.get_occupancy(other_map)
+
+    # Assert
+    try:
+        assert consistency == [], "Expected the occupancy and movement cost grids to match a recount"
+        assert occupancy.shape == (grid.width, grid.height) and not occupancy.flags.writeable, "Expected a read-only grid of the map's shape"
+        assert int(occupancy.sum()) == len(roster.entity_blocked_locations), "Expected one count per blocking entity"
+        assert occupied == [True] * 3 + [False, True, False, False], "Expected a mask of the occupied points"
+        assert shared, "Expected the movement cost grid to read the roster's occupancy grid rather than a copy"
+        assert roster.occupancy_map is other_map and roster.movement_costs is None, "Expected asking for another map to recount the grid"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
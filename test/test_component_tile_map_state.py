@@ -0,0 +1,329 @@
+from copy import deepcopy
+import pytest
+from sys import path
+import numpy as np
+import tcod
+
+path.append('c:\\Users\\jason\\workspaces\\repos\\jrl\\src')
+
+from core_components.maps.tilemaps import DefaultTileMap, DEFAULT_MANIFEST
+
+
+PACKED_MANIFEST = deepcopy(DEFAULT_MANIFEST)
+PACKED_MANIFEST['statespace']['storage'] = 'packed' # type: ignore
+
+
+def random_state_map(seed: int = 0, graphics_manifest=DEFAULT_MANIFEST) -> DefaultTileMap:
+    tile_map = DefaultTileMap(graphics_manifest)
+    rng = np.random.default_rng(seed)
+    floor = rng.random(tile_map.tiles.shape) < 0.5
+    tile_map.set_tiles(floor, 'floor')
+    tile_map.set_state_bits('visible', rng.random(tile_map.tiles.shape) < 0.5)
+    tile_map.set_state_bits('seen', rng.random(tile_map.tiles.shape) < 0.5)
+    return tile_map
+
+
+# Test Cases for the state resolver
+def test_tile_map_state_index_matches_statespace_tensor():
+    # Arrange
+    tile_map = random_state_map()
+    expected_index_map = np.full(tile_map.tiles.shape, fill_value=-1, dtype=int)
+    label_indices = np.where(np.all(tile_map.state_tensor_aligned == tile_map.statespace_tensor, axis=3))
+    expected_index_map[label_indices[0], label_indices[1]] = label_indices[2]
+
+    # Act
+    actual_index_map = tile_map.statespace_index_map
+
+    # Assert
+    try:
+        assert np.array_equal(actual_index_map, expected_index_map), "Expected packed state index lookup to match the statespace tensor comparison"
+        assert tile_map.get_state_index().dtype == np.uint8, "Expected four state bits to pack into a uint8 index"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_tile_map_update_state_resolves_labels():
+    # Arrange
+    tile_map = random_state_map(seed=1)
+    index_map = tile_map.statespace_index_map
+    expected_graphic = np.copy(tile_map.tiles['graphic'])
+    for index in np.unique(index_map):
+        mask = index_map == index
+        state_label = tile_map.statespace['label_map'][index] # type: ignore
+        expected_graphic[mask] = tile_map.get_tiles()[state_label][mask]
+
+    # Act
+    tile_map.update_state()
+
+    # Assert
+    try:
+        assert np.array_equal(tile_map.tiles['graphic'], expected_graphic), "Expected update_state to write the graphic of each tile's state label"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_tile_map_packed_state_plane():
+    # Arrange
+    field_map = random_state_map(seed=2)
+    packed_map = random_state_map(seed=2, graphics_manifest=PACKED_MANIFEST)
+
+    # Act
+    field_map.update_state()
+    packed_map.update_state()
+    packed_map.reset_state_bits('visible')
+
+    # Assert
+    try:
+        assert packed_map.state_plane is not None, "Expected a packed state plane in packed storage mode"
+        assert field_map.state_plane is None, "Expected no packed state plane in the default storage mode"
+        assert 'visible' not in packed_map.tiles.dtype.names, "Expected state bits to be left out of the packed tile_grid dtype" # type: ignore
+        assert np.array_equal(packed_map.tiles['graphic'], field_map.tiles['graphic']), "Expected both storage modes to resolve the same graphics"
+        assert np.array_equal(packed_map.seen, field_map.seen), "Expected 'seen' bits to match across storage modes"
+        assert np.array_equal(packed_map.blocks_movement, field_map.blocks_movement), "Expected 'blocks_movement' bits to match across storage modes"
+        assert not packed_map.visible.any(), "Expected reset_state_bits to clear only the 'visible' bit"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_tile_map_dirty_region_tracking():
+    # Arrange
+    tile_map = DefaultTileMap()
+    tile_map.set_tiles(np.full(tile_map.tiles.shape, fill_value=True), 'floor')
+    tile_map.update_state()
+    tile_map.consume_updated_region()
+    visible = np.full(tile_map.tiles.shape, fill_value=False)
+    visible[10:15, 20:24] = True
+
+    # Act
+    tile_map.set_state_bits('visible', visible)
+    actual_dirty_region = tile_map.dirty_region
+    tile_map.update_state()
+    actual_updated_region = tile_map.consume_updated_region()
+
+    # Assert
+    try:
+        assert actual_dirty_region == (slice(10, 15), slice(20, 24)), "Expected the dirty region to bound the changed 'visible' bits"
+        assert actual_updated_region == actual_dirty_region, "Expected update_state to report the region it re-resolved"
+        assert tile_map.dirty_region is None, "Expected update_state to clear the dirty tiles"
+        assert tile_map.consume_updated_region() is None, "Expected consume_updated_region to clear the updated region"
+        assert np.array_equal(tile_map.tiles['graphic'][visible], tile_map.get_tiles()['first_look'][visible]), "Expected newly visible tiles to be re-resolved"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_tile_map_read_only_accessors():
+    # Arrange
+    tile_map = DefaultTileMap()
+
+    # Act
+    visible_view = tile_map.visible
+    visible_copy = tile_map.get_state_bits('visible', copy=True)
+    tile_map.set_state_bits('visible', np.full(tile_map.tiles.shape, fill_value=True))
+
+    # Assert
+    try:
+        assert not visible_view.flags.writeable, "Expected state bit properties to be read-only"
+        assert visible_copy.flags.writeable, "Expected copy=True to return a writeable array"
+        assert visible_view.all(), "Expected the read-only view to share memory with the tile map"
+        assert not visible_copy.any(), "Expected the copy to be independent of the tile map"
+        assert not tile_map.get_tiles().flags.writeable, "Expected get_tiles to return a read-only view" # type: ignore
+        assert tile_map.get_state(copy=True).flags.writeable, "Expected get_state(copy=True) to return a writeable array" # type: ignore
+        with pytest.raises(ValueError):
+            visible_view[0, 0] = False
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_tile_map_palette_graphic_ids():
+    # Arrange
+    tile_map = DefaultTileMap()
+    floor = np.full(tile_map.tiles.shape, fill_value=False)
+    floor[5:10, 5:10] = True
+
+    # Act
+    tile_map.set_tiles(floor, 'floor')
+    actual_tiles = tile_map.get_tiles()
+
+    # Assert
+    try:
+        assert tile_map.tiles['graphic_id'].dtype == np.uint8, "Expected tiles to store a uint8 palette index"
+        assert len(tile_map.palette) == len(tile_map.graphics), "Expected one palette entry per graphic" # type: ignore
+        assert np.array_equal(tile_map.get_tile_layout('floor'), floor), "Expected get_tile_layout to compare palette indices"
+        assert np.array_equal(actual_tiles['name'] == 'floor', floor), "Expected get_tiles to gather graphic records from the palette" # type: ignore
+        assert not tile_map.get_tile_layout('missing').any(), "Expected an unknown graphic name to match no tiles" # type: ignore
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_tile_map_render_buffer():
+    # Arrange
+    tile_map = random_state_map(seed=3)
+    tile_map.update_state()
+    console = tcod.console.Console(*tile_map.tiles.shape, order="F")
+
+    # Act
+    render_buffer = tile_map.get_render_buffer()
+    console.rgb[:] = render_buffer
+
+    # Assert
+    try:
+        assert render_buffer.flags.f_contiguous, "Expected the render buffer to be Fortran-ordered"
+        assert tile_map.render_lut.shape == (len(tile_map.palette), 16), "Expected one render LUT column per packed state index"
+        for field in ('ch', 'fg', 'bg'):
+            assert np.array_equal(render_buffer[field], tile_map.tiles['graphic'][field]), f"Expected the render buffer '{field}' to match the resolved tile graphics"
+            assert np.array_equal(console.rgb[field], render_buffer[field]), f"Expected the render buffer '{field}' to copy into the console"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_tile_map_update_state_maintains_render_buffer():
+    # Arrange
+    tile_map = random_state_map(seed=4)
+    tile_map.update_state()
+    tile_map.get_render_buffer()
+    visible = np.full(tile_map.tiles.shape, fill_value=False)
+    visible[30:40, 5:12] = True
+    untouched = np.copy(tile_map.get_render_buffer()[50:60, 50:60])
+
+    # Act
+    tile_map.set_state_bits('visible', visible)
+    stale_render_buffer = np.copy(tile_map.get_render_buffer())
+    tile_map.tiles['graphic_id'][50:60, 50:60] = 0
+    tile_map.update_state()
+    render_buffer = tile_map.get_render_buffer()
+
+    # Assert
+    try:
+        assert any(not np.array_equal(stale_render_buffer[field][visible], render_buffer[field][visible]) for field in ('ch', 'fg', 'bg')), "Expected the render buffer to wait for update_state"
+        for field in ('ch', 'fg', 'bg'):
+            assert np.array_equal(render_buffer[field][visible], tile_map.tiles['graphic'][field][visible]), f"Expected update_state to refresh the render buffer '{field}' for the dirty tiles"
+        assert np.array_equal(render_buffer[50:60, 50:60], untouched), "Expected update_state to leave tiles outside the dirty region alone"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_tile_map_shares_compiled_manifest():
+    # Arrange
+    first_map = DefaultTileMap()
+    second_map = DefaultTileMap(deepcopy(DEFAULT_MANIFEST))
+    packed_map = DefaultTileMap(PACKED_MANIFEST)
+
+    # Act
+    first_map.areas['room'] = first_map.center # type: ignore
+    copied_map = deepcopy(first_map)
+
+    # Assert
+    try:
+        assert first_map.manifest is second_map.manifest, "Expected maps built from equal manifests to share one compiled manifest"
+        assert first_map.manifest is not packed_map.manifest, "Expected a different manifest to compile separately"
+        assert copied_map.manifest is first_map.manifest, "Expected deepcopy to share the compiled manifest"
+        assert first_map.palette is second_map.palette, "Expected the palette to be shared by reference"
+        assert 'room' not in second_map.areas, "Expected each tile map to own its areas"
+        assert not first_map.render_lut.flags.writeable, "Expected the compiled render LUT to be read-only"
+        with pytest.raises(AttributeError):
+            first_map.manifest.palette = np.zeros(1) # type: ignore
+        with pytest.raises(TypeError):
+            first_map.graphics['wall'] = first_map.graphics['floor'] # type: ignore
+        with pytest.raises(TypeError):
+            first_map.statespace['dtype_labels']['names'] = () # type: ignore
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_tile_map_clone_and_empty_like():
+    # Arrange
+    template = random_state_map(seed=4, graphics_manifest=PACKED_MANIFEST)
+    template.update_state()
+    template.areas['room'] = template.center # type: ignore
+
+    # Act
+    clone = template.clone()
+    cloned_state = np.copy(clone.state_plane) # type: ignore
+    empty = template.empty_like()
+    clone.set_tiles(np.full(clone.tiles.shape, fill_value=True), 'wall')
+
+    # Assert
+    try:
+        assert clone.manifest is template.manifest and empty.manifest is template.manifest, "Expected clones to share the compiled manifest"
+        assert not np.shares_memory(clone.tiles, template.tiles), "Expected clone to copy the tile buffer"
+        assert not np.shares_memory(clone.state_plane, template.state_plane), "Expected clone to copy the packed state plane" # type: ignore
+        assert np.array_equal(cloned_state, template.state_plane), "Expected clone to keep the template's state" # type: ignore
+        assert not template.get_tile_layout('wall').all(), "Expected changes to the clone to leave the template untouched"
+        assert 'room' in clone.areas and clone.areas is not template.areas, "Expected clone to own a copy of the areas"
+        assert np.array_equal(empty.get_tile_layout('default'), np.full(empty.tiles.shape, fill_value=True)), "Expected empty_like to reset every tile"
+        assert not empty.state_plane.any() and not empty.areas, "Expected empty_like to clear the state and areas" # type: ignore
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_tile_map_paint_many():
+    # Arrange
+    tile_map = random_state_map(seed=5, graphics_manifest=PACKED_MANIFEST)
+    tile_map.set_tiles(graphic_name='wall')
+    tile_map.update_state()
+    expected_visible = tile_map.get_state_bits('visible', copy=True)
+    circle = np.full(tile_map.tiles.shape, fill_value=False)
+    circle[20:25, 20:25] = True
+
+    # Act
+    tile_map.paint_many([((slice(2, 8), slice(3, 9)), 'floor'), (circle, 'floor'), ((slice(22, 23), slice(22, 23)), 'wall')])
+    actual_dirty_region = tile_map.dirty_region
+    tile_map.update_state()
+
+    # Assert
+    expected_floor = np.full(tile_map.tiles.shape, fill_value=False)
+    expected_floor[2:8, 3:9] = True
+    expected_floor |= circle
+    expected_floor[22, 22] = False
+    try:
+        assert np.array_equal(tile_map.get_tile_layout('floor'), expected_floor), "Expected slices and masks to be painted in order"
+        assert np.array_equal(tile_map.blocks_movement, ~expected_floor), "Expected fixed state bits to follow the painted graphics"
+        assert np.array_equal(tile_map.visible, expected_visible), "Expected free state bits to be left untouched"
+        assert actual_dirty_region == (slice(2, 25), slice(3, 25)), "Expected only the painted tiles to be flagged dirty"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
@@ -0,0 +1,157 @@
+import pytest
+from sys import path
+path.append('c:\\Users\\jason\\workspaces\\repos\\jrl\\src')
+from copy import deepcopy
+import numpy as np
+from tcod import libtcodpy
+
+from core_components.maps.tiles import TileTuple, BaseTileGrid
+from core_components.maps.tiles.library import RectangularRoom
+from core_components.maps.tilemaps import DefaultTileMap, DEFAULT_MANIFEST
+from core_components.roster import Roster
+from core_components.ui.graphics import ascii_graphic
+
+TILE_DTYPE = np.dtype([('graphic_id', np.uint8), ('graphic', ascii_graphic)])
+PACKED_MANIFEST = deepcopy(DEFAULT_MANIFEST)
+PACKED_MANIFEST['statespace']['storage'] = 'packed' # type: ignore
+
+
+# Tests for memory-mapped tile storage
+def test_base_tile_grid_memmap(tmp_path):
+    # Arrange
+    filename = tmp_path / 'level.tiles'
+    grid = BaseTileGrid(TILE_DTYPE, size=TileTuple( ([20], [10]) ), filename=filename)
+
+    # Act
+    grid.tiles['graphic_id'][2:5, 3] = 7
+    grid.flush()
+    reopened = BaseTileGrid(TILE_DTYPE, size=TileTuple( ([20], [10]) ), filename=filename, mode='r')
+    clone = reopened.clone()
+
+    # Assert
+    try:
+        assert isinstance(grid.tiles, np.memmap), "Expected a filename to back the tiles with a memmap"
+        assert np.array_equal(reopened.tiles, grid.tiles), "Expected the reopened grid to read the flushed tiles"
+        assert not reopened.tiles.flags.writeable, "Expected mode 'r' to open the tiles read-only"
+        assert clone.filename is None and clone.tiles.flags.writeable, "Expected a clone to live in process memory"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+@pytest.mark.parametrize('graphics_manifest', [DEFAULT_MANIFEST, PACKED_MANIFEST])
+def test_tile_map_memmap_round_trip(tmp_path, graphics_manifest):
+    # Arrange
+    filename = tmp_path / 'level.tiles'
+    tile_map = DefaultTileMap(graphics_manifest, tile_file=filename)
+    floor = np.full(tile_map.tiles.shape, fill_value=False)
+    floor[5:20, 10:30] = True
+
+    # Act
+    tile_map.set_tiles(floor, 'floor')
+    tile_map.set_state_bits('seen', floor)
+    tile_map.flush()
+    loaded_map = DefaultTileMap(graphics_manifest, tile_file=filename, mode='r')
+
+    # Assert
+    try:
+        assert np.array_equal(loaded_map.get_tile_layout('floor'), floor), "Expected the saved tile layout to be paged back in"
+        assert np.array_equal(loaded_map.seen, floor), "Expected the saved state bits to be paged back in"
+        assert np.array_equal(loaded_map.get_state(), tile_map.get_state()), "Expected the resolved graphics to be saved with the tiles"
+        assert loaded_map.dirty_region is None, "Expected a loaded map to need no re-resolution"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_tile_map_memmap_rejects_mismatched_files(tmp_path):
+    # Arrange
+    filename = tmp_path / 'level.tiles'
+    larger_manifest = deepcopy(DEFAULT_MANIFEST)
+    larger_manifest['dimensions']['grid_size'] = TileTuple( ([100], [60]) )
+    tile_map = DefaultTileMap(DEFAULT_MANIFEST, tile_file=filename)
+    tile_map.flush()
+
+    # Act
+    errors = []
+    for reopen in (lambda: DefaultTileMap(larger_manifest, tile_file=filename, mode='r'),
+                   lambda: DefaultTileMap(PACKED_MANIFEST, tile_file=filename, mode='r'),
+                   lambda: BaseTileGrid(TILE_DTYPE, size=tile_map.grid.size, filename=filename, mode='r'),
+                   lambda: DefaultTileMap(DEFAULT_MANIFEST, tile_file=tmp_path / 'missing.tiles', mode='r')):
+        with pytest.raises(ValueError) as error:
+            reopen()
+        errors.append(str(error.value))
+    reopened = DefaultTileMap(DEFAULT_MANIFEST, tile_file=filename, mode='r')
+
+    # Assert
+    try:
+        assert all('level.tiles' in error for error in errors[:3]), "Expected a mismatched size, manifest or dtype to be rejected"
+        assert 'missing.tiles' in errors[3], "Expected a tile file without a header to be rejected"
+        assert np.array_equal(reopened.tiles, tile_map.tiles), "Expected the matching manifest to open the file"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_tile_map_memmap_saves_areas(tmp_path):
+    # Arrange
+    filename = tmp_path / 'level.tiles'
+    tile_map = DefaultTileMap(DEFAULT_MANIFEST, tile_file=filename)
+    room = RectangularRoom(center=tile_map.grid.get_location(20, 15), width=9, height=7)
+    tile_map.areas['0'] = room
+    tile_map.set_tiles(room.to_mask, 'floor')
+
+    # Act
+    tile_map.flush()
+    loaded_map = DefaultTileMap(DEFAULT_MANIFEST, tile_file=filename, mode='r')
+    roster = Roster()
+    roster.spawn_player(loaded_map)
+
+    # Assert
+    try:
+        assert list(loaded_map.areas) == ['0'] and type(loaded_map.areas['0']) is RectangularRoom, "Expected the areas to be saved with the tiles"
+        assert (loaded_map.areas['0'].center.x, loaded_map.areas['0'].center.y) == (20, 15), "Expected the saved area to keep its position"
+        assert loaded_map.get_tile_layout('floor')[roster.player.location.x, roster.player.location.y], "Expected the player to spawn on the floor of a saved room"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass
+
+def test_tile_map_memmap_saves_visibility_tables(tmp_path):
+    # Arrange
+    filename = tmp_path / 'level.tiles'
+    tile_map = DefaultTileMap(DEFAULT_MANIFEST, tile_file=filename)
+    floor = np.full(tile_map.tiles.shape, fill_value=False)
+    floor[5:20, 10:30] = True
+    floor[12, 15:18] = False
+    tile_map.set_tiles(floor, 'floor')
+    tile_map.precompute_visibility(6)
+
+    # Act
+    tile_map.flush()
+    loaded_map = DefaultTileMap(DEFAULT_MANIFEST, tile_file=filename, mode='r')
+    table = loaded_map.get_visibility_table(6, libtcodpy.FOV_SHADOW)
+
+    # Assert
+    try:
+        assert table is not None and table.matches(loaded_map.transparency), "Expected the visibility table to be saved with the level"
+        assert np.array_equal(loaded_map.compute_fov(10, 14, 6, libtcodpy.FOV_SHADOW), tile_map.compute_fov(10, 14, 6, libtcodpy.FOV_SHADOW)), "Expected the loaded table to answer FOV queries"
+
+    except AssertionError as e:
+        pytest.fail(str(e))
+
+    # Atavise
+    finally:
+        pass